@@ -1,9 +1,9 @@
+from engagement import warmup
 import pandas as pd
-import plotly.express as px
 import streamlit as st
-from streamlit_extras.stylable_container import stylable_container
-import numpy as np
-import webbrowser
+
+# Session views of the shared frames never write through to them
+pd.set_option('mode.copy_on_write', True)
 
 
 # Page configuration
@@ -21,4 +21,9 @@ pg = st.navigation([
     st.Page("pages/page3.py", title='Comparative Analysis', url_path='comparative'),
 ], position='sidebar')
 
-pg.run()
\ No newline at end of file
+# Already running when started with `python -m engagement.launch`; under a
+# plain `streamlit run app.py` the datasets load while the first page renders
+warmup.start()
+
+pg.run()
+warmup.timeline.mark('first_render')
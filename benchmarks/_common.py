@@ -0,0 +1,48 @@
+"""Helpers shared by the benchmark scripts: a synthetic posts feed and a timer.
+
+Importing this module also puts the repository root on sys.path, so the
+scripts can import `engagement` when run as `python benchmarks/<script>.py`.
+"""
+import pathlib
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+ROOT = pathlib.Path(__file__).resolve().parent.parent
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+AUTHORS = ["nba", "nfl", "nhl", "MLBOfficial", "fan"]
+SUBREDDITS = [f"sub{i}" for i in range(40)]
+END = pd.Timestamp("2024-12-31", tz="UTC")
+
+
+def feed(rows: int, seed: int = 0, days: int = 5 * 365):
+    """Synthetic posts feed in the shape of `storage.read_posts`, without the time features.
+
+    Posts are spread over the `days` days before END. Scores and comment
+    counts are log-normal like the real feed's.
+    """
+    rng = np.random.default_rng(seed)
+    return pd.DataFrame({
+        "id": [f"p{seed}-{i:07x}" for i in range(rows)],
+        "title": [f"Synthetic post {i}" for i in range(rows)],
+        "author": pd.Categorical(rng.choice(AUTHORS, rows)),
+        "subreddit": pd.Categorical(rng.choice(SUBREDDITS, rows)),
+        "created_utc": END - pd.to_timedelta(rng.integers(0, days * 86_400, rows), unit="s"),
+        "score": rng.lognormal(4, 2, rows).astype(np.int32),
+        "num_comments": rng.lognormal(3, 1.5, rows).astype(np.int32),
+        "upvote_ratio": rng.random(rows).astype(np.float32),
+        "over_18": np.zeros(rows, dtype=bool),
+        "stickied": np.zeros(rows, dtype=bool),
+        "is_created_from_ads_ui": rng.random(rows) < 0.1,
+    })
+
+
+def timed(func, *args, **kwargs):
+    """`func(*args, **kwargs)` and the seconds it took."""
+    start = time.perf_counter()
+    result = func(*args, **kwargs)
+    return result, time.perf_counter() - start
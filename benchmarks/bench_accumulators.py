@@ -0,0 +1,45 @@
+"""Keeping the day cube current: full rebuild vs incremental accumulator update.
+
+Builds the day cube of `rows` synthetic posts, then appends batches of
+`batch` new posts. It times `Accumulators.add`, which touches only the
+buckets the new posts fall into, against rebuilding the cube from the whole
+feed, and checks both agree.
+
+Usage:
+    python benchmarks/bench_accumulators.py [rows] [batch]
+"""
+import sys
+
+import numpy as np
+import pandas as pd
+
+from _common import feed, timed
+from engagement import cube, timebuckets
+
+
+def posts(rows: int, seed: int = 0):
+    return timebuckets.add_time_features(feed(rows, seed)[["id", "author", "subreddit", "created_utc", "score",
+                                                           "num_comments"]])
+
+
+def main():
+    rows = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+    batch = int(sys.argv[2]) if len(sys.argv) > 2 else 1_000
+    old = posts(rows)
+    accumulators, built = timed(cube.Accumulators.build, old, "day")
+    print(f"{rows:,} posts, {len(accumulators.table):,} day buckets, built in {built:.2f} s")
+
+    df = old
+    for step in range(3):
+        new = posts(batch, seed=step + 1)
+        _, added = timed(accumulators.add, new)
+        df = pd.concat([df, new], ignore_index=True)
+        expected, rebuilt = timed(cube.accumulate, df, "day")
+        got = accumulators.table.sort_index()
+        error = np.abs(got.to_numpy() - expected.sort_index().to_numpy()).max() / np.abs(expected.to_numpy()).max()
+        print(f"append {batch:,} posts: add {added * 1000:.0f} ms, rebuild {rebuilt * 1000:.0f} ms "
+              f"(max rel diff {error:.1e})")
+
+
+if __name__ == "__main__":
+    main()
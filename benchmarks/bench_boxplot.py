@@ -0,0 +1,72 @@
+"""Box plot build time and payload, server-side statistics vs px.box(points="all").
+
+Builds a synthetic table of `rows` AMAs in a handful of categories and times
+both figures, reporting the size of the figure JSON the browser receives.
+"kept" is the server-side figure drawn from per-category sketches built
+beforehand, as the page gets them from `data.load_ama_sketches`.
+The px.box run is skipped above 200,000 rows, where it takes minutes.
+
+Usage:
+    python benchmarks/bench_boxplot.py [rows ...]
+"""
+import pathlib
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, str(pathlib.Path(__file__).resolve().parent.parent))
+
+from engagement import boxplot
+
+CATEGORIES = ["Sports", "Music", "Science", "Gaming", "Politics", "Movies", "Business", "Other"]
+HOVER = ["title", "name", "date", "link"]
+PX_LIMIT = 200_000
+
+
+def table(rows: int):
+    rng = np.random.default_rng(0)
+    return pd.DataFrame({
+        "category": pd.Categorical(rng.choice(CATEGORIES, rows)),
+        "num_comments": rng.lognormal(7, 1.2, rows).astype(np.int64),
+        "title": [f"I am person {i}, ask me anything about my work" for i in range(rows)],
+        "name": [f"Person {i}" for i in range(rows)],
+        "date": pd.Timestamp("2015-01-01") + pd.to_timedelta(rng.integers(0, 3_650, rows), unit="D"),
+        "link": [f"https://www.reddit.com/r/IAmA/comments/{i:x}/" for i in range(rows)],
+    })
+
+
+def measure(build):
+    start = time.perf_counter()
+    payload = len(build().to_json())
+    return time.perf_counter() - start, payload
+
+
+def main():
+    import plotly.express as px
+
+    sizes = [int(n) for n in sys.argv[1:]] or [462, 50_000, 1_000_000]
+    # The first figure of either kind pays for Plotly's validator imports
+    warm = table(100)
+    boxplot.box(warm, "category", "num_comments", hover_data=HOVER)
+    px.box(warm, x="category", y="num_comments", color="category", hover_data=HOVER, points="all")
+    print(f"{'rows':>10} {'stats':>10} {'kept':>10} {'payload':>10} {'px.box':>10} {'payload':>10}")
+    for rows in sizes:
+        df = table(rows)
+        stats_time, stats_bytes = measure(lambda: boxplot.box(df, "category", "num_comments", hover_data=HOVER))
+        sketches = boxplot.CategorySketches.build(df, "category", ["num_comments"])
+        kept_time, _ = measure(lambda: boxplot.box(df, "category", "num_comments", hover_data=HOVER,
+                                                   sketches=sketches))
+        line = f"{rows:>10,} {stats_time * 1000:>7.0f} ms {kept_time * 1000:>7.0f} ms {stats_bytes / 1e3:>7.0f} kB"
+        if rows <= PX_LIMIT:
+            px_time, px_bytes = measure(lambda: px.box(
+                df.sort_values("num_comments", ascending=False), x="category", y="num_comments",
+                color="category", hover_data=HOVER, points="all",
+            ))
+            line += f" {px_time * 1000:>7.0f} ms {px_bytes / 1e3:>7.0f} kB"
+        print(line)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,71 @@
+"""Throughput and peak memory of GetRedditComments against the fake API.
+
+Fetches `threads` synthetic AMA threads of `comments` comments each into a
+Parquet file, each run in a fresh interpreter so the reported peak RSS
+belongs to that run alone. With chunked writes it should stay flat as the
+comment count grows. Each run also checks the flattened trees: every comment
+is written once, top-level comments point at their thread and every reply
+sits one level below its parent.
+
+Usage:
+    python benchmarks/bench_comments.py [threads comments] [workers ...]
+"""
+import pathlib
+import subprocess
+import sys
+import tempfile
+
+ROOT = pathlib.Path(__file__).resolve().parent.parent
+INGEST = ROOT / "pipelines" / "data-ingest"
+
+PROBE = """
+import os, resource, sys, time
+sys.path.insert(0, {ingest!r})
+import pyarrow.parquet as pq
+import utils
+from fake_api import fake_client_factory
+
+os.chdir({tmp!r})
+ids = [f"t{{i:05x}}" for i in range({threads})]
+comments = utils.GetRedditComments("comments", ids, max_workers={workers},
+                                   client_factory=fake_client_factory(comments={comments}, latency=0.005))
+start = time.perf_counter()
+result = comments.run()
+elapsed = time.perf_counter() - start
+assert result["status"] == "Success", result
+rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+df = pq.read_table("comments.parquet").to_pandas()
+assert len(df) == {threads} * {comments} == df["comment_id"].nunique()
+top = df[df["depth"] == 0]
+assert (top["parent_id"] == top["thread_id"]).all()
+replies = df[df["depth"] > 0]
+depth = df.set_index("comment_id")["depth"]
+assert (depth.loc[replies["parent_id"]].to_numpy() == replies["depth"].to_numpy() - 1).all()
+print(len(df), elapsed, rss)
+"""
+
+
+def probe(threads: int, comments: int, workers: int, tmp: str):
+    out = subprocess.run(
+        [sys.executable, "-c", PROBE.format(ingest=str(INGEST), tmp=tmp, threads=threads, comments=comments,
+                                            workers=workers)],
+        capture_output=True, text=True, check=True,
+    ).stdout.split()[-3:]
+    return int(out[0]), float(out[1]), float(out[2])
+
+
+def main():
+    args = [int(a) for a in sys.argv[1:]]
+    threads, comments = args[:2] if len(args) >= 2 else (50, 5_000)
+    workers = args[2:] or [1, 4, 8]
+    print(f"{threads} threads x {comments:,} comments, 5 ms per request")
+    print(f"{'workers':>8} {'comments/sec':>14} {'peak RSS':>12}")
+    with tempfile.TemporaryDirectory() as tmp:
+        for count in workers:
+            written, seconds, rss_mb = probe(threads, comments, count, tmp)
+            print(f"{count:>8} {written / seconds:>14,.0f} {rss_mb:>9.1f} MB")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,78 @@
+"""Import cost of app.py and each page, with a regression threshold.
+
+For each script, its module-level imports are run in a fresh interpreter
+under `python -X importtime`. The cost is the summed cumulative time of the
+top-level imports, so it counts everything the script pulls in before its
+first line of page code runs. Imports done lazily inside functions (e.g.
+plotly.express in the figure builders) are not counted. They are only paid
+when the figure cache misses.
+
+The median of several runs is compared with BUDGET_MS. The script exits
+non-zero when any script is over its budget.
+
+Usage:
+    python benchmarks/bench_imports.py [runs] [script=ms ...]
+"""
+import ast
+import pathlib
+import re
+import statistics
+import subprocess
+import sys
+
+ROOT = pathlib.Path(__file__).resolve().parent.parent
+
+# Milliseconds, with headroom over the cost measured when the budget was set
+BUDGET_MS = {
+    "app.py": 900,
+    "pages/page1.py": 1_500,
+    "pages/page2.py": 1_500,
+    "pages/page3.py": 1_900,
+}
+
+# "import time: self [us] | cumulative | imported package"; top-level
+# imports have exactly one space before the name.
+LINE = re.compile(r"^import time:\s+\d+ \|\s+(\d+) \| (\S.*)$")
+
+
+def module_imports(script: pathlib.Path):
+    """Source of the module-level import statements of `script`."""
+    tree = ast.parse(script.read_text())
+    return "\n".join(
+        ast.unparse(node) for node in tree.body if isinstance(node, (ast.Import, ast.ImportFrom))
+    )
+
+
+def import_ms(source: str):
+    """Milliseconds `source` spends importing, measured with -X importtime."""
+    stderr = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import sys; sys.path.insert(0, {str(ROOT)!r})\n{source}"],
+        cwd=ROOT, capture_output=True, text=True, check=True,
+    ).stderr
+    return sum(int(m.group(1)) for m in map(LINE.match, stderr.splitlines()) if m) / 1000
+
+
+def main():
+    args = sys.argv[1:]
+    runs = int(args.pop(0)) if args and args[0].isdigit() else 5
+    budget = dict(BUDGET_MS)
+    for arg in args:
+        name, ms = arg.split("=")
+        budget[name] = float(ms)
+
+    failures = []
+    print(f"{'script':<16} {'median':>9} {'budget':>9}")
+    for name, limit in budget.items():
+        source = module_imports(ROOT / name)
+        ms = statistics.median(import_ms(source) for _ in range(runs))
+        print(f"{name:<16} {ms:>6.0f} ms {limit:>6.0f} ms")
+        if ms > limit:
+            failures.append(f"{name} imports take {ms:.0f} ms, budget {limit:.0f} ms")
+
+    for failure in failures:
+        print(f"FAIL: {failure}")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,54 @@
+"""Throughput and peak memory of the GetRedditData pipeline against the fake API.
+
+Runs get_posts -> extract_data -> transform_basic -> load_to_csv end to end
+for each post count, each in a fresh interpreter so the reported peak RSS
+belongs to that run alone. With the streaming pipeline it should stay flat as
+the post count grows.
+
+Usage:
+    python benchmarks/bench_ingest.py [count ...]
+"""
+import pathlib
+import subprocess
+import sys
+import tempfile
+
+ROOT = pathlib.Path(__file__).resolve().parent.parent
+INGEST = ROOT / "pipelines" / "data-ingest"
+
+PROBE = """
+import os, resource, sys, time
+sys.path.insert(0, {ingest!r})
+import utils
+from fake_api import fake_client_factory
+
+os.chdir({tmp!r})
+reddit_data = utils.GetRedditData("posts", subreddit="nba", limit={count},
+                                  client_factory=fake_client_factory(count={count}))
+start = time.perf_counter()
+result = reddit_data.run()
+elapsed = time.perf_counter() - start
+assert result["status"] == "Success", result
+print({count}, elapsed, resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024)
+"""
+
+
+def probe(count: int, tmp: str):
+    out = subprocess.run(
+        [sys.executable, "-c", PROBE.format(ingest=str(INGEST), tmp=tmp, count=count)],
+        capture_output=True, text=True, check=True,
+    ).stdout.split()[-3:]
+    return int(out[0]), float(out[1]), float(out[2])
+
+
+def main():
+    counts = [int(c) for c in sys.argv[1:]] or [1_000, 100_000, 1_000_000]
+    print(f"{'posts':>10} {'posts/sec':>12} {'peak RSS':>12}")
+    with tempfile.TemporaryDirectory() as tmp:
+        for count in counts:
+            written, seconds, rss_mb = probe(count, tmp)
+            print(f"{written:>10,} {written / seconds:>12,.0f} {rss_mb:>9.1f} MB")
+
+
+if __name__ == "__main__":
+    main()
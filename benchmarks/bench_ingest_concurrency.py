@@ -0,0 +1,52 @@
+"""Wall-clock speedup of concurrent multi-target ingestion over a sequential run.
+
+Uses the fake PMAW client with `latency` seconds per page of submissions and a
+share of requests answered with HTTP 429, so both the shared token bucket and
+the retry/backoff path are exercised.
+
+Usage:
+    python benchmarks/bench_ingest_concurrency.py [posts_per_target] [latency] [workers]
+"""
+import os
+import pathlib
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, str(pathlib.Path(__file__).resolve().parent.parent / "pipelines" / "data-ingest"))
+
+import utils
+from fake_api import FakePushshiftAPI, FakeReddit
+
+
+def timed_run(workers: int, posts: int, latency: float):
+    api = FakePushshiftAPI(count=posts, latency=latency, throttle_rate=0.02)
+    with tempfile.TemporaryDirectory() as tmp:
+        cwd = os.getcwd()
+        os.chdir(tmp)
+        try:
+            start = time.perf_counter()
+            results = utils.run_targets(utils.TARGETS, max_workers=workers, requests_per_second=50,
+                                        session=(FakeReddit(), api), limit=posts, max_retries=8)
+            elapsed = time.perf_counter() - start
+        finally:
+            os.chdir(cwd)
+    failed = [target for target, result in results.items() if result["status"] != "Success"]
+    return elapsed, api.rejected, failed
+
+
+def main():
+    posts = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000
+    latency = float(sys.argv[2]) if len(sys.argv) > 2 else 0.05
+    workers = int(sys.argv[3]) if len(sys.argv) > 3 else len(utils.TARGETS)
+    utils.random.seed(0)
+    sequential, rejected_seq, failed_seq = timed_run(1, posts, latency)
+    concurrent, rejected_con, failed_con = timed_run(workers, posts, latency)
+    print(f"{len(utils.TARGETS)} targets x {posts} posts, {latency * 1000:.0f} ms/page")
+    print(f"sequential   {sequential:>7.2f} s  ({rejected_seq} x 429, failed: {failed_seq or 'none'})")
+    print(f"{workers} workers    {concurrent:>7.2f} s  ({rejected_con} x 429, failed: {failed_con or 'none'})")
+    print(f"speedup      {sequential / concurrent:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
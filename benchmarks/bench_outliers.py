@@ -0,0 +1,67 @@
+"""Outlier exclusion per rerun, precomputed bitsets vs quantile scans.
+
+Times the old per-column `remove_outliers` (two quantiles and a filtered copy
+per column) against `OutlierMasks.select` on a synthetic table of `rows`
+rows. Also reports the one-off build time and the size of the bitsets.
+
+Usage:
+    python benchmarks/bench_outliers.py [rows]
+"""
+import pathlib
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, str(pathlib.Path(__file__).resolve().parent.parent))
+
+from engagement import outliers
+
+COLUMNS = ["num_comments", "score"]
+REPEAT = 20
+
+
+def table(rows: int):
+    rng = np.random.default_rng(0)
+    return pd.DataFrame({
+        "category": pd.Categorical(rng.choice(["Player", "Coach", "Analyst", "Media", "Other"], rows)),
+        "num_comments": rng.lognormal(6, 1.3, rows).astype(np.int64),
+        "score": rng.lognormal(7, 1.5, rows).astype(np.int64),
+        "title": [f"AMA {i}" for i in range(rows)],
+    })
+
+
+def remove_outliers(df, column):
+    q1 = df[column].quantile(0.05)
+    q3 = df[column].quantile(0.95)
+    iqr = q3 - q1
+    return df[(df[column] >= q1 - 1.5 * iqr) & (df[column] <= q3 + 1.5 * iqr)]
+
+
+def timed(func):
+    start = time.perf_counter()
+    for _ in range(REPEAT):
+        result = func()
+    return result, (time.perf_counter() - start) / REPEAT
+
+
+def main():
+    rows = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+    df = table(rows)
+    start = time.perf_counter()
+    masks = outliers.OutlierMasks.build(df, COLUMNS, by="category")
+    build = time.perf_counter() - start
+    size = sum(bits.nbytes for bits in masks.bits.values())
+    print(f"{rows:,} rows: build {build * 1000:.0f} ms, {len(masks.bits)} bitsets, {size / 1e3:.0f} kB")
+
+    scanned, scan = timed(lambda: remove_outliers(remove_outliers(df, COLUMNS[0]), COLUMNS[1]))
+    _, mask = timed(lambda: outliers.unpack(masks.keep(COLUMNS), len(masks)))
+    selected, select = timed(lambda: masks.select(df, COLUMNS))
+    print(f"quantile scans {scan * 1000:.1f} ms ({len(scanned):,} rows)")
+    print(f"bitset AND     {mask * 1000:.1f} ms")
+    print(f"bitset select  {select * 1000:.1f} ms ({len(selected):,} rows)")
+
+
+if __name__ == "__main__":
+    main()
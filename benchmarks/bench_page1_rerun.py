@@ -0,0 +1,111 @@
+"""Rerun time of a scatter selection on page1: before and after the `st.fragment` split.
+
+Selecting a point in the `scatter` chart reruns the script. Before page1 was
+split into `st.fragment` sections that meant the whole page; now only
+`engagement_section`, which holds the chart, runs again. The same click, on
+the chart's first point, is replayed through Streamlit's AppTest on:
+
+- baseline: page1 as of BASELINE, the whole page rerunning
+- no fragments: today's page1 with `st.fragment` turned into a plain call,
+  so the whole page reruns as it did before the split
+- fragment: the time of `engagement_section` alone, what a click costs now
+
+Each page is run once first so caches are warm, as they are when a user
+clicks. AppTest can only rerun the whole script, so the fragment's cost is
+its own time within those reruns.
+
+Usage:
+    python benchmarks/bench_page1_rerun.py [runs]
+"""
+import functools
+import json
+import os
+import pathlib
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import webbrowser
+
+import streamlit as st
+from streamlit.testing.v1 import AppTest
+
+ROOT = pathlib.Path(__file__).resolve().parent.parent
+# Commit before the fragment split
+BASELINE = "d9cc315"
+SECTION = "engagement_section"
+
+fragment = st.fragment
+timings = {}
+
+
+def timed_fragment(func=None, **kwargs):
+    """`st.fragment` that records how long each call of the section takes."""
+    if func is None:
+        return functools.partial(timed_fragment, **kwargs)
+
+    @functools.wraps(func)
+    def section(*args, **kw):
+        start = time.perf_counter()
+        try:
+            return func(*args, **kw)
+        finally:
+            timings.setdefault(func.__name__, []).append(time.perf_counter() - start)
+    return fragment(section, **kwargs)
+
+
+def no_fragment(func=None, **kwargs):
+    """`st.fragment` replacement that leaves the section a plain function."""
+    return func if func is not None else no_fragment
+
+
+def click(at):
+    """Selection state of the scatter chart's first point, as the browser sends it."""
+    trace = json.loads(at.get("plotly_chart")[0].proto.spec)["data"][0]
+    point = {"customdata": trace["customdata"][0], "x": trace["x"][0], "y": trace["y"][0]}
+    return {"selection": {"points": [point], "point_indices": [0], "box": [], "lasso": []}}
+
+
+def reruns(script, runs: int):
+    """Seconds of each rerun of `script` after the same scatter selection."""
+    at = AppTest.from_file(script, default_timeout=300).run()
+    assert not at.exception, at.exception
+    selection = click(at)
+    timings.clear()
+    seconds = []
+    for _ in range(runs):
+        at.session_state["scatter"] = selection
+        start = time.perf_counter()
+        at.run()
+        seconds.append(time.perf_counter() - start)
+        assert not at.exception, at.exception
+    return seconds
+
+
+def main():
+    runs = int(sys.argv[1]) if len(sys.argv) > 1 else 5
+    os.chdir(ROOT)
+    sys.path.insert(0, str(ROOT))
+    # A selection opens the thread in a browser
+    webbrowser.open = lambda *args, **kwargs: None
+
+    results = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        baseline = pathlib.Path(tmp) / "page1.py"
+        baseline.write_text(subprocess.run(["git", "show", f"{BASELINE}:pages/page1.py"], cwd=ROOT,
+                                           capture_output=True, text=True, check=True).stdout)
+        st.fragment = no_fragment
+        results[f"baseline ({BASELINE})"] = reruns(str(baseline), runs)
+    results["no fragments"] = reruns("pages/page1.py", runs)
+    st.fragment = timed_fragment
+    reruns("pages/page1.py", runs)
+    results[f"fragment {SECTION}"] = timings[SECTION]
+
+    print(f"{'scatter selection rerun':<32} {'median':>10}")
+    for name, seconds in results.items():
+        print(f"{name:<32} {statistics.median(seconds) * 1000:>7.0f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,57 @@
+"""Engagement scoring: bulk NumPy engine vs pandas groupby, and incremental appends.
+
+Scores `rows` synthetic posts grouped by subreddit x month. It then appends
+batches of new posts from the latest month, comparing each `append` with
+re-scoring the whole feed.
+
+Usage:
+    python benchmarks/bench_scoring.py [rows] [batch]
+"""
+import sys
+
+import numpy as np
+import pandas as pd
+
+from _common import feed, timed
+from engagement import scoring, timebuckets
+
+BY = ["subreddit", "month"]
+
+
+def posts(rows: int, seed: int = 0, days: int = 5 * 365):
+    return timebuckets.add_time_features(feed(rows, seed, days))[BY + list(scoring.METRICS)]
+
+
+def pandas_scores(df):
+    """The same columns computed with groupby rank/transform."""
+    out = {}
+    for metric, name in scoring.METRICS.items():
+        values = np.log1p(df[metric].clip(lower=0))
+        grouped = values.groupby([df[c] for c in BY], observed=True)
+        out[f"{name}_pct"] = grouped.rank(method="max", pct=True) * 100
+        out[f"{name}_z"] = (values - grouped.transform("mean")) / grouped.transform("std", ddof=0)
+    return pd.DataFrame(out)
+
+
+def main():
+    rows = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+    batch = int(sys.argv[2]) if len(sys.argv) > 2 else 1_000
+    df = posts(rows)
+    engine, bulk = timed(scoring.EngagementScores, df, BY)
+    expected, grouped = timed(pandas_scores, df)
+    error = np.nanmax(np.abs(engine.frame[expected.columns].to_numpy() - expected.to_numpy()))
+    print(f"{rows:,} posts: numpy {bulk:.2f} s, pandas groupby {grouped:.2f} s (max diff {error:.1e})")
+
+    latest = df["month"].max()
+    for step in range(3):
+        new = posts(batch, seed=step + 1, days=1)
+        assert (new["month"] == latest).all()
+        new.index += rows + step * batch
+        _, appended = timed(engine.append, new)
+        df = pd.concat([df, new])
+        _, rescored = timed(scoring.score, df, BY)
+        print(f"append {batch:,}: {appended * 1000:.0f} ms, full re-score {rescored * 1000:.0f} ms")
+
+
+if __name__ == "__main__":
+    main()
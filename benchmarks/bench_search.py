@@ -0,0 +1,58 @@
+"""Full-text search latency, inverted index vs `str.contains` scans.
+
+Builds a synthetic feed of `rows` posts, indexes its titles and times a few
+queries both ways. Also reports build, save and load time of the index.
+
+Usage:
+    python benchmarks/bench_search.py [rows]
+"""
+import pathlib
+import sys
+import tempfile
+
+import numpy as np
+
+from _common import feed, timed
+from engagement import search
+
+QUERIES = ["lakers", "lak", "lebron dunk", "trade dead"]
+WORDS = ["lakers", "celtics", "lebron", "james", "dunk", "trade", "deadline", "game", "thread",
+         "highlight", "post", "rumor", "injury", "report", "draft", "pick", "mvp", "finals"]
+
+
+def titles(rows: int):
+    rng = np.random.default_rng(0)
+    # A long tail of rare words next to the common ones
+    vocabulary = np.array(WORDS + [f"word{i}" for i in range(50_000)])
+    weights = np.r_[np.full(len(WORDS), 50.0), np.ones(50_000)]
+    words = rng.choice(vocabulary, size=(rows, 8), p=weights / weights.sum())
+    return [" ".join(w) for w in words]
+
+
+def main():
+    rows = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+    df = feed(rows).assign(title=titles(rows))[["id", "title", "score", "num_comments"]]
+    index, build = timed(search.SearchIndex.build, df, [df["title"]])
+    with tempfile.TemporaryDirectory() as tmp:
+        path = pathlib.Path(tmp) / "feed.search.npz"
+        _, save = timed(index.save, path)
+        index, load = timed(search.SearchIndex.load, path)
+    print(f"{rows:,} posts: build {build:.1f} s, save {save:.2f} s, load {load:.2f} s")
+
+    print(f"{'query':<14} {'index':>10} {'contains':>10}")
+    lowered = df["title"].str.lower()
+    for query in QUERIES:
+        _, indexed = timed(index.search, query)
+
+        def scan():
+            mask = np.ones(len(df), dtype=bool)
+            for term in search.tokenize(query):
+                mask &= lowered.str.contains(r"\b" + term, regex=True).to_numpy()
+            return df[mask].nlargest(100, ["score", "num_comments"])
+
+        _, scanned = timed(scan)
+        print(f"{query:<14} {indexed * 1000:>7.1f} ms {scanned * 1000:>7.0f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,103 @@
+"""Memory per worker process and per session with the memory-mapped datasets.
+
+Writes a synthetic posts feed of `rows` posts as the converted Parquet copy,
+then measures (Linux only, from /proc):
+
+- workers: private memory of each of N live worker processes holding the
+  feed, mapped from the shared copy vs parsed into each heap as before;
+- sessions: RSS growth of each of those workers as M more sessions take the
+  feed, vs the unpickled copy per cache hit that st.cache_data hands out.
+
+Exits non-zero when an extra session costs any mapped worker more than
+SESSION_BUDGET_MB, so it doubles as a regression test for the sharing.
+
+Usage:
+    python benchmarks/bench_shared_memory.py [rows workers sessions]
+"""
+import os
+import pathlib
+import subprocess
+import sys
+import tempfile
+
+import numpy as np
+
+from _common import ROOT, feed
+
+SESSION_BUDGET_MB = 1.0
+# Unpickled copies made for comparison; each is as large as the feed
+COPIES = 3
+
+WORKER = """
+import pickle, sys
+sys.path.insert(0, {root!r})
+import pandas as pd
+from engagement import data, storage, timebuckets
+if {mapped}:
+    load = data.load_posts
+else:
+    df = timebuckets.add_time_features(pd.read_parquet(storage.POSTS_PARQUET))
+    # What st.cache_data hands each session on a cache hit
+    payload = pickle.dumps(df)
+    load = lambda: pickle.loads(payload)
+df = load()
+# Touch every numeric column, as the pages' aggregations do
+total = sum(float(df[c].sum()) for c in ["score", "num_comments", "upvote_ratio"])
+
+def usage():
+    fields = dict(line.split(":", 1) for line in open("/proc/self/smaps_rollup") if ":" in line)
+    kb = lambda name: int(fields[name].split()[0])
+    return (kb("Private_Clean") + kb("Private_Dirty")) / 1024, kb("Pss") / 1024, kb("Rss") / 1024
+
+private, pss, rss = usage()
+sessions = [load() for _ in range({sessions})]
+print(private, pss, (usage()[2] - rss) / {sessions})
+sys.stdout.flush()
+sys.stdin.read()
+"""
+
+
+def posts(rows: int):
+    df = feed(rows)
+    return df.assign(permalink="/r/" + df["subreddit"].astype(str) + "/comments/" + df["id"],
+                     url="https://www.reddit.com/r/" + df["subreddit"].astype(str) + "/comments/" + df["id"])
+
+
+def workers(count: int, mapped: bool, env: dict, sessions: int):
+    """Private and proportional memory (MB) of `count` live worker processes, and RSS (MB) per extra session."""
+    script = WORKER.format(root=str(ROOT), mapped=mapped, sessions=sessions if mapped else COPIES)
+    procs = [subprocess.Popen([sys.executable, "-c", script], env=env,
+                              stdin=subprocess.PIPE, stdout=subprocess.PIPE, text=True) for _ in range(count)]
+    # All workers stay alive until every one has reported, so they map the copy together
+    usage = [tuple(map(float, proc.stdout.readline().split())) for proc in procs]
+    for proc in procs:
+        proc.communicate("")
+    return usage
+
+
+def main():
+    rows, count, session_count = (int(a) for a in sys.argv[1:4]) if len(sys.argv) > 3 else (1_000_000, 4, 20)
+    with tempfile.TemporaryDirectory() as tmp:
+        tmp = pathlib.Path(tmp)
+        posts(rows).to_parquet(tmp / "posts.parquet", index=False)
+        env = dict(os.environ, ENGAGEMENT_POSTS_PATH=str(tmp / "posts.parquet"),
+                   ENGAGEMENT_SHARED_DIR=str(tmp / "shared"), ENGAGEMENT_POSTS_URL=str(tmp / "posts.jsonl"))
+        os.environ.update(env)
+
+        print(f"{rows:,} posts, {count} worker processes")
+        print(f"{'':>8} {'private/worker':>16} {'PSS/worker':>12} {'RSS/session':>12}")
+        # Write the shared copy once up front, as the first worker of a deployment does
+        subprocess.run([sys.executable, "-c", f"import sys; sys.path.insert(0, {str(ROOT)!r}); "
+                        "from engagement import data; data.load_posts()"], env=env, check=True)
+        for mapped in (False, True):
+            usage = np.array(workers(count, mapped, env, session_count))
+            private, pss, per_session = usage.mean(axis=0)
+            print(f"{'mapped' if mapped else 'heap':>8} {private:>13.0f} MB {pss:>9.0f} MB {per_session:>9.2f} MB")
+        shared = usage[:, 2].max()
+    if shared > SESSION_BUDGET_MB:
+        print(f"FAIL: an extra session costs {shared:.2f} MB, budget {SESSION_BUDGET_MB} MB")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
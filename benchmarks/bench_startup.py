@@ -0,0 +1,82 @@
+"""Cold-start timeline of the app and a check against a time budget.
+
+Starts the app with `engagement.launch` in a fresh interpreter. Streamlit's
+server is replaced by a first visitor who arrives `visitor` seconds later and
+renders `app.py` through AppTest. Prints `engagement.warmup.timeline`: when
+the imports finished, when the datasets and aggregates were ready, and when
+the first page finished rendering. Exits non-zero if a milestone was missed
+or came later than its budget.
+
+Usage:
+    python benchmarks/bench_startup.py [visitor=seconds] [milestone=seconds ...]
+
+    ENGAGEMENT_POSTS_URL=feed.jsonl python benchmarks/bench_startup.py visitor=10 first_render=12
+"""
+import json
+import pathlib
+import subprocess
+import sys
+
+ROOT = pathlib.Path(__file__).resolve().parent.parent
+
+# Seconds since the launcher started; first_render includes the visitor's delay
+BUDGET = {"imported": 3.0, "first_render": 15.0, "data_ready": 60.0}
+
+PROBE = """
+import json, os, sys, time
+os.chdir({root!r})
+sys.path.insert(0, {root!r})
+from engagement import launch, warmup
+from streamlit.testing.v1 import AppTest
+from streamlit.web import bootstrap
+
+def serve(main_script_path, *args, **kwargs):
+    global at
+    time.sleep({visitor})
+    at = AppTest.from_file(main_script_path, default_timeout=300).run()
+
+bootstrap.run = serve
+launch.main(["--server.headless=true"])
+warmup.start().join()
+print(json.dumps({{
+    "marks": warmup.timeline.as_dict(),
+    "error": repr(warmup.timeline.error) if warmup.timeline.error else None,
+    "exceptions": [e.message for e in at.exception],
+}}))
+"""
+
+
+def main():
+    budget, visitor = dict(BUDGET), 0.0
+    for arg in sys.argv[1:]:
+        name, seconds = arg.split("=")
+        if name == "visitor":
+            visitor = float(seconds)
+        else:
+            budget[name] = float(seconds)
+
+    out = subprocess.run(
+        [sys.executable, "-c", PROBE.format(root=str(ROOT), visitor=visitor)],
+        capture_output=True, text=True, check=True,
+    ).stdout.splitlines()[-1]
+    result = json.loads(out)
+
+    failures = result["exceptions"] + ([result["error"]] if result["error"] else [])
+    print(f"{'milestone':<14} {'seconds':>8} {'budget':>8}")
+    for name, limit in budget.items():
+        seconds = result["marks"].get(name)
+        if seconds is None:
+            failures.append(f"{name} was never reached")
+            print(f"{name:<14} {'-':>8} {limit:>8.1f}")
+            continue
+        if seconds > limit:
+            failures.append(f"{name} took {seconds:.2f}s, budget {limit:.1f}s")
+        print(f"{name:<14} {seconds:>8.2f} {limit:>8.1f}")
+
+    for failure in failures:
+        print(f"FAIL: {failure}")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
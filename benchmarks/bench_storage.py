@@ -0,0 +1,70 @@
+"""Compare load time and memory of the text sources against the Parquet copies.
+
+Each loader runs in a fresh interpreter so parse caches and allocator state
+from one run do not flatter the next.
+
+Usage:
+    python benchmarks/bench_storage.py [posts.jsonl]
+
+The posts comparison is skipped if no local JSONL feed is given.
+"""
+import pathlib
+import subprocess
+import sys
+import tempfile
+
+ROOT = pathlib.Path(__file__).resolve().parent.parent
+
+PROBE = """
+import resource, sys, time
+sys.path.insert(0, {root!r})
+import pandas as pd
+import pyarrow.parquet
+from engagement import storage
+before = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+start = time.perf_counter()
+df = {expr}
+elapsed = time.perf_counter() - start
+after = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+print(elapsed, (after - before) / 1024, df.memory_usage(deep=True).sum() / 2**20)
+"""
+
+
+def probe(expr: str, repeat: int = 5):
+    best = None
+    for _ in range(repeat):
+        out = subprocess.run(
+            [sys.executable, "-c", PROBE.format(root=str(ROOT), expr=expr)],
+            capture_output=True, text=True, check=True,
+        ).stdout.split()
+        run = tuple(float(x) for x in out)
+        best = run if best is None or run[0] < best[0] else best
+    return best
+
+
+def report(label: str, expr: str):
+    seconds, rss_mb, frame_mb = probe(expr)
+    print(f"{label:<34} {seconds * 1000:>9.1f} ms {rss_mb:>9.1f} MB RSS {frame_mb:>9.1f} MB frame")
+
+
+def main():
+    print(f"{'loader':<34} {'time':>12} {'peak RSS growth':>16} {'in-memory':>15}")
+    report("nba-ama.csv (read_csv)", "pd.read_csv(storage.AMA_CSV)")
+    report("nba-ama.csv (schema)", "storage.read_source(storage.AMA_CSV, storage.AMA_SCHEMA)")
+    with tempfile.TemporaryDirectory() as tmp:
+        ama = pathlib.Path(tmp) / "nba-ama.parquet"
+        storage.convert(storage.AMA_CSV, ama, storage.AMA_SCHEMA, storage.AMA_TEXT)
+        report("nba-ama.parquet", f"storage.read_table({str(ama)!r}, storage.AMA_SCHEMA)")
+
+        if len(sys.argv) > 1:
+            feed = sys.argv[1]
+            posts = pathlib.Path(tmp) / "posts.parquet"
+            storage.convert(feed, posts, storage.POSTS_SCHEMA, storage.POSTS_TEXT)
+            report("posts jsonl (read_json)", f"pd.read_json({feed!r}, lines=True)")
+            report("posts parquet", f"storage.read_table({str(posts)!r}, storage.POSTS_SCHEMA)")
+
+
+if __name__ == "__main__":
+    sys.path.insert(0, str(ROOT))
+    from engagement import storage
+    main()
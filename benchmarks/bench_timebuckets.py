@@ -0,0 +1,58 @@
+"""Time the per-row time bucketing page2 used to do against engagement.timebuckets.
+
+Usage:
+    python benchmarks/bench_timebuckets.py [rows]
+
+Defaults to a 1M-row synthetic feed spread over ten years.
+"""
+import pathlib
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, str(pathlib.Path(__file__).resolve().parent.parent))
+
+from engagement import timebuckets
+
+
+def synthetic_feed(rows: int):
+    rng = np.random.default_rng(0)
+    epoch = rng.integers(1_420_070_400, 1_735_689_600, rows)
+    return pd.DataFrame({"created_utc": pd.to_datetime(epoch, unit="s", utc=True)})
+
+
+def legacy(df):
+    """The page2 preprocessing before the time features moved to load time."""
+    df = df.copy()
+    df["created_utc"] = df["created_utc"].dt.tz_convert("US/Eastern")
+    df["created_datetime_est"] = df["created_utc"].dt.tz_convert("US/Eastern")
+    df["created_date_est"] = df["created_datetime_est"].dt.date
+    df["week"] = df["created_utc"].dt.isocalendar().week
+    df["week_date"] = df["created_utc"].dt.to_period("W-SUN").apply(lambda x: x.start_time.strftime("%Y-%m-%d"))
+    df["week_end_date"] = df["created_utc"].dt.to_period("W-SUN").apply(lambda x: x.end_time.strftime("%Y-%m-%d"))
+    df["year"] = df["created_utc"].dt.year
+    df["month"] = df["created_utc"].dt.to_period("M")
+    return df
+
+
+def timed(label: str, fn, df):
+    start = time.perf_counter()
+    out = fn(df)
+    elapsed = time.perf_counter() - start
+    print(f"{label:<12} {elapsed:>8.2f} s {out.memory_usage(deep=True).sum() / 2**20:>9.1f} MB")
+    return elapsed
+
+
+def main():
+    rows = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+    df = synthetic_feed(rows)
+    print(f"{rows:,} rows")
+    new = timed("vectorized", timebuckets.add_time_features, df)
+    old = timed("legacy", legacy, df)
+    print(f"speedup      {old / new:>8.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,48 @@
+"""Memory per row and time of transform_basic before and after the POST_SCHEMA coercion.
+
+Usage:
+    python benchmarks/bench_transform.py [rows]
+"""
+import pathlib
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, str(pathlib.Path(__file__).resolve().parent.parent / "pipelines" / "data-ingest"))
+
+import utils
+from fake_api import FakePushshiftAPI
+
+
+def legacy_transform(df):
+    """transform_basic and the load_to_csv casts as they were before POST_SCHEMA."""
+    df["created_utc"] = pd.to_datetime(df["created_utc"], unit="s")
+    for flag in ("over_18", "edited", "spoiler", "stickied"):
+        df[flag] = np.where((df[flag] == "False") | (df[flag] == False), False, True).astype(bool)
+    df["id"] = df["id"].astype(str)
+    df["title"] = df["title"].astype(str)
+    df["author"] = df["author"].astype(str)
+    return df
+
+
+def main():
+    rows = int(sys.argv[1]) if len(sys.argv) > 1 else 200_000
+    api = FakePushshiftAPI(count=rows)
+    records = [
+        {field: vars(post)[field] for field in utils.POST_FIELDS}
+        for post in api.search_submissions(subreddit="nba", author="nba")
+    ]
+    print(f"{rows:,} rows")
+    for label, transform in (("legacy", legacy_transform), ("schema", utils.coerce_posts)):
+        df = pd.DataFrame(records)
+        start = time.perf_counter()
+        out = transform(df)
+        elapsed = time.perf_counter() - start
+        per_row = out.memory_usage(deep=True).sum() / len(out)
+        print(f"{label:<8} {elapsed:>7.2f} s {per_row:>8.0f} bytes/row")
+
+
+if __name__ == "__main__":
+    main()
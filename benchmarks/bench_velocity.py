@@ -0,0 +1,70 @@
+"""Velocity lookups from the memory-mapped snapshot log vs a JSON lines log.
+
+Writes `polls` synthetic polls of `posts` posts to a snapshot log with
+SnapshotLog, and the same samples to a JSON lines file. Then times
+opening each log and computing the velocity curves of 50 posts, and the
+latest velocity of those posts that the Organic Tracker's recent posts list
+shows on a page view.
+
+Usage:
+    python benchmarks/bench_velocity.py [posts polls]
+"""
+import json
+import pathlib
+import sys
+import tempfile
+
+import numpy as np
+import pandas as pd
+
+from _common import timed
+from engagement import velocity
+
+SHOWN = 50
+
+
+def write_logs(tmp, posts: int, polls: int):
+    rng = np.random.default_rng(0)
+    ids = np.array([f"p{i:06x}" for i in range(posts)])
+    score = np.zeros(posts, dtype=np.int64)
+    comments = np.zeros(posts, dtype=np.int64)
+    log = velocity.SnapshotLog(tmp / "snapshots.bin")
+    with open(tmp / "snapshots.jsonl", "w") as f:
+        for poll in range(polls):
+            now = 1_735_689_600 + poll * 600
+            score += rng.poisson(20, posts)
+            comments += rng.poisson(3, posts)
+            log.append(ids, now, score, comments)
+            f.write("".join(json.dumps({"id": i, "time": now, "score": int(s), "comments": int(c)}) + "\n"
+                            for i, s, c in zip(ids, score, comments)))
+    return ids[rng.choice(posts, SHOWN, replace=False)]
+
+
+def from_jsonl(path, shown):
+    df = pd.read_json(path, lines=True)
+    df = df[df["id"].isin(shown)].sort_values(["id", "time"])
+    hours = df.groupby("id")["time"].diff() / 3600
+    df["score_per_hour"] = df.groupby("id")["score"].diff() / hours
+    df["comments_per_hour"] = df.groupby("id")["comments"].diff() / hours
+    return df
+
+
+def main():
+    posts, polls = (int(a) for a in sys.argv[1:3]) if len(sys.argv) > 2 else (10_000, 100)
+    with tempfile.TemporaryDirectory() as tmp:
+        tmp = pathlib.Path(tmp)
+        shown = write_logs(tmp, posts, polls)
+        binary, jsonl = (tmp / "snapshots.bin").stat().st_size, (tmp / "snapshots.jsonl").stat().st_size
+        print(f"{posts * polls:,} samples: binary {binary / 1e6:.0f} MB, JSON lines {jsonl / 1e6:.0f} MB")
+
+        series, opened = timed(velocity.VelocitySeries.load, tmp / "snapshots.bin")
+        _, curves = timed(lambda: [series.velocity(post_id) for post_id in shown])
+        _, latest = timed(series.latest, shown)
+        _, parsed = timed(from_jsonl, tmp / "snapshots.jsonl", shown)
+        print(f"memmap     open {opened * 1000:.0f} ms + {SHOWN} curves {curves * 1000:.0f} ms"
+              f" or latest velocity of {SHOWN} {latest * 1000:.1f} ms")
+        print(f"JSON lines parse and {SHOWN} curves {parsed * 1000:.0f} ms")
+
+
+if __name__ == "__main__":
+    main()
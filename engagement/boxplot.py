@@ -0,0 +1,258 @@
+"""Box plots drawn from server-side statistics instead of every point.
+
+`px.box(points="all")` ships every row and its hover data to the browser just
+so Plotly can compute quartiles there. `box` computes the quartiles, Tukey
+whiskers and outliers per category here and sends precomputed box traces,
+plus one marker trace with only the outliers and their hover data.
+
+Categories with more than `EXACT_ROWS` rows use a `QuantileSketch` instead of
+sorting every value, so the time and payload stay bounded as the feed grows.
+Sketches are mergeable: sketches of separate batches of the same category
+can be combined and queried as one. `CategorySketches` keeps one sketch per
+category next to a dataset (see `engagement.data.load_ama_sketches`), so a
+render only queries them and appended rows are merged in.
+"""
+import numpy as np
+import pandas as pd
+import plotly.colors
+import plotly.graph_objects as go
+
+WHISKER = 1.5
+EXACT_ROWS = 50_000
+# Sketch compactor capacity; rank error is on the order of 1/SKETCH_K
+SKETCH_K = 256
+# Most extreme values kept exactly by a sketch on each side, the outliers it can draw
+TAIL = 100
+
+
+def tukey(q1, q3, low, high, whisker: float = WHISKER):
+    """Outlier limits of a box: `whisker` IQRs beyond the quartiles, within the data range."""
+    iqr = q3 - q1
+    return max(q1 - whisker * iqr, low), min(q3 + whisker * iqr, high)
+
+
+def exact_stats(values, whisker: float = WHISKER):
+    """Quartiles, whiskers and the positions of the outliers of `values`.
+
+    Quartiles interpolate linearly between the closest ranks.
+    """
+    values = np.asarray(values, dtype=float)
+    q1, median, q3 = np.quantile(values, [0.25, 0.5, 0.75])
+    low, high = tukey(q1, q3, values.min(), values.max(), whisker)
+    inside = (values >= low) & (values <= high)
+    return {
+        "count": len(values),
+        "q1": q1, "median": median, "q3": q3,
+        "lowerfence": values[inside].min(), "upperfence": values[inside].max(),
+        "outliers": np.flatnonzero(~inside),
+    }
+
+
+class QuantileSketch:
+    """Mergeable quantile sketch (KLL-style compactors) plus exact tails.
+
+    Level h holds items standing for 2**h values each. When a level grows
+    past `k` items its items are compacted k at a time: each buffer of k is
+    sorted and every other item, from a random offset, is promoted to the
+    level above. Only k-item buffers are ever sorted, never a whole batch. The `tail` smallest and largest values are
+    also kept exactly, so the whiskers and outliers of a box are drawn from
+    real values.
+
+    Attributes:
+        k (int): Capacity of each level
+        count (int): Values added so far
+        levels (list): Items of each level
+        low (ndarray): The `tail` smallest values, sorted
+        high (ndarray): The `tail` largest values, sorted
+    """
+    def __init__(self, k: int = SKETCH_K, tail: int = TAIL, seed: int = 0):
+        self.k = k
+        self.tail = tail
+        self.count = 0
+        self.levels = [np.empty(0)]
+        self.low = self.high = np.empty(0)
+        self._rng = np.random.default_rng(seed)
+
+    def update(self, values):
+        """Add `values` to the sketch."""
+        values = np.asarray(values, dtype=float)
+        values = values[~np.isnan(values)]
+        self.count += len(values)
+        self.levels[0] = np.concatenate([self.levels[0], values])
+        self._keep_tails(values)
+        self._compress()
+        return self
+
+    def merge(self, other):
+        """Fold `other` (a sketch of more values) into this sketch."""
+        self.count += other.count
+        for h, items in enumerate(other.levels):
+            if h == len(self.levels):
+                self.levels.append(np.empty(0))
+            self.levels[h] = np.concatenate([self.levels[h], items])
+        self._keep_tails(other.low if other.high is other.low else np.concatenate([other.low, other.high]))
+        self._compress()
+        return self
+
+    def _keep_tails(self, values):
+        # While few values are seen, low and high are the same array of all of them
+        kept = [self.low] if self.high is self.low else [self.low, self.high]
+        values = np.concatenate(kept + [values])
+        if len(values) > 2 * self.tail:
+            self.low = np.sort(np.partition(values, self.tail - 1)[:self.tail])
+            self.high = np.sort(np.partition(values, len(values) - self.tail)[-self.tail:])
+        else:
+            self.low = self.high = np.sort(values)
+
+    def _compress(self):
+        size = max(self.k // 2 * 2, 2)
+        h = 0
+        while h < len(self.levels):
+            items = self.levels[h]
+            if len(items) > self.k:
+                # Whole buffers are compacted, the partial one stays on this level
+                full = len(items) // size * size
+                buffers = np.sort(items[:full].reshape(-1, size), axis=1)
+                odd = self._rng.integers(2, size=(len(buffers), 1)).astype(bool)
+                promoted = np.where(odd, buffers[:, 1::2], buffers[:, 0::2]).ravel()
+                self.levels[h] = items[full:]
+                if h + 1 == len(self.levels):
+                    self.levels.append(np.empty(0))
+                self.levels[h + 1] = np.concatenate([self.levels[h + 1], promoted])
+            h += 1
+
+    def quantile(self, q):
+        """Approximate value at quantile(s) `q` in [0, 1]."""
+        items = np.concatenate(self.levels)
+        weights = np.concatenate([np.full(len(items), 2.0 ** h) for h, items in enumerate(self.levels)])
+        order = np.argsort(items)
+        items, cumulative = items[order], np.cumsum(weights[order])
+        index = np.searchsorted(cumulative, np.asarray(q) * cumulative[-1], side="left")
+        return items[np.minimum(index, len(items) - 1)]
+
+    def box_stats(self, whisker: float = WHISKER):
+        """Box statistics like `exact_stats`; outliers are values from the exact tails."""
+        q1, median, q3 = self.quantile([0.25, 0.5, 0.75])
+        low, high = tukey(q1, q3, self.low[0], self.high[-1], whisker)
+        candidates = np.concatenate([self.low, np.concatenate(self.levels), self.high])
+        inside = candidates[(candidates >= low) & (candidates <= high)]
+        tails = np.unique(np.concatenate([self.low, self.high]))
+        return {
+            "count": self.count,
+            "q1": q1, "median": median, "q3": q3,
+            "lowerfence": inside.min(), "upperfence": inside.max(),
+            "outlier_values": tails[(tails < low) | (tails > high)],
+        }
+
+
+class CategorySketches:
+    """One `QuantileSketch` per category of `x` for each of `columns`.
+
+    Built once over a table and kept up to date with `add` as rows are
+    appended, so box plots of large categories only query the sketches.
+
+    Attributes:
+        x (str): Category column
+        columns (list): Sketched value columns
+        sketches (dict): (column, category) -> QuantileSketch
+    """
+    def __init__(self, x: str, columns):
+        self.x = x
+        self.columns = list(columns)
+        self.sketches = {}
+
+    @classmethod
+    def build(cls, df, x: str, columns):
+        return cls(x, columns).add(df)
+
+    def add(self, rows):
+        """Merge sketches of `rows` into those of their categories."""
+        codes, categories = pd.factorize(rows[self.x])
+        for column in self.columns:
+            values = rows[column].to_numpy(dtype=float)
+            for c, category in enumerate(categories):
+                batch = QuantileSketch().update(values[codes == c])
+                sketch = self.sketches.get((column, category))
+                self.sketches[(column, category)] = batch if sketch is None else sketch.merge(batch)
+        return self
+
+    def get(self, column: str, category):
+        """Sketch of `column` within `category`, None if there is none."""
+        return self.sketches.get((column, category))
+
+
+def category_stats(df, x: str, y: str, exact_rows: int = EXACT_ROWS, sketches: CategorySketches = None):
+    """Box statistics of `y` for each `x` category, largest value first (px.box order).
+
+    Small categories are exact and their outliers are row positions in `df`.
+    Larger ones come from a sketch and their outliers are values only. The
+    category's sketch in `sketches` is used when it covers as many values as
+    `df` has, otherwise one is built from `df`.
+    """
+    codes, categories = pd.factorize(df[x])
+    values = df[y].to_numpy(dtype=float)
+    # Sizes, value counts and maxima of every category in one pass each
+    known = codes >= 0
+    sizes = np.bincount(codes[known], minlength=len(categories))
+    present = np.bincount(codes[known & ~np.isnan(values)], minlength=len(categories))
+    highest = np.full(len(categories), -np.inf)
+    np.fmax.at(highest, codes[known], values[known])
+    stats = {}
+    for c in np.argsort(-highest, kind="stable"):
+        sketch = sketches.get(y, categories[c]) if sketches is not None and sizes[c] > exact_rows else None
+        if sketch is not None and sketch.count == present[c]:
+            stats[categories[c]] = sketch.box_stats()
+            continue
+        rows = np.flatnonzero(codes == c)
+        if len(rows) <= exact_rows:
+            box = exact_stats(values[rows])
+            box["outliers"] = rows[box["outliers"]]
+        else:
+            box = QuantileSketch().update(values[rows]).box_stats()
+        stats[categories[c]] = box
+    return stats
+
+
+def box(df, x: str, y: str, hover_data=None, log_y: bool = False, labels: dict = None, title: str = None,
+        exact_rows: int = EXACT_ROWS, sketches: CategorySketches = None, hovertemplate: str = None):
+    """Box plot of `y` per `x` category from precomputed statistics.
+
+    Each category gets one precomputed box trace and one marker trace of its
+    outliers, coloured like px.box(color=x). Outlier hover data is the
+    `hover_data` columns as customdata, shown with `hovertemplate`. Large
+    categories are drawn from `sketches` when given (see `category_stats`);
+    their outliers are values without rows, so their hover shows the value only.
+    """
+    labels = labels or {}
+    hover_data = list(hover_data or [])
+    value_only = f"<b>{labels.get(y, y)}:</b> %{{y}}<extra></extra>"
+    colors = plotly.colors.qualitative.Plotly
+    fig = go.Figure()
+    for i, (category, stats) in enumerate(category_stats(df, x, y, exact_rows, sketches).items()):
+        color = colors[i % len(colors)]
+        name = str(category)
+        fig.add_trace(go.Box(
+            x=[name], q1=[stats["q1"]], median=[stats["median"]], q3=[stats["q3"]],
+            lowerfence=[stats["lowerfence"]], upperfence=[stats["upperfence"]],
+            name=name, legendgroup=name, marker_color=color, boxpoints=False,
+        ))
+        if "outliers" in stats:
+            rows = df.iloc[stats["outliers"]]
+            points = rows[y].to_numpy()
+            customdata = np.column_stack([rows[c].to_numpy(dtype=object) for c in hover_data]) if hover_data else None
+            template = hovertemplate if customdata is not None else None
+        else:
+            points, customdata, template = stats["outlier_values"], None, value_only
+        fig.add_trace(go.Scatter(
+            x=[name] * len(points), y=points, customdata=customdata, hovertemplate=template, mode="markers",
+            name=name, legendgroup=name, showlegend=False, marker=dict(color=color, size=6),
+        ))
+    fig.update_layout(
+        title=title,
+        template="plotly",
+        boxmode="overlay",
+        xaxis_title=labels.get(x, x),
+        yaxis_title=labels.get(y, y),
+        yaxis_type="log" if log_y else None,
+    )
+    return fig
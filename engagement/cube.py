@@ -0,0 +1,149 @@
+"""Engagement aggregates of the posts feed, keyed by author x subreddit x period.
+
+The cube is built once per dataset version (see `engagement.data.load_cube`)
+and is orders of magnitude smaller than the raw feed. The pages slice and roll
+it up instead of grouping the raw posts on every rerun.
+
+Each row is a mergeable accumulator: the post count, the sums, and the sums of
+squared deviations from the mean (Welford's M2) of score and num_comments.
+Two accumulators combine exactly with Chan's parallel update (`merge`), so
+rollups get exact means and variances, and `Accumulators` can absorb newly
+appended posts by touching only the buckets they fall into.
+"""
+import numpy as np
+import pandas as pd
+
+from engagement import timebuckets
+
+KEYS = ["author", "subreddit", "period"]
+SUMS = ["posts", "score_sum", "comments_sum"]
+# Sum of squared deviations from the bucket mean, per metric
+DEVIATIONS = ["score_m2", "comments_m2"]
+METRICS = {"score": "score", "comments": "num_comments"}
+
+# Time-feature column holding the period start for each grain
+PERIOD_COLUMNS = {"day": "created_date_est", "week": "week_start", "month": "month"}
+
+
+def with_means(cube):
+    """Add score/comment means and standard deviations derived from the accumulators."""
+    cube["score_mean"] = cube["score_sum"] / cube["posts"]
+    cube["comments_mean"] = cube["comments_sum"] / cube["posts"]
+    if set(DEVIATIONS) <= set(cube.columns):
+        cube["score_std"] = np.sqrt(cube["score_m2"] / cube["posts"])
+        cube["comments_std"] = np.sqrt(cube["comments_m2"] / cube["posts"])
+    return cube
+
+
+def accumulate(df, grain: str = "week"):
+    """Accumulators of the posts in `df`, indexed by KEYS, without the derived means."""
+    if grain not in PERIOD_COLUMNS:
+        raise ValueError(f"Unknown grain {grain!r}, expected one of {timebuckets.GRAINS}")
+    if PERIOD_COLUMNS[grain] not in df:
+        df = timebuckets.add_time_features(df)
+    frame = pd.DataFrame({
+        "author": df["author"],
+        "subreddit": df["subreddit"],
+        "period": df[PERIOD_COLUMNS[grain]],
+        "score": df["score"].astype("float64"),
+        "num_comments": df["num_comments"].astype("float64"),
+    })
+    acc = frame.groupby(KEYS, observed=True).agg(
+        posts=("score", "size"),
+        score_sum=("score", "sum"),
+        comments_sum=("num_comments", "sum"),
+        score_var=("score", "var"),
+        comments_var=("num_comments", "var"),
+    )
+    for name in METRICS:
+        # var is the sample variance, M2 / (n - 1), and NaN for single posts
+        acc[f"{name}_m2"] = (acc.pop(f"{name}_var") * (acc["posts"] - 1)).fillna(0.0)
+    return acc[SUMS + DEVIATIONS]
+
+
+def build(df, grain: str = "week"):
+    """Aggregate posts into count, sum, mean and deviation of score and num_comments per key."""
+    return with_means(accumulate(df, grain).reset_index())
+
+
+def merge(a, b):
+    """Combine two aligned accumulator frames (Chan et al.'s parallel update)."""
+    n = a["posts"] + b["posts"]
+    out = pd.DataFrame({"posts": n}, index=a.index)
+    for name in METRICS:
+        total, m2 = f"{name}_sum", f"{name}_m2"
+        out[total] = a[total] + b[total]
+        delta = b[total] / b["posts"] - a[total] / a["posts"]
+        extra = (delta ** 2 * a["posts"] * b["posts"] / n).fillna(0.0)
+        out[m2] = a[m2] + b[m2] + extra
+    return out[SUMS + DEVIATIONS]
+
+
+def rollup(cube, by):
+    """Re-aggregate a (filtered) cube over the `by` columns."""
+    grouped = cube.groupby(by, observed=True)
+    out = grouped[SUMS].sum()
+    if set(DEVIATIONS) <= set(cube.columns):
+        # Combined M2 = sum of the parts' M2 + their spread around the combined mean
+        for name in METRICS:
+            total, m2 = f"{name}_sum", f"{name}_m2"
+            mean = grouped[total].transform("sum") / grouped["posts"].transform("sum")
+            spread = cube["posts"] * (cube[total] / cube["posts"] - mean) ** 2
+            out[m2] = (cube[m2] + spread).groupby([cube[c] for c in by], observed=True).sum()
+    return with_means(out.reset_index())
+
+
+def coarsen(cube, grain: str):
+    """Re-bucket a finer-grained cube (e.g. a filtered day cube) into `grain`."""
+    return rollup(cube.assign(period=timebuckets.bucket(cube["period"], grain)), KEYS)
+
+
+class Accumulators:
+    """Incrementally maintained cube of one grain.
+
+    New posts are folded into the buckets they fall into. Every other bucket
+    is left as is.
+
+    Attributes:
+        grain (str): Period grain of the buckets
+        table (DataFrame): Accumulators indexed by KEYS
+    """
+    def __init__(self, table, grain: str):
+        self.table = table
+        self.grain = grain
+        self._cube = None
+
+    @classmethod
+    def build(cls, df, grain: str = "week"):
+        return cls(accumulate(df, grain), grain)
+
+    @property
+    def cube(self):
+        """Accumulators plus their means, in the layout `build` returns."""
+        if self._cube is None:
+            self._cube = with_means(self.table.reset_index())
+        return self._cube
+
+    def add(self, df):
+        """Fold the posts in `df` into their buckets."""
+        if not len(df):
+            return self
+        batch = accumulate(df, self.grain)
+        position = self.table.index.get_indexer(batch.index)
+        known = position >= 0
+        rows = position[known]
+        merged = merge(self.table.iloc[rows], batch[known].set_axis(self.table.index[rows]))
+        table = _assign(self.table, rows, merged)
+        self.table = pd.concat([table, batch[~known]]) if (~known).any() else table
+        self._cube = None
+        return self
+
+
+def _assign(table, position, values):
+    """Copy of `table` with the rows at `position` replaced by `values`."""
+    table = table.copy()
+    for column in table.columns:
+        column_values = table[column].to_numpy().copy()
+        column_values[position] = values[column].to_numpy()
+        table[column] = column_values
+    return table
@@ -0,0 +1,318 @@
+"""Process-wide access to the datasets behind the dashboard pages.
+
+Every Streamlit session runs the page scripts in the same process, so the
+AMA table and posts feed are downloaded and parsed once and then shared. Sessions get a
+shallow view of the shared frame. `app.py` turns on pandas copy-on-write for
+the dashboard process, so adding or overwriting a column in one session does
+not leak into another. Importing this module leaves pandas' options alone.
+
+The feed location and refresh interval come from the environment:
+
+    ENGAGEMENT_POSTS_URL  path or URL of the posts JSONL feed
+    ENGAGEMENT_POSTS_PATH converted Parquet copy, preferred when present
+    ENGAGEMENT_POSTS_TTL  seconds before the feed is re-fetched (0 disables)
+    ENGAGEMENT_SNAPSHOTS_PATH  score/comment samples log of the snapshot poller
+    ENGAGEMENT_SHARED_DIR  memory-mapped copies shared by the worker processes
+
+Within a process the frames are shared by every session. Across worker
+processes the numeric and categorical-code columns are memory-mapped from
+one copy on disk (see `engagement.mapped`).
+"""
+import os
+import threading
+import time
+
+import pandas as pd
+
+from engagement import boxplot, cube, mapped, outliers, participants, scoring, search, storage, timebuckets, velocity
+
+POSTS_URL = os.environ.get(
+    "ENGAGEMENT_POSTS_URL",
+    "https://storage.googleapis.com/social-data-public/sports_reddit_posts.jsonl",
+)
+POSTS_TTL = float(os.environ.get("ENGAGEMENT_POSTS_TTL", 60 * 60))
+
+
+class SharedDataset:
+    """A frame that is loaded once per process and shared by every session.
+
+    Rows added with `append` survive reloads: they are added back to every
+    reloaded frame until it holds rows with the same `key`.
+
+    Attributes:
+        loader (callable): Zero-argument function returning a DataFrame
+        ttl (float): Seconds a loaded frame stays fresh. None or 0 means forever.
+        key (str): Column identifying a row, used to tell when the loader has
+            caught up with appended rows. Without it they are kept for good.
+        version (int): Incremented every time the frame is (re)loaded. Derived
+            results can be keyed on it.
+    """
+    def __init__(self, loader, ttl: float = None, key: str = None):
+        self.loader = loader
+        self.ttl = ttl
+        self.key = key
+        self.version = 0
+        self._frame = None
+        self._loaded_at = None
+        self._appended = None
+        self._derived = {}
+        self._updaters = {}
+        self._lock = threading.Lock()
+
+    def _is_stale(self):
+        if self._frame is None:
+            return True
+        return bool(self.ttl) and time.monotonic() - self._loaded_at > self.ttl
+
+    def _refresh(self):
+        if self._is_stale():
+            frame = self.loader()
+            if self._appended is not None:
+                pending = self._appended
+                if self.key is not None:
+                    pending = pending[~pending[self.key].isin(frame[self.key])]
+                if len(pending):
+                    frame, _ = _extend(frame, pending)
+                self._appended = pending if len(pending) else None
+            self._frame = frame
+            self._loaded_at = time.monotonic()
+            self._derived = {}
+            self.version += 1
+
+    def get(self):
+        """Return a read-only view of the frame, loading it if missing or expired.
+
+        Concurrent callers wait on the same load instead of starting their own.
+        """
+        with self._lock:
+            self._refresh()
+            frame = self._frame
+        return frame.copy(deep=False)
+
+    def derive(self, name: str, builder, update=None):
+        """Return `builder(frame)`, computed once per dataset version.
+
+        Results are dropped whenever the frame is reloaded, so they never
+        outlive the data they were built from. If `update` is given,
+        `append` brings the result up to date with `update(result, rows)`
+        instead of dropping it.
+        """
+        with self._lock:
+            if update is not None:
+                self._updaters[name] = update
+            self._refresh()
+            if name not in self._derived:
+                self._derived[name] = builder(self._frame.copy(deep=False))
+            result = self._derived[name]
+        return result.copy(deep=False) if isinstance(result, pd.DataFrame) else result
+
+    def append(self, rows):
+        """Add `rows` to the loaded frame without reloading it.
+
+        The rows get index labels following the frame's. Derived results
+        registered with an `update` function are updated with just these rows.
+        The others are rebuilt on next use. Reloads keep the rows (see `key`).
+        """
+        with self._lock:
+            self._refresh()
+            self._frame, rows = _extend(self._frame, rows)
+            derived = {}
+            for name, update in self._updaters.items():
+                if name in self._derived:
+                    derived[name] = update(self._derived[name], rows.copy(deep=False))
+            appended = rows.reset_index(drop=True)
+            self._appended = appended if self._appended is None else _extend(self._appended, appended)[0]
+            self._derived = derived
+            self.version += 1
+
+    def invalidate(self):
+        """Drop the cached frame so the next `get` reloads it. Appended rows are kept."""
+        with self._lock:
+            self._frame = None
+            self._loaded_at = None
+            self._derived = {}
+
+
+def _extend(frame, rows):
+    """`frame` with `rows` added under the next index labels, and the rows as added."""
+    frame, rows = _align_categories(frame, rows.set_axis(pd.RangeIndex(len(frame), len(frame) + len(rows))))
+    return pd.concat([frame, rows]), rows
+
+
+def _align_categories(frame, rows):
+    """`frame` and `rows` with each categorical column sharing the union of both categories."""
+    frame, rows = frame.copy(deep=False), rows.copy(deep=False)
+    for column in frame.columns[frame.dtypes == "category"]:
+        if column in rows:
+            categories = frame[column].cat.categories.union(pd.Index(rows[column].dropna().unique()))
+            frame[column] = frame[column].cat.set_categories(categories)
+            rows[column] = rows[column].astype(frame[column].dtype)
+    return frame, rows
+
+
+# Long text split off the shared frames, read only for the posts actually shown
+ama_text = storage.TextStore()
+posts_text = storage.TextStore()
+
+
+def read_ama():
+    """Compact AMA table, mapped from the shared copy; its `body` text goes to `ama_text`."""
+    # Either file changing rebuilds the shared copy; read_ama decides which one is current
+    source = [mapped.fingerprint(storage.AMA_PARQUET), mapped.fingerprint(storage.AMA_CSV)]
+    df, text = mapped.share(storage.SHARED_DIR / "nba-ama", source, storage.read_ama)
+    ama_text.reset(text)
+    return df
+
+
+def read_posts(source: str = None):
+    """Compact posts feed with local time features, mapped from the shared copy; its `selftext` goes to `posts_text`."""
+    source = source or POSTS_URL
+
+    def load():
+        df, text = storage.read_posts(source)
+        return timebuckets.add_time_features(df), text
+
+    # Either file changing rebuilds the shared copy; storage.read_posts decides which one is current.
+    # A feed read from a URL is downloaded again once the copy is older than the TTL.
+    local = [mapped.fingerprint(storage.POSTS_PARQUET), mapped.fingerprint(source)]
+    remote = not storage.POSTS_PARQUET.exists() and "://" in str(source)
+    df, text = mapped.share(storage.SHARED_DIR / "posts", local if any(local) else None, load,
+                            max_age=POSTS_TTL if remote else None)
+    posts_text.reset(text)
+    return df
+
+
+ama = SharedDataset(read_ama)
+posts = SharedDataset(read_posts, ttl=POSTS_TTL, key="id")
+
+
+def load_ama():
+    """Shared AMA table used by the AMAs page."""
+    return ama.get()
+
+
+def load_posts():
+    """Shared posts feed used by the Organic Tracker and Comparative Analysis pages."""
+    return posts.get()
+
+
+def load_post_text(ids, column: str = "selftext"):
+    """Text of `column` for the given post ids, in order."""
+    return posts_text.get(ids, column)
+
+
+def load_cube(grain: str = "week"):
+    """Engagement cube of the posts feed at `grain` (see `engagement.cube`).
+
+    The accumulators are built once per feed load. Posts added with
+    `append_posts` only update the buckets they fall into.
+    """
+    return posts.derive(
+        f"cube_{grain}",
+        lambda df: cube.Accumulators.build(df, grain),
+        update=lambda accumulators, rows: accumulators.add(rows),
+    ).cube.copy(deep=False)
+
+
+def load_participants():
+    """Participant index of the AMA table, without unattributed threads (see `engagement.participants`)."""
+    return ama.derive("participants", lambda df: participants.ParticipantIndex.build(df[df["name"] != "Unknown"]))
+
+
+def load_outliers():
+    """Outlier bitsets of AMA comments and upvotes, without unattributed threads (see `engagement.outliers`)."""
+    return ama.derive("outliers", lambda df: outliers.OutlierMasks.build(
+        df[df["name"] != "Unknown"], ["num_comments", "score"], by="category"))
+
+
+def load_ama_sketches(include_outliers: bool = True):
+    """Comment and upvote sketches of each AMA category, without unattributed threads (see `engagement.boxplot`).
+
+    The sketches over every thread are merged with appended rows. Those over
+    the threads left by `load_outliers` are rebuilt, as the bounds move too.
+    """
+    if include_outliers:
+        return ama.derive(
+            "box_sketches",
+            lambda df: boxplot.CategorySketches.build(df[df["name"] != "Unknown"], "category", ["num_comments", "score"]),
+            update=lambda sketches, rows: sketches.add(rows[rows["name"] != "Unknown"]),
+        )
+    masks = load_outliers()
+    return ama.derive("box_sketches_inliers", lambda df: boxplot.CategorySketches.build(
+        masks.select(df[df["name"] != "Unknown"], ["num_comments", "score"]), "category", ["num_comments", "score"]))
+
+
+def load_ama_scores():
+    """Engagement scores of the AMA threads within their category and year (see `engagement.scoring`)."""
+    return ama.derive("scores", lambda df: scoring.score(df.assign(year=df["date"].dt.year), ["category", "year"]))
+
+
+def load_post_scores():
+    """Engagement scores of the posts within their subreddit and month (see `engagement.scoring`)."""
+    return posts.derive(
+        "scores",
+        lambda df: scoring.EngagementScores(df, ["subreddit", "month"]),
+        update=lambda scores, rows: scores.append(rows),
+    ).frame
+
+
+def _load_index(df, store, column, path):
+    """Index of `df`'s titles and `store`'s `column`, keyed on the text file without reading it when there is one."""
+    texts = lambda: [df["title"], store.get(df["id"], column)]
+    key = [df["title"], store.fingerprint()] if store.fingerprint() is not None else None
+    return search.load_or_build(df, texts, path, key)
+
+
+def load_ama_index():
+    """Full-text index of AMA titles and bodies (see `engagement.search`)."""
+    return ama.derive("search", lambda df: _load_index(df, ama_text, "body", search.index_path(storage.AMA_PARQUET)))
+
+
+def load_post_index():
+    """Full-text index of post titles and selftext (see `engagement.search`)."""
+    return posts.derive("search", lambda df: _load_index(
+        df, posts_text, "selftext", search.index_path(storage.POSTS_PARQUET)))
+
+
+def load_velocity():
+    """Velocity samples of recent posts, None until the snapshot poller has run (see `engagement.velocity`)."""
+    return velocity.load(storage.SNAPSHOTS)
+
+
+def append_posts(records):
+    """Add new posts (raw feed records, e.g. from the ingest pipeline) to the shared feed.
+
+    The cubes and engagement scores are updated with just these posts
+    instead of being rebuilt over the whole feed. The posts are kept across
+    feed reloads until the feed has them.
+    """
+    df, text = storage.split_text(storage.apply_schema(pd.DataFrame(records), storage.POSTS_SCHEMA),
+                                  storage.POSTS_TEXT)
+    posts_text.append(text)
+    posts.append(timebuckets.add_time_features(df))
+
+
+def invalidate_posts():
+    """Force the posts feed to be re-fetched on next access."""
+    posts.invalidate()
+
+
+def memory_report(df=None):
+    """Bytes held by each column of `df`, or of every shared dataset if omitted.
+
+    Returns:
+        DataFrame: dataset, column, dtype, bytes and bytes_per_row, largest first
+    """
+    frames = {"frame": df} if df is not None else {"ama": load_ama(), "posts": load_posts()}
+    rows = []
+    for name, frame in frames.items():
+        usage = frame.memory_usage(deep=True, index=False)
+        for column, nbytes in usage.items():
+            rows.append({
+                "dataset": name,
+                "column": column,
+                "dtype": str(frame[column].dtype),
+                "bytes": int(nbytes),
+                "bytes_per_row": nbytes / max(len(frame), 1),
+            })
+    return pd.DataFrame(rows).sort_values("bytes", ascending=False, ignore_index=True)
@@ -0,0 +1,83 @@
+"""Process-wide LRU cache of built Plotly figures.
+
+Building a figure with plotly.express and its `update_layout` calls costs far
+more than restoring it from its JSON. Pages wrap each figure in
+`cached_figure(figure_id, version, builder, **widget_state)`, so toggling a
+widget back to a state that was already seen by any session just restores
+the stored JSON. Entries are keyed by dataset version, figure id and the widget
+values the figure depends on. The least recently used entries are evicted once
+the JSON held exceeds ENGAGEMENT_FIGURE_CACHE_MB (default 64).
+"""
+import os
+import threading
+from collections import OrderedDict
+
+import plotly.io as pio
+
+MAX_BYTES = int(float(os.environ.get("ENGAGEMENT_FIGURE_CACHE_MB", 64)) * 2**20)
+
+
+class FigureCache:
+    """LRU map of figure key -> figure JSON, bounded by total JSON size.
+
+    Attributes:
+        max_bytes (int): Upper bound on the summed size of stored JSON strings
+        hits (int): Lookups served from the cache
+        misses (int): Lookups that had to build the figure
+    """
+    def __init__(self, max_bytes: int = MAX_BYTES):
+        self.max_bytes = max_bytes
+        self.nbytes = 0
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def get(self, key, builder):
+        """Figure for `key`, built with `builder()` and stored on a miss."""
+        with self._lock:
+            payload = self._entries.get(key)
+            if payload is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+        if payload is None:
+            payload = builder().to_json()
+            self._store(key, payload)
+        return pio.from_json(payload, skip_invalid=True)
+
+    def _store(self, key, payload: str):
+        size = len(payload)
+        with self._lock:
+            self.misses += 1
+            if size > self.max_bytes or key in self._entries:
+                return
+            self._entries[key] = payload
+            self.nbytes += size
+            while self.nbytes > self.max_bytes:
+                _, evicted = self._entries.popitem(last=False)
+                self.nbytes -= len(evicted)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.nbytes = 0
+
+
+figures = FigureCache()
+
+
+def _hashable(value):
+    if isinstance(value, (list, tuple, set)):
+        return tuple(_hashable(v) for v in value)
+    if isinstance(value, dict):
+        return tuple(sorted((k, _hashable(v)) for k, v in value.items()))
+    return value
+
+
+def cached_figure(figure_id: str, version, builder, **state):
+    """Figure `figure_id` of dataset `version` for the given widget `state`."""
+    key = (figure_id, version, _hashable(state))
+    return figures.get(key, builder)
@@ -0,0 +1,40 @@
+"""Start the dashboard server with the datasets already loading.
+
+`streamlit run app.py` only runs app.py when the first visitor connects, so
+a warm-up started from there still has that visitor wait for the feed. This
+launcher starts the warm-up in the server process before handing over to
+Streamlit, so the datasets load while nobody is waiting:
+
+    python -m engagement.launch [streamlit run options]
+
+    python -m engagement.launch --server.port=8080 --server.headless=true
+
+The options are those of `streamlit run`. app.py's own call to
+`warmup.start()` then finds the thread running; it remains the fallback
+where the app is started with `streamlit run app.py`.
+"""
+from engagement import warmup  # first, so the startup timeline starts with the process
+
+import pathlib
+import sys
+
+import pandas as pd
+from streamlit.web import cli
+
+from engagement import data  # noqa: F401  imported up front, as the warm-up needs it
+
+APP = pathlib.Path(__file__).resolve().parent.parent / "app.py"
+
+
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else argv
+    warmup.timeline.mark("imported")
+    # As in app.py: session views of the shared frames never write through to them
+    pd.set_option("mode.copy_on_write", True)
+    warmup.start()
+    # Streamlit's own `run` command parses the options and calls bootstrap.run
+    return cli.main(["run", str(APP), *argv], prog_name="streamlit", standalone_mode=False)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
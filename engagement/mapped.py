@@ -0,0 +1,189 @@
+"""Datasets shared read-only across worker processes through memory mapping.
+
+Each Streamlit worker process used to parse the AMA table and the posts feed
+into its own heap. `share` instead keeps a converted copy of a frame on disk:
+
+    <name>.bin           numeric, bool, datetime and categorical-code columns,
+                         raw and 64-byte aligned
+    <name>.json          header: fingerprint of the source, row count, and each
+                         column's dtype, offset and categories
+    <name>.rest.parquet  the remaining (string) columns
+    <name>.text.parquet  text split off the frame, when it was not in a file yet
+
+Every process maps `<name>.bin` read-only and builds its frame on views of
+the mapping, so the columns of N processes share the same physical pages
+from the page cache. Only the string columns and the categories are per
+process. The copy is rebuilt when the source's fingerprint changes. A remote
+source (a URL) cannot be checked for changes without downloading it, so its
+copy is instead rebuilt once it is older than the `max_age` given to `share`:
+the first process downloads the feed and writes the copy, the others map it.
+
+The frames are read-only: writing into a mapped column raises. Pages derive
+new columns or frames instead, as they already do under copy-on-write.
+"""
+import json
+import os
+import pathlib
+import threading
+import time
+
+import numpy as np
+import pandas as pd
+
+from engagement import storage
+
+ALIGN = 64
+
+
+def fingerprint(path):
+    """Identity of a source: path, size and mtime of a local file, the URL of a remote one. None if missing."""
+    if "://" in str(path):
+        return [str(path)]
+    path = pathlib.Path(str(path))
+    if not path.exists():
+        return None
+    stat = path.stat()
+    return [str(path.resolve()), stat.st_size, stat.st_mtime_ns]
+
+
+def paths(path):
+    """Data, header, rest and text files of the shared copy at `path` (without suffix)."""
+    path = pathlib.Path(path)
+    return (path.with_name(f"{path.name}.bin"), path.with_name(f"{path.name}.json"),
+            path.with_name(f"{path.name}.rest.parquet"), path.with_name(f"{path.name}.text.parquet"))
+
+
+def _kind(series):
+    """How a column is mapped: array, datetime or category. None for columns kept in the rest file."""
+    dtype = series.dtype
+    if isinstance(dtype, pd.CategoricalDtype):
+        return "category" if dtype.categories.dtype == object else None
+    if dtype.kind == "M" or isinstance(dtype, pd.DatetimeTZDtype):
+        return "datetime"
+    if dtype.kind in "biuf":
+        return "array"
+    return None
+
+
+def _raw(series, kind):
+    """The column's values as they are stored in the data file."""
+    if kind == "category":
+        return series.cat.codes.to_numpy()
+    if kind == "datetime":
+        return series.array.asi8
+    return series.to_numpy()
+
+
+def save(df, path, source_fingerprint, text=None):
+    """Write the shared copy of `df` (and its `text`, a frame or a file path) at `path`."""
+    data_file, header_file, rest_file, text_file = paths(path)
+    data_file.parent.mkdir(parents=True, exist_ok=True)
+    suffix = f".{os.getpid()}.tmp"
+    columns, rest, offset = [], [], 0
+    with open(f"{data_file}{suffix}", "wb") as f:
+        for name in df.columns:
+            kind = _kind(df[name])
+            if kind is None:
+                rest.append(name)
+                continue
+            values = np.ascontiguousarray(_raw(df[name], kind))
+            f.write(b"\0" * (-offset % ALIGN))
+            offset += -offset % ALIGN
+            column = {"name": name, "kind": kind, "dtype": str(df[name].dtype),
+                      "values": values.dtype.str, "offset": offset}
+            if kind == "category":
+                column["categories"] = df[name].cat.categories.tolist()
+                column["ordered"] = bool(df[name].cat.ordered)
+            columns.append(column)
+            f.write(values.tobytes())
+            offset += values.nbytes
+    df[rest].to_parquet(f"{rest_file}{suffix}", index=False)
+    if isinstance(text, pd.DataFrame):
+        storage.write_text(text, f"{text_file}{suffix}")
+        os.replace(f"{text_file}{suffix}", text_file)
+        text = text_file
+    header = {"fingerprint": source_fingerprint, "saved_at": time.time(), "rows": len(df), "order": list(df.columns),
+              "columns": columns, "text": str(text) if text is not None else None}
+    with open(f"{header_file}{suffix}", "w") as f:
+        json.dump(header, f)
+    os.replace(f"{data_file}{suffix}", data_file)
+    os.replace(f"{rest_file}{suffix}", rest_file)
+    # The header goes last: readers only trust a copy whose header matches
+    os.replace(f"{header_file}{suffix}", header_file)
+
+
+_mappings = {}
+_lock = threading.Lock()
+
+
+def _mapping(data_file):
+    """Read-only mapping of `data_file`, shared by every attach in the process until the file is replaced."""
+    stat = os.stat(data_file)
+    key = (str(data_file), stat.st_ino, stat.st_size, stat.st_mtime_ns)
+    with _lock:
+        if key not in _mappings:
+            # Drop mappings of replaced files; frames built on them keep them alive
+            for old in [k for k in _mappings if k[0] == key[0]]:
+                del _mappings[old]
+            # Plain ndarray view, so nothing downstream sees the memmap subclass
+            _mappings[key] = np.memmap(data_file, mode="r").view(np.ndarray) if stat.st_size \
+                else np.empty(0, dtype=np.uint8)
+        return _mappings[key]
+
+
+def attach(path, source_fingerprint=None, max_age: float = None):
+    """Frame and text location of the shared copy at `path`, built on a read-only mapping.
+
+    Returns:
+        tuple: (frame, text) or None when there is no copy, it was built
+        from a different source or it was saved more than `max_age` seconds ago
+    """
+    data_file, header_file, rest_file, _ = paths(path)
+    try:
+        with open(header_file) as f:
+            header = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if source_fingerprint is not None and header["fingerprint"] != source_fingerprint:
+        return None
+    if max_age and time.time() - header.get("saved_at", 0) > max_age:
+        return None
+    rows = header["rows"]
+    buffer = _mapping(data_file)
+    columns = {}
+    for column in header["columns"]:
+        values = np.dtype(column["values"])
+        values = buffer[column["offset"]:column["offset"] + rows * values.itemsize].view(values)
+        if column["kind"] == "category":
+            dtype = pd.CategoricalDtype(column["categories"], ordered=column["ordered"])
+            values = pd.Categorical.from_codes(values, dtype=dtype, validate=False)
+        elif column["kind"] == "datetime":
+            values = pd.array(values, dtype=pd.api.types.pandas_dtype(column["dtype"]), copy=False)
+        columns[column["name"]] = values
+    rest = pd.read_parquet(rest_file)
+    for name in rest.columns:
+        # Per-process columns stay writable: pandas' object-column helpers (memory_usage) need that
+        columns[name] = rest[name].to_numpy(copy=True)
+    frame = pd.DataFrame({name: columns[name] for name in header["order"]}, copy=False)
+    return frame, header["text"]
+
+
+def share(path, source_fingerprint, loader, max_age: float = None):
+    """`loader()`'s (frame, text), served from the shared copy at `path` when it is current.
+
+    A process that finds the copy missing, stale or older than `max_age`
+    seconds runs `loader`, writes the copy and drops its own frame for the
+    mapped one. Processes racing to write replace the files atomically with
+    the same content. Missing sources (no fingerprint) and frames without a
+    default RangeIndex are not shared and come straight from `loader`.
+    """
+    if source_fingerprint is None:
+        return loader()
+    shared = attach(path, source_fingerprint, max_age)
+    if shared is not None:
+        return shared
+    df, text = loader()
+    if not df.index.equals(pd.RangeIndex(len(df))):
+        return df, text
+    save(df, path, source_fingerprint, text)
+    return attach(path, source_fingerprint)
@@ -0,0 +1,66 @@
+"""Prepared per-account views for the Organic Tracker page.
+
+The page shows one account at a time. `load_view` returns that account's
+posts and daily cube rows, filtered once per dataset version and shared by
+every session. `prefetch` prepares the other accounts in a background thread
+so switching to them does not have to wait for the filtering.
+"""
+import threading
+
+from engagement.data import load_cube, posts
+
+# Tab label -> account
+ACCOUNTS = {'NBA': 'nba', 'NFL': 'nfl', 'NHL': 'nhl', 'MLB': 'MLBOfficial'}
+
+_started = set()
+_started_lock = threading.Lock()
+
+
+def prepare_view(df, daily, author: str, exclude_ads: bool):
+    """Posts and daily cube rows of `author`, optionally without ad posts.
+
+    Ads are the posts made to the account's own `u_` profile subreddit.
+    """
+    posts_mask = df['author'] == author
+    daily_mask = daily['author'] == author
+    if exclude_ads:
+        posts_mask &= ~df['subreddit'].str.contains('u_')
+        daily_mask &= ~daily['subreddit'].str.contains('u_')
+    return {'posts': df[posts_mask], 'daily': daily[daily_mask]}
+
+
+def load_view(author: str, exclude_ads: bool):
+    """Prepared view of `author`, built once per posts dataset version."""
+    daily = load_cube('day')
+    view = posts.derive(
+        f"organic_{author}_{exclude_ads}",
+        lambda df: prepare_view(df, daily, author, exclude_ads),
+    )
+    return {name: frame.copy(deep=False) for name, frame in view.items()}
+
+
+def warm(authors, exclude_ads: bool):
+    """Prepare every view in `authors`.
+
+    Their posts' text is not read ahead: a page reads just the row groups of
+    the posts it shows.
+    """
+    for author in authors:
+        load_view(author, exclude_ads)
+
+
+def prefetch(authors, exclude_ads: bool):
+    """Warm `authors` in a daemon thread, at most once per dataset version.
+
+    Returns:
+        threading.Thread or None: The started thread, or None if these views
+        are already being (or have been) prepared
+    """
+    key = (posts.version, tuple(authors), exclude_ads)
+    with _started_lock:
+        if key in _started:
+            return None
+        _started.add(key)
+    thread = threading.Thread(target=warm, args=(list(authors), exclude_ads), name="organic-prefetch", daemon=True)
+    thread.start()
+    return thread
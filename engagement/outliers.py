@@ -0,0 +1,91 @@
+"""Outlier masks of a table, computed once per dataset version.
+
+A row is an outlier in a column when it falls more than `WHISKER` spreads
+beyond the `LOW`-`HIGH` quantile range of that column, either over the
+whole table or within its category. `OutlierMasks.build` computes every
+threshold in one pass (see `engagement.data.load_outliers`). It stores which
+rows to keep as packed bitsets, one bit per row. Excluding outliers is then
+a bitwise AND of a few bitsets, not a quantile scan and a frame copy per
+column.
+
+Other row filters can join the AND: `pack` turns any boolean mask over the
+same rows into a bitset.
+"""
+import numpy as np
+import pandas as pd
+
+LOW, HIGH = 0.05, 0.95
+WHISKER = 1.5
+# Scope of the thresholds computed over the whole table
+ALL = "all"
+
+
+def pack(mask):
+    """Bitset of a boolean mask, 8 rows per byte."""
+    return np.packbits(np.asarray(mask, dtype=bool))
+
+
+def unpack(bits, rows: int):
+    """Boolean mask of the first `rows` rows of a bitset."""
+    return np.unpackbits(bits, count=rows).view(bool)
+
+
+def fences(low, high, whisker: float = WHISKER):
+    """Bounds of the rows to keep, `whisker` spreads beyond the `low`-`high` range."""
+    spread = high - low
+    return low - whisker * spread, high + whisker * spread
+
+
+class OutlierMasks:
+    """Per-column, per-scope bitsets of the rows that are not outliers.
+
+    Attributes:
+        labels (Index): Row labels of the table, in bit order
+        thresholds (DataFrame): Lower and upper bound of each column, indexed
+            by (scope, column, group); group is None for the ALL scope
+        bits (dict): (scope, column) -> packed bitset of the rows within bounds
+    """
+    def __init__(self, labels, thresholds, bits):
+        self.labels = labels
+        self.thresholds = thresholds
+        self.bits = bits
+
+    def __len__(self):
+        return len(self.labels)
+
+    @classmethod
+    def build(cls, df, columns, by: str = None):
+        """Thresholds and bitsets of `columns`, over the whole table and within each `by` group."""
+        bits, thresholds = {}, []
+        codes = groups = None
+        if by is not None:
+            codes, groups = pd.factorize(df[by])
+        for column in columns:
+            values = df[column].to_numpy(dtype=float)
+            lower, upper = fences(*np.nanquantile(values, [LOW, HIGH]))
+            bits[ALL, column] = pack((values >= lower) & (values <= upper))
+            thresholds.append((ALL, column, None, lower, upper))
+            if by is None:
+                continue
+            found = codes >= 0
+            quantiles = pd.Series(values[found]).groupby(codes[found]).quantile([LOW, HIGH]).unstack()
+            lower, upper = fences(quantiles[LOW].to_numpy(), quantiles[HIGH].to_numpy())
+            row_lower = np.where(found, lower[np.maximum(codes, 0)], -np.inf)
+            row_upper = np.where(found, upper[np.maximum(codes, 0)], np.inf)
+            bits[by, column] = pack((values >= row_lower) & (values <= row_upper))
+            thresholds.extend((by, column, group, lo, hi) for group, lo, hi in zip(groups, lower, upper))
+        thresholds = pd.DataFrame(thresholds, columns=["scope", "column", "group", "lower", "upper"])
+        return cls(df.index, thresholds.set_index(["scope", "column", "group"]), bits)
+
+    def keep(self, columns, scope: str = ALL, filters=()):
+        """Bitset of the rows within bounds in every one of `columns`, ANDed with the `filters` bitsets."""
+        return np.bitwise_and.reduce([self.bits[scope, column] for column in columns] + list(filters))
+
+    def select(self, df, columns, scope: str = ALL):
+        """Rows of `df` (a subset of the indexed table) that are not outliers in any of `columns`.
+
+        Rows of `df` missing from the index are kept.
+        """
+        keep = unpack(self.keep(columns, scope), len(self.labels))
+        position = self.labels.get_indexer(df.index)
+        return df[np.where(position >= 0, keep[position], True)]
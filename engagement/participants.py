@@ -0,0 +1,99 @@
+"""Per-participant index of the AMA table.
+
+The AMAs page needs, per participant name: how many threads mention them,
+their mean comments and upvotes, their first and best thread, and their rows
+for highlighting and drilldowns. `ParticipantIndex.build` does one pass over
+the frame at load time (see `engagement.data.load_participants`):
+
+- `stats` holds one row per name, already in top-N order. `top(n)` is a
+  slice and `profile(name)` is a hash lookup.
+- The frame's row labels are grouped by name in CSR layout:
+  `labels[offsets[k]:offsets[k + 1]]` are the rows of the k-th name, oldest
+  first. `rows(name)` is O(k) in that name's thread count.
+"""
+import numpy as np
+import pandas as pd
+
+
+class ParticipantIndex:
+    """Name -> engagement summary and rows of the AMA table.
+
+    Attributes:
+        stats (DataFrame): Indexed by name, sorted by thread count then mean
+            upvotes. Columns: threads, comments_mean, score_mean, first_date,
+            first_title, first_link, best_score, best_title, best_link
+        labels (ndarray): Row labels of the frame grouped by name, oldest first
+        offsets (ndarray): Start of each name's slice of `labels`, keyed by
+            `positions`
+        positions (dict): Name -> its slot in `offsets`
+    """
+    def __init__(self, stats, labels, offsets, positions):
+        self.stats = stats
+        self.labels = labels
+        self.offsets = offsets
+        self.positions = positions
+
+    def __len__(self):
+        return len(self.stats)
+
+    def __contains__(self, name):
+        return name in self.positions
+
+    @classmethod
+    def build(cls, df):
+        """Index the `name`, `date`, `score`, `num_comments`, `title` and `link` columns of `df`."""
+        codes, names = pd.factorize(df["name"])
+        found = codes >= 0
+        # Group rows by name, oldest thread first within each name
+        order = np.lexsort((df["date"].to_numpy()[found], codes[found]))
+        rows = np.flatnonzero(found)[order]
+        counts = np.bincount(codes[found], minlength=len(names))
+        offsets = np.zeros(len(names) + 1, dtype=np.int64)
+        np.cumsum(counts, out=offsets[1:])
+
+        grouped = codes[rows]
+        score = df["score"].to_numpy(dtype=np.int64)
+        comments = df["num_comments"].to_numpy(dtype=np.int64)
+        first = rows[offsets[:-1]]
+        # Best thread: highest score, earliest on ties
+        by_score = rows[np.lexsort((np.arange(len(rows)), -score[rows], grouped))]
+        best = by_score[offsets[:-1]]
+
+        title, link, date = df["title"].to_numpy(), df["link"].to_numpy(), df["date"].to_numpy()
+        stats = pd.DataFrame({
+            "threads": counts,
+            "comments_mean": np.bincount(grouped, comments[rows], len(names)) / np.maximum(counts, 1),
+            "score_mean": np.bincount(grouped, score[rows], len(names)) / np.maximum(counts, 1),
+            "first_date": date[first],
+            "first_title": title[first],
+            "first_link": link[first],
+            "best_score": score[best],
+            "best_title": title[best],
+            "best_link": link[best],
+        }, index=pd.Index(np.asarray(names, dtype=object), name="name"))
+        stats = stats.iloc[np.lexsort((-stats["score_mean"].to_numpy(), -stats["threads"].to_numpy()))]
+        return cls(
+            stats=stats,
+            labels=df.index.to_numpy()[rows],
+            offsets=offsets,
+            positions={name: k for k, name in enumerate(names)},
+        )
+
+    def top(self, n: int = 10):
+        """Summary of the `n` names mentioned in the most threads."""
+        return self.stats.iloc[:n]
+
+    def profile(self, name):
+        """Summary row of `name`."""
+        return self.stats.loc[name]
+
+    def rows(self, name):
+        """Row labels of `name`'s threads, oldest first. Empty for unknown names."""
+        k = self.positions.get(name)
+        if k is None:
+            return self.labels[:0]
+        return self.labels[self.offsets[k]:self.offsets[k + 1]]
+
+    def highlight(self, df, name):
+        """Boolean mask over `df` marking `name`'s threads."""
+        return df.index.isin(self.rows(name))
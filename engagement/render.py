@@ -0,0 +1,78 @@
+"""Scatter plots that stay fast in the browser as the feeds grow.
+
+`px.scatter` draws every point as SVG and ships every row's hover data.
+`scatter` switches to WebGL above `WEBGL_POINTS` and, above `MAX_POINTS`,
+decimates server-side first: points are binned on a 2D grid (in log space
+for log axes) and only the most engaged point of each cell is kept. The top
+`KEEP_TOP` posts by x and by y are always kept, so the outliers people click
+for their link never disappear.
+
+Both thresholds can be overridden with ENGAGEMENT_WEBGL_POINTS and
+ENGAGEMENT_MAX_POINTS.
+"""
+import os
+
+import numpy as np
+import pandas as pd
+
+WEBGL_POINTS = int(os.environ.get("ENGAGEMENT_WEBGL_POINTS", 1_000))
+MAX_POINTS = int(os.environ.get("ENGAGEMENT_MAX_POINTS", 20_000))
+KEEP_TOP = 200
+
+
+def axis_values(series, log: bool = False):
+    """Float positions of `series` as drawn on a linear or log axis."""
+    if isinstance(series.dtype, pd.DatetimeTZDtype):
+        series = series.dt.tz_localize(None)
+    if np.issubdtype(series.dtype, np.datetime64):
+        return series.to_numpy().astype("datetime64[ns]").astype(np.int64).astype(float)
+    values = series.to_numpy(dtype=float)
+    return np.log10(np.clip(values, 0, None) + 1) if log else values
+
+
+def grid_cells(values, bins: int):
+    """Index of the `bins`-wide grid cell each value falls into."""
+    low, high = np.nanmin(values), np.nanmax(values)
+    span = high - low or 1.0
+    return np.minimum(((values - low) / span * bins).astype(np.int64), bins - 1)
+
+
+def decimate(df, x: str, y: str, log_x: bool = False, log_y: bool = False, color: str = None,
+             max_points: int = MAX_POINTS, keep_top: int = KEEP_TOP):
+    """Reduce `df` to roughly `max_points` rows that preserve the scatter's shape.
+
+    Keeps the highest-`y` point per grid cell (per `color` group) plus the top
+    `keep_top` rows by `x` and by `y`. Frames within budget are returned unchanged.
+    """
+    if len(df) <= max_points:
+        return df
+    xs, ys = axis_values(df[x], log_x), axis_values(df[y], log_y)
+    groups = 1
+    key = np.zeros(len(df), dtype=np.int64)
+    if color is not None:
+        codes, uniques = pd.factorize(df[color])
+        # factorize marks missing values -1; give them their own group
+        key, groups = codes.astype(np.int64) + 1, len(uniques) + 1
+    bins = max(int(np.sqrt(max_points / groups)), 1)
+    key = (key * bins + grid_cells(xs, bins)) * bins + grid_cells(ys, bins)
+
+    # First row of each cell after sorting by cell, then by descending y
+    order = np.lexsort((-ys, key))
+    _, first = np.unique(key[order], return_index=True)
+    keep = order[first]
+    if keep_top:
+        top = min(keep_top, len(df))
+        keep = np.concatenate([keep, np.argpartition(-xs, top - 1)[:top], np.argpartition(-ys, top - 1)[:top]])
+    return df.iloc[np.unique(keep)]
+
+
+def scatter(df, x: str, y: str, log_x: bool = False, log_y: bool = False, color: str = None,
+            max_points: int = MAX_POINTS, webgl_points: int = WEBGL_POINTS, **kwargs):
+    """`px.scatter` that decimates above `max_points` and uses WebGL above `webgl_points`."""
+    # plotly.express is slow to import and not needed when the figure cache hits
+    import plotly.express as px
+
+    total = len(df)
+    df = decimate(df, x, y, log_x=log_x, log_y=log_y, color=color, max_points=max_points)
+    kwargs.setdefault("render_mode", "webgl" if total > webgl_points else "svg")
+    return px.scatter(df, x=x, y=y, log_x=log_x, log_y=log_y, color=color, **kwargs)
@@ -0,0 +1,136 @@
+"""Normalized engagement scores, the "thermometer" reading of each post.
+
+Raw upvotes and comment counts are not comparable across subreddits or
+months. `EngagementScores` puts every post on a common scale within its
+group (e.g. subreddit x month):
+
+    <metric>_pct   percentile of the post within its group, 0-100
+    <metric>_z     z-score of log1p(value) within its group
+    comment_ratio  comments per upvote
+    engagement     mean of the score and comment percentiles
+
+All of it is computed in bulk with NumPy. Percentiles come from one sorted
+array per metric: group code and log value are folded into a single float key,
+so a `searchsorted` on the sorted keys gives each post's rank inside its group
+directly. Means and variances come from per-group count/sum/sum-of-squares
+kept with `bincount`.
+
+`append` adds new posts without re-sorting: the new keys are merged into the
+sorted arrays and the running sums, and only the groups that received posts
+are re-scored.
+"""
+import numpy as np
+import pandas as pd
+
+METRICS = {"score": "score", "num_comments": "comments"}
+
+
+class EngagementScores:
+    """Engagement scores of a frame, grouped by the `by` columns.
+
+    Attributes:
+        by (list): Columns defining a group
+        groups (Index): Group keys; a row's group code is its position here
+        index (Index): Labels of the scored posts, in the order they were added
+        block (ndarray): Score columns of every post, one row per post
+    """
+    def __init__(self, df, by):
+        self.by = list(by)
+        self.groups = pd.MultiIndex.from_arrays([[] for _ in self.by], names=self.by) if len(self.by) > 1 \
+            else pd.Index([], name=self.by[0])
+        self.codes = np.empty(0, dtype=np.int64)
+        self.values = {metric: np.empty(0) for metric in METRICS}
+        self.sorted_keys = {metric: np.empty(0) for metric in METRICS}
+        self.sums = {metric: np.zeros((3, 0)) for metric in METRICS}
+        self.index = df.index[:0]
+        self.block = np.empty((0, len(self.columns())))
+        self.append(df)
+
+    @property
+    def frame(self):
+        """Scores of every post so far, aligned with the appended frames."""
+        return pd.DataFrame(self.block, index=self.index, columns=self.columns())
+
+    @staticmethod
+    def columns():
+        names = [f"{name}_{kind}" for name in METRICS.values() for kind in ("pct", "z")]
+        return names + ["comment_ratio", "engagement"]
+
+    def _group_codes(self, df):
+        """Codes of the groups of `df`, adding groups not seen before."""
+        keys = pd.MultiIndex.from_frame(df[self.by]) if len(self.by) > 1 else pd.Index(df[self.by[0]])
+        codes = self.groups.get_indexer(keys)
+        new = codes < 0
+        if new.any():
+            added = keys[new].unique()
+            self.groups = self.groups.append(added) if len(self.groups) else added
+            codes[new] = len(self.groups) - len(added) + added.get_indexer(keys[new])
+        return codes.astype(np.int64)
+
+    def _key(self, codes, values):
+        # log1p values are < 30 for any count below 1e13; fold the group code
+        # above them so one sort orders by group, then value
+        return codes * 32.0 + values
+
+    def append(self, df):
+        """Add the posts in `df` and re-score every group they fall into.
+
+        Returns:
+            EngagementScores: self
+        """
+        if not len(df):
+            return self
+        codes = self._group_codes(df)
+        groups = len(self.groups)
+        for metric in METRICS:
+            values = np.log1p(np.clip(df[metric].to_numpy(dtype=np.float64), 0, None))
+            keys = np.sort(self._key(codes, values))
+            existing = self.sorted_keys[metric]
+            self.sorted_keys[metric] = np.insert(existing, np.searchsorted(existing, keys), keys)
+            sums = np.zeros((3, groups))
+            sums[:, :self.sums[metric].shape[1]] = self.sums[metric]
+            for power in range(3):
+                sums[power] += np.bincount(codes, values ** power, minlength=groups)
+            self.sums[metric] = sums
+            self.values[metric] = np.concatenate([self.values[metric], values])
+        self.codes = np.concatenate([self.codes, codes])
+        new = np.full((len(df), len(self.columns())), np.nan)
+        new[:, self.columns().index("comment_ratio")] = (
+            df["num_comments"].to_numpy(dtype=np.float64) / np.maximum(df["score"].to_numpy(dtype=np.float64), 1)
+        )
+        self.block = np.concatenate([self.block, new])
+        self.index = self.index.append(df.index)
+        touched = np.isin(self.codes, np.unique(codes))
+        self._score(np.flatnonzero(touched))
+        return self
+
+    def _score(self, rows):
+        """Recompute the percentile and z-score columns of the rows at `rows`."""
+        codes = self.codes[rows]
+        result = {}
+        for metric, name in METRICS.items():
+            values = self.values[metric][rows]
+            count, total, squares = self.sums[metric][:, codes]
+            sorted_keys = self.sorted_keys[metric]
+            # Group c occupies sorted_keys[start[c]:start[c] + count(c)]
+            start = np.searchsorted(sorted_keys, np.arange(len(self.groups)) * 32.0, side="left")
+            # Searching in sorted order keeps the lookups cache friendly
+            keys = self._key(codes, values)
+            order = np.argsort(keys)
+            rank = np.empty(len(keys), dtype=np.int64)
+            rank[order] = np.searchsorted(sorted_keys, keys[order], side="right")
+            rank -= start[codes]
+            result[f"{name}_pct"] = 100.0 * rank / count
+            mean = total / count
+            std = np.sqrt(np.maximum(squares / count - mean ** 2, 0))
+            with np.errstate(divide="ignore", invalid="ignore"):
+                result[f"{name}_z"] = np.where(std > 0, (values - mean) / std, 0.0)
+        result["engagement"] = (result["score_pct"] + result["comments_pct"]) / 2
+        columns = self.columns()
+        for column, values in result.items():
+            self.block[rows, columns.index(column)] = values
+
+
+def score(df, by):
+    """Engagement scores of every post in `df`, grouped by the `by` columns."""
+    return EngagementScores(df, by).frame
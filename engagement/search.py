@@ -0,0 +1,193 @@
+"""Inverted full-text index over post titles and bodies.
+
+Scanning every title with `str.contains` is linear in the feed size. The
+index maps each token to the sorted list of documents containing it, stored
+as two flat arrays (CSR layout): `postings` holds the document numbers of
+every term back to back and `offsets[t]:offsets[t + 1]` is term t's slice.
+
+Documents are numbered in ranking order (score, then num_comments, highest
+first), so any sorted set of document numbers is already ranked and a query
+is just slicing, intersecting and taking the first `limit` hits. Every query
+term matches as a prefix. The vocabulary is sorted, so the terms starting
+with a prefix are one contiguous range that `searchsorted` finds.
+
+Indexes are built once per dataset version (see `engagement.data`) and saved
+next to the dataset as `<name>.search.npz`. A saved index is reused while the
+fingerprint of the ids, ranking columns and indexed text it was built from
+still matches.
+"""
+import pathlib
+
+import numpy as np
+import pandas as pd
+
+TOKEN = r"[0-9a-z]+"
+RANK_COLUMNS = ["score", "num_comments"]
+FORMAT = 2
+
+
+def index_path(path):
+    """Index file saved next to the dataset at `path`."""
+    path = pathlib.Path(path)
+    return path.with_name(f"{path.stem}.search.npz")
+
+
+def tokenize(text: str):
+    """Lowercase alphanumeric tokens of `text`."""
+    return pd.Series([text]).str.lower().str.findall(TOKEN).iloc[0]
+
+
+def fingerprint(df, texts=()):
+    """Hash of the ids and ranking columns of `df` and of `texts`.
+
+    Each of `texts` is either text aligned with `df`, hashed row by row, or
+    any other value standing for the text (such as the fingerprint of the
+    file it is read from), hashed by its repr.
+    """
+    columns = ["id"] + [c for c in RANK_COLUMNS if c in df]
+    rows = df[columns].reset_index(drop=True)
+    identities = []
+    for i, text in enumerate(texts):
+        if isinstance(text, (pd.Series, np.ndarray, list)) and len(text) == len(df):
+            rows[f"text{i}"] = np.asarray(text, dtype=object)
+        else:
+            identities.append(repr(text))
+    hashed = pd.util.hash_pandas_object(rows, index=False).to_numpy()
+    identity = pd.util.hash_array(np.array(["|".join(identities)], dtype=object))[0]
+    return np.array([FORMAT, len(df), int(hashed.sum(dtype=np.uint64)), identity], dtype=np.uint64)
+
+
+class SearchIndex:
+    """Token -> ranked documents, with prefix lookups.
+
+    Attributes:
+        ids (ndarray): Document id of each document number, in ranking order
+        vocabulary (ndarray): Sorted unique tokens
+        offsets (ndarray): Start of each token's postings; one entry longer
+            than `vocabulary`
+        postings (ndarray): Sorted document numbers of every token, concatenated
+        fingerprint (ndarray): `fingerprint` of the frame the index was built from
+    """
+    def __init__(self, ids, vocabulary, offsets, postings, fingerprint):
+        self.ids = ids
+        self.vocabulary = vocabulary
+        self.offsets = offsets
+        self.postings = postings
+        self.fingerprint = fingerprint
+        self._positions = None
+
+    def __len__(self):
+        return len(self.ids)
+
+    @classmethod
+    def build(cls, df, texts, key=None):
+        """Index `texts` (Series or arrays aligned with `df`) under `df['id']`.
+
+        The index is stamped with `fingerprint(df, key)`, `key` defaulting to `texts`.
+        """
+        keys = [-df[c].to_numpy(dtype=np.int64) for c in reversed(RANK_COLUMNS) if c in df]
+        order = np.lexsort(keys) if keys else np.arange(len(df))
+        tokens = [
+            pd.Series(np.asarray(text, dtype=object)[order]).fillna("").astype(str)
+            .str.lower().str.findall(TOKEN).explode().dropna()
+            for text in texts
+        ]
+        tokens = pd.concat(tokens) if tokens else pd.Series([], dtype=object)
+        codes, vocabulary = pd.factorize(tokens, sort=True)
+        # One key per (term, document) pair; sorting the unique keys orders
+        # them by term, then document, which is the postings layout
+        pairs = np.unique(codes.astype(np.int64) * max(len(df), 1) + tokens.index.to_numpy(dtype=np.int64))
+        codes, docs = np.divmod(pairs, max(len(df), 1))
+        offsets = np.zeros(len(vocabulary) + 1, dtype=np.int64)
+        np.cumsum(np.bincount(codes, minlength=len(vocabulary)), out=offsets[1:])
+        return cls(
+            ids=df["id"].to_numpy(dtype=object)[order].astype(str),
+            vocabulary=np.asarray(vocabulary, dtype=str),
+            offsets=offsets,
+            postings=docs.astype(np.int32),
+            fingerprint=fingerprint(df, texts if key is None else key),
+        )
+
+    def matches(self, prefix: str):
+        """Sorted document numbers containing a token that starts with `prefix`."""
+        start = np.searchsorted(self.vocabulary, prefix, side="left")
+        stop = np.searchsorted(self.vocabulary, prefix + "\uffff", side="left")
+        docs = self.postings[self.offsets[start]:self.offsets[stop]]
+        if stop - start <= 1:
+            return docs
+        # Merge the terms' postings by marking them on a per-document mask,
+        # which stays linear however many terms share the prefix
+        found = np.zeros(len(self.ids), dtype=bool)
+        found[docs] = True
+        return np.flatnonzero(found)
+
+    def documents(self, ids):
+        """Sorted document numbers of `ids`; unknown ids are skipped."""
+        if self._positions is None:
+            self._positions = pd.Index(self.ids)
+        docs = self._positions.get_indexer(pd.Index(ids).astype(str))
+        return np.unique(docs[docs >= 0])
+
+    def search(self, query: str, limit: int = 100, within=None):
+        """Ids of the best ranked documents containing every term of `query`.
+
+        Each term matches as a prefix, so "leb jam" finds "LeBron James".
+        `within` restricts the results to the given ids.
+        """
+        terms = list(dict.fromkeys(tokenize(query)))
+        if not terms:
+            return self.ids[:0]
+        docs = None if within is None else self.documents(within)
+        for term in terms:
+            found = self.matches(term)
+            docs = found if docs is None else np.intersect1d(docs, found, assume_unique=True)
+            if not len(docs):
+                break
+        return self.ids[docs[:limit]]
+
+    def save(self, path):
+        path = pathlib.Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with open(path, "wb") as f:
+            np.savez(f, ids=self.ids, vocabulary=self.vocabulary, offsets=self.offsets,
+                     postings=self.postings, fingerprint=self.fingerprint)
+
+    @classmethod
+    def load(cls, path):
+        with np.load(path) as saved:
+            return cls(**{name: saved[name] for name in saved.files})
+
+
+def load_or_build(df, texts, path, key=None):
+    """Index saved at `path` if it was built from the same `df` and text, else a fresh one.
+
+    `texts` is a list of text arrays, or a function returning one that is
+    only called to build. The saved index is matched on `fingerprint(df, key)`,
+    where `key` defaults to `texts`; pass e.g. the text file's fingerprint to
+    check the text without reading it. A fresh index is saved to `path`.
+    Failing to write it (e.g. a read-only deploy) only costs a rebuild in the
+    next process.
+    """
+    path = pathlib.Path(path)
+    if key is None:
+        texts = key = texts() if callable(texts) else texts
+    if path.exists():
+        try:
+            index = SearchIndex.load(path)
+        except (OSError, ValueError, KeyError, TypeError):
+            index = None
+        if index is not None and np.array_equal(index.fingerprint, fingerprint(df, key)):
+            return index
+    index = SearchIndex.build(df, texts() if callable(texts) else texts, key)
+    try:
+        index.save(path)
+    except OSError:
+        pass
+    return index
+
+
+def select(df, ids):
+    """Rows of `df` whose id is in `ids`, in the order of `ids`."""
+    position = pd.Index(ids).get_indexer(df["id"])
+    found = position >= 0
+    return df[found].iloc[np.argsort(position[found], kind="stable")]
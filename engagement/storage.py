@@ -0,0 +1,340 @@
+"""Typed columnar (Parquet) storage for the AMA table and the posts feed.
+
+The CSV and JSONL sources are text, so every cold start re-parses them and
+infers types again. `convert` applies an explicit schema once and writes
+Parquet. The readers load that file when it exists and otherwise fall back to
+the text source with the same schema, so pages see identical dtypes either way.
+
+`convert` records the SHA-256 of a local source in the Parquet metadata. A
+copy whose local source has changed since (e.g. an edited nba-ama.csv) is
+stale: the readers warn and parse the source instead. Copies of URL sources
+cannot be checked without downloading and are trusted.
+
+Long text (AMA bodies, post selftext) is kept out of the frames the pages hold.
+It is written to a separate `<name>.text.parquet` file, sorted by id in small
+row groups, and served by a `TextStore` that reads only the row groups
+holding the posts actually shown.
+
+Usage:
+    python -m engagement.storage ama [source] [dest]
+    python -m engagement.storage posts [source] [dest]
+"""
+import hashlib
+import logging
+import os
+import pathlib
+import sys
+import threading
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+ROOT = pathlib.Path(__file__).resolve().parent.parent
+DATA_DIR = ROOT / "data"
+
+AMA_CSV = ROOT / "nba-ama.csv"
+AMA_PARQUET = DATA_DIR / "nba-ama.parquet"
+POSTS_PARQUET = pathlib.Path(
+    os.environ.get("ENGAGEMENT_POSTS_PATH", DATA_DIR / "sports_reddit_posts.parquet")
+)
+# Memory-mapped copies of the datasets shared by every worker process (see engagement.mapped)
+SHARED_DIR = pathlib.Path(os.environ.get("ENGAGEMENT_SHARED_DIR", DATA_DIR / "shared"))
+# Score/comment samples of recent posts, appended by the snapshot poller (see engagement.velocity)
+SNAPSHOTS = pathlib.Path(os.environ.get("ENGAGEMENT_SNAPSHOTS_PATH", DATA_DIR / "post_snapshots.bin"))
+
+# Column -> dtype. Datetimes given as epoch seconds or strings are parsed;
+# columns not listed here are dropped.
+AMA_SCHEMA = {
+    "id": "object",
+    "date": "datetime64[ns]",
+    "title": "object",
+    "name": "category",
+    "category_raw": "category",
+    "category": "category",
+    "body": "object",
+    "score": "int32",
+    "num_comments": "int32",
+    "link": "object",
+}
+AMA_TEXT = ["body"]
+
+POSTS_SCHEMA = {
+    "id": "object",
+    "title": "object",
+    "selftext": "object",
+    "author": "category",
+    "subreddit": "category",
+    "created_utc": "datetime64[ns, UTC]",
+    "score": "int32",
+    "num_comments": "int32",
+    "upvote_ratio": "float32",
+    "permalink": "object",
+    "url": "object",
+    "over_18": "bool",
+    "stickied": "bool",
+    "is_created_from_ads_ui": "bool",
+}
+POSTS_TEXT = ["selftext"]
+
+# Rows per row group of a text side file; a lookup reads whole row groups
+TEXT_ROW_GROUP = 2_048
+
+# Parquet metadata key holding the SHA-256 of the source a copy was converted from
+SOURCE_KEY = b"engagement.source_sha256"
+
+logger = logging.getLogger(__name__)
+
+
+def apply_schema(df, schema: dict):
+    """Return a new frame with only the schema columns, cast to their dtypes."""
+    columns = {}
+    for column, dtype in schema.items():
+        if column not in df:
+            continue
+        series = df[column]
+        if dtype.startswith("datetime64"):
+            utc = "UTC" in dtype
+            if pd.api.types.is_numeric_dtype(series):
+                series = pd.to_datetime(series, unit="s", utc=utc)
+            else:
+                series = pd.to_datetime(series, utc=utc)
+        elif dtype == "bool":
+            series = series.fillna(False).astype(bool)
+        elif dtype.startswith("int"):
+            series = series.fillna(0).astype(dtype)
+        else:
+            series = series.astype(dtype)
+        columns[column] = series
+    return pd.DataFrame(columns, index=df.index)
+
+
+def read_source(source, schema: dict):
+    """Parse a CSV, JSON or JSONL source (path or URL) and apply `schema`."""
+    source = str(source)
+    if source.endswith(".csv"):
+        df = pd.read_csv(source)
+    elif source.endswith(".jsonl"):
+        df = pd.read_json(source, lines=True)
+    else:
+        df = pd.read_json(source)
+    return apply_schema(df, schema)
+
+
+def text_path(path):
+    """Side file holding the text columns split off `path`."""
+    path = pathlib.Path(path)
+    return path.with_name(f"{path.stem}.text.parquet")
+
+
+def split_text(df, columns):
+    """Split `columns` off `df`. Returns (frame without them, id + text columns)."""
+    columns = [c for c in columns if c in df]
+    return df.drop(columns=columns), df[["id"] + columns]
+
+
+def source_hash(source):
+    """SHA-256 hex digest of a local source file, None for URLs and missing files."""
+    path = pathlib.Path(str(source))
+    if "://" in str(source) or not path.is_file():
+        return None
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def converted_from(path):
+    """Source hash recorded in a converted Parquet file, None if it has none."""
+    value = (pq.read_schema(path).metadata or {}).get(SOURCE_KEY)
+    return value.decode() if value else None
+
+
+def is_current(path, source):
+    """True when the Parquet copy at `path` exists and matches `source` as it is now.
+
+    Copies of URL sources are trusted; copies of a local file must record its current hash.
+    """
+    if not pathlib.Path(path).exists():
+        return False
+    expected = source_hash(source)
+    return expected is None or converted_from(path) == expected
+
+
+def write_parquet(df, dest, source_sha256=None, row_group_size: int = None):
+    """Write `df` to `dest`, recording `source_sha256` in the file's metadata."""
+    table = pa.Table.from_pandas(df, preserve_index=False)
+    if source_sha256:
+        table = table.replace_schema_metadata({**(table.schema.metadata or {}), SOURCE_KEY: source_sha256.encode()})
+    pq.write_table(table, dest, row_group_size=row_group_size)
+
+
+def write_text(text, dest, source_sha256=None):
+    """Write an id + text frame as a side file: sorted by id, TEXT_ROW_GROUP rows per row group."""
+    text = text.sort_values("id", kind="stable").reset_index(drop=True)
+    write_parquet(text, dest, source_sha256, row_group_size=TEXT_ROW_GROUP)
+
+
+def convert(source, dest, schema: dict, text_columns=()):
+    """Convert a text source to a typed Parquet file plus a side file for `text_columns`."""
+    digest = source_hash(source)
+    df, text = split_text(read_source(source, schema), text_columns)
+    dest = pathlib.Path(dest)
+    dest.parent.mkdir(parents=True, exist_ok=True)
+    write_parquet(df, dest, digest)
+    if len(text.columns) > 1:
+        write_text(text, text_path(dest), digest)
+    return df
+
+
+def read_table(path, schema: dict):
+    """Read a converted Parquet file, re-applying `schema` if it has drifted."""
+    df = pd.read_parquet(path)
+    if any(str(df[c].dtype) != dtype for c, dtype in schema.items() if c in df):
+        df = apply_schema(df, {c: dtype for c, dtype in schema.items() if c in df})
+    return df
+
+
+def read_split(path, source, schema: dict, text_columns):
+    """Compact frame plus where its text lives.
+
+    Returns:
+        tuple: (frame, text) where `text` is the side file path when reading the
+        converted Parquet copy and an in-memory id + text frame when parsing `source`.
+    """
+    if is_current(path, source):
+        return read_table(path, schema), text_path(path)
+    if pathlib.Path(path).exists():
+        logger.warning(f"{path} is stale: {source} changed since it was converted. Reading {source}; "
+                       f"re-run `python -m engagement.storage` to refresh the copy.")
+    return split_text(read_source(source, schema), text_columns)
+
+
+def read_ama(path=AMA_PARQUET, source=AMA_CSV):
+    """AMA threads and their text, from Parquet when converted and from the CSV otherwise."""
+    return read_split(path, source, AMA_SCHEMA, AMA_TEXT)
+
+
+def read_posts(source: str, path=POSTS_PARQUET):
+    """Posts feed and its text, from Parquet when converted and from the JSONL `source` otherwise."""
+    return read_split(path, source, POSTS_SCHEMA, POSTS_TEXT)
+
+
+class TextStore:
+    """Long text columns looked up by post id, reading only what is asked for.
+
+    A side file is read a row group at a time: the id range of each row group,
+    from the Parquet statistics, tells which ones can hold the requested ids.
+    Side files are sorted by id (see `write_text`), so a page of posts reads a
+    few small row groups. Nothing is kept after a lookup except the ranges.
+    Text of appended posts is held in memory.
+
+    Attributes:
+        source: Path of a `.text.parquet` side file, or an id + text DataFrame
+    """
+    def __init__(self, source=None):
+        self._lock = threading.Lock()
+        self._appended = pd.DataFrame(index=pd.Index([], name="id"))
+        self.reset(source)
+
+    def reset(self, source):
+        """Point the store at new text, dropping anything already loaded.
+
+        Appended text is kept, as the reloaded feed may not have those posts
+        yet. For ids the new source holds, its text is used.
+        """
+        with self._lock:
+            self.source = source
+            self._ranges = None
+            self._memory = None
+
+    def fingerprint(self):
+        """Identity of the side file the text is read from; None for text held in memory."""
+        if isinstance(self.source, pd.DataFrame) or self.source is None:
+            return None
+        path = pathlib.Path(self.source)
+        if not path.exists():
+            return None
+        stat = path.stat()
+        return [str(path.resolve()), stat.st_size, stat.st_mtime_ns]
+
+    def _row_groups(self, parquet):
+        """(columns, low, high): column names and the id range of each row group, None where unknown."""
+        with self._lock:
+            if self._ranges is None:
+                metadata = parquet.metadata
+                column = parquet.schema_arrow.get_field_index("id")
+                low, high = [], []
+                for group in range(metadata.num_row_groups):
+                    stats = metadata.row_group(group).column(column).statistics
+                    known = stats is not None and stats.has_min_max
+                    low.append(stats.min if known else None)
+                    high.append(stats.max if known else None)
+                self._ranges = (parquet.schema_arrow.names, low, high)
+            return self._ranges
+
+    def _read(self, ids, column: str):
+        """Stored text of `column` for the unique `ids`, indexed by id."""
+        source = self.source
+        if isinstance(source, pd.DataFrame):
+            with self._lock:
+                if self._memory is None:
+                    self._memory = source.drop_duplicates("id").set_index("id")
+                text = self._memory
+            return text[column].reindex(ids).dropna() if column in text else pd.Series(dtype=object)
+        if source is None or not pathlib.Path(source).exists():
+            return pd.Series(dtype=object)
+        parquet = pq.ParquetFile(source)
+        columns, low, high = self._row_groups(parquet)
+        if column not in columns:
+            return pd.Series(dtype=object)
+        wanted = np.sort(np.asarray(ids, dtype=object).astype(str))
+        groups = [group for group, (lo, hi) in enumerate(zip(low, high))
+                  if lo is None or np.searchsorted(wanted, hi, side="right") > np.searchsorted(wanted, lo)]
+        if not groups:
+            return pd.Series(dtype=object)
+        text = parquet.read_row_groups(groups, columns=["id", column]).to_pandas()
+        text = text[text["id"].isin(wanted)].drop_duplicates("id")
+        return text.set_index("id")[column]
+
+    def append(self, text):
+        """Add id + text rows for newly appended posts; ids already stored are kept."""
+        text = text.drop_duplicates("id").set_index("id")
+        with self._lock:
+            appended = self._appended
+            self._appended = pd.concat([appended, text[~text.index.isin(appended.index)]])
+
+    def get(self, ids, column: str):
+        """Text of `column` for each id in `ids`; missing ids give an empty string."""
+        ids = pd.Index(ids, name="id")
+        found = self._read(ids.unique(), column)
+        appended = self._appended
+        if column in appended:
+            extra = appended[column].reindex(ids.unique().difference(found.index)).dropna()
+            found = pd.concat([found, extra]) if len(extra) else found
+        return found.reindex(ids).fillna("").rename(column)
+
+
+def main(argv=None):
+    from engagement.data import POSTS_URL
+
+    argv = sys.argv[1:] if argv is None else argv
+    if not argv or argv[0] not in ("ama", "posts"):
+        print(__doc__)
+        return 1
+    kind = argv[0]
+    if kind == "ama":
+        source, dest, schema, text_columns = AMA_CSV, AMA_PARQUET, AMA_SCHEMA, AMA_TEXT
+    else:
+        source, dest, schema, text_columns = POSTS_URL, POSTS_PARQUET, POSTS_SCHEMA, POSTS_TEXT
+    source = argv[1] if len(argv) > 1 else source
+    dest = argv[2] if len(argv) > 2 else dest
+    df = convert(source, dest, schema, text_columns)
+    print(f"Wrote {len(df)} rows to {dest}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
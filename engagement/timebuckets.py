@@ -0,0 +1,56 @@
+"""Local-time calendar columns for the posts feed, derived in one vectorized pass.
+
+All outputs are native datetime64/integer columns, so date-range masks and
+groupbys on them stay in NumPy instead of comparing Python `date` objects.
+"""
+import numpy as np
+import pandas as pd
+
+TZ = "US/Eastern"
+GRAINS = ("day", "week", "month")
+
+
+def bucket(day, grain: str):
+    """Start of the day, ISO week (Monday) or month containing each naive local day."""
+    values = np.asarray(day, dtype="datetime64[ns]").astype("datetime64[D]")
+    if grain == "day":
+        start = values
+    elif grain == "week":
+        # 1970-01-01 was a Thursday, so Monday-based weekday is (days + 3) % 7
+        start = values - (values.astype(np.int64) + 3) % 7
+    elif grain == "month":
+        start = values.astype("datetime64[M]")
+    else:
+        raise ValueError(f"Unknown grain {grain!r}, expected one of {GRAINS}")
+    start = start.astype("datetime64[ns]")
+    return pd.Series(start, index=day.index) if isinstance(day, pd.Series) else start
+
+
+def add_time_features(df, column: str = "created_utc", tz: str = TZ):
+    """Return `df` with local calendar columns derived from the UTC `column`.
+
+    Adds:
+        created_est       tz-aware local timestamp
+        created_date_est  local date (datetime64, midnight)
+        week_start        Monday of the ISO week
+        week_end          Sunday of the ISO week
+        week              ISO week number
+        month             first day of the month
+        year              calendar year
+    """
+    local = df[column].dt.tz_convert(tz)
+    days = local.dt.tz_localize(None).to_numpy().astype("datetime64[D]")
+    week_start = bucket(days, "week").astype("datetime64[D]")
+    # ISO weeks belong to the year of their Thursday
+    thursday = week_start + 3
+    iso_year = thursday.astype("datetime64[Y]")
+    week = (thursday - iso_year.astype("datetime64[D]")).astype(np.int64) // 7 + 1
+    return df.assign(
+        created_est=local,
+        created_date_est=days.astype("datetime64[ns]"),
+        week_start=week_start.astype("datetime64[ns]"),
+        week_end=(week_start + 6).astype("datetime64[ns]"),
+        week=week.astype(np.int16),
+        month=days.astype("datetime64[M]").astype("datetime64[ns]"),
+        year=(days.astype("datetime64[Y]").astype(np.int64) + 1970).astype(np.int16),
+    )
@@ -0,0 +1,155 @@
+"""Engagement velocity: how fast a post's score and comments grow.
+
+A post's `score` and `num_comments` in the feed are one snapshot taken at
+ingest. The snapshot poller (`SnapshotPoller` in pipelines/data-ingest, run
+with `python utils.py snapshots`) re-samples recent posts on a schedule and
+appends the samples to a log of fixed-width binary records:
+
+    post      uint32  index of the post id in the `.ids` file next to the log
+    time      uint32  epoch seconds of the sample
+    score     int32
+    comments  int32
+
+The `.ids` file holds one post id per line; line k is post index k. Both
+files are append-only, so readers can map the log with `np.memmap` while the
+poller keeps writing. `VelocitySeries` sorts the samples by (post, time) once
+and keeps them in CSR layout: `order[offsets[k]:offsets[k + 1]]` are the
+samples of post k, oldest first.
+"""
+import os
+import pathlib
+import threading
+
+import numpy as np
+import pandas as pd
+
+SAMPLE_DTYPE = np.dtype([("post", "<u4"), ("time", "<u4"), ("score", "<i4"), ("comments", "<i4")])
+
+
+def ids_path(path):
+    """Post id file of a snapshot log, e.g. data/snapshots.bin -> data/snapshots.ids"""
+    return pathlib.Path(path).with_suffix(".ids")
+
+
+class SnapshotLog:
+    """Writer side of a snapshot log.
+
+    Attributes:
+        path (Path): Binary log of SAMPLE_DTYPE records
+        positions (dict): Post id -> post index, as stored in the `.ids` file
+    """
+    def __init__(self, path):
+        self.path = pathlib.Path(path)
+        self.positions = {}
+        if ids_path(self.path).exists():
+            self.positions = {post_id: k for k, post_id in enumerate(ids_path(self.path).read_text().split())}
+
+    def append(self, ids, times, scores, comments):
+        """Append one sample per post id; ids not seen before are registered first.
+
+        Returns:
+            int: Number of samples written
+        """
+        new = list(dict.fromkeys(post_id for post_id in map(str, ids) if post_id not in self.positions))
+        if new:
+            with open(ids_path(self.path), "a") as f:
+                f.write("".join(f"{post_id}\n" for post_id in new))
+            self.positions.update(zip(new, range(len(self.positions), len(self.positions) + len(new))))
+        samples = np.empty(len(ids), dtype=SAMPLE_DTYPE)
+        samples["post"] = [self.positions[str(post_id)] for post_id in ids]
+        samples["time"] = times
+        samples["score"] = scores
+        samples["comments"] = comments
+        # Ids are written before their samples, so readers never see an unknown index
+        with open(self.path, "ab") as f:
+            f.write(samples.tobytes())
+        return len(samples)
+
+
+class VelocitySeries:
+    """Memory-mapped samples of a snapshot log, grouped by post.
+
+    Attributes:
+        samples (memmap): SAMPLE_DTYPE records, in the order they were written
+        ids (ndarray): Post id of each post index
+        order (ndarray): Sample positions grouped by post, oldest first
+        offsets (ndarray): Start of each post's slice of `order`
+        positions (dict): Post id -> post index
+    """
+    def __init__(self, samples, ids):
+        self.samples = samples
+        self.ids = ids
+        self.positions = {post_id: k for k, post_id in enumerate(ids)}
+        post = samples["post"]
+        self.order = np.lexsort((samples["time"], post))
+        self.offsets = np.zeros(len(ids) + 1, dtype=np.int64)
+        np.cumsum(np.bincount(post, minlength=len(ids)), out=self.offsets[1:])
+
+    @classmethod
+    def load(cls, path):
+        path = pathlib.Path(path)
+        # A sample being written when the log is opened is left out
+        rows = path.stat().st_size // SAMPLE_DTYPE.itemsize
+        samples = np.memmap(path, dtype=SAMPLE_DTYPE, mode="r", shape=(rows,)) if rows \
+            else np.empty(0, dtype=SAMPLE_DTYPE)
+        return cls(samples, np.array(ids_path(path).read_text().split(), dtype=object))
+
+    def __contains__(self, post_id):
+        k = self.positions.get(post_id)
+        return k is not None and self.offsets[k + 1] > self.offsets[k]
+
+    def history(self, post_id):
+        """Samples of `post_id`, oldest first. Empty for posts never sampled."""
+        k = self.positions.get(post_id)
+        rows = self.order[self.offsets[k]:self.offsets[k + 1]] if k is not None else self.order[:0]
+        samples = self.samples[rows]
+        return pd.DataFrame({
+            "time": pd.to_datetime(samples["time"].astype(np.int64), unit="s"),
+            "score": samples["score"].astype(np.int64),
+            "comments": samples["comments"].astype(np.int64),
+        })
+
+    def velocity(self, post_id):
+        """History of `post_id` plus upvotes and comments gained per hour since the previous sample."""
+        df = self.history(post_id)
+        # Samples taken within the same second give no rate
+        hours = (df["time"].diff().dt.total_seconds() / 3600).where(lambda h: h > 0)
+        df["score_per_hour"] = df["score"].diff() / hours
+        df["comments_per_hour"] = df["comments"].diff() / hours
+        return df
+
+    def latest(self, post_ids):
+        """Upvotes and comments per hour between the last two samples of each post, NaN with fewer samples.
+
+        Returns:
+            DataFrame: indexed by post id, columns score_per_hour and comments_per_hour
+        """
+        k = np.array([self.positions.get(post_id, -1) for post_id in post_ids], dtype=np.int64)
+        found = k >= 0
+        end = np.where(found, self.offsets[np.maximum(k, 0) + 1], 0)
+        sampled = found & (end - self.offsets[np.maximum(k, 0)] >= 2)
+        last = self.samples[self.order[end[sampled] - 1]]
+        previous = self.samples[self.order[end[sampled] - 2]]
+        hours = (last["time"].astype(np.int64) - previous["time"].astype(np.int64)) / 3600
+        hours[hours <= 0] = np.nan
+        result = pd.DataFrame(np.nan, index=pd.Index(post_ids), columns=["score_per_hour", "comments_per_hour"])
+        result.loc[sampled, "score_per_hour"] = (last["score"].astype(np.int64) - previous["score"]) / hours
+        result.loc[sampled, "comments_per_hour"] = (last["comments"].astype(np.int64) - previous["comments"]) / hours
+        return result
+
+
+_series = {}
+_lock = threading.Lock()
+
+
+def load(path):
+    """VelocitySeries of the log at `path`, re-read only when the log has grown. None if there is no log."""
+    path = pathlib.Path(path)
+    if not path.exists() or not ids_path(path).exists():
+        return None
+    key = (str(path), os.path.getsize(path))
+    with _lock:
+        if key not in _series:
+            _series.clear()
+            _series[key] = VelocitySeries.load(path)
+        return _series[key]
@@ -0,0 +1,81 @@
+"""Background warm-up of the shared datasets at process start.
+
+Without it the first visitor after a deploy pays for the feed download, the
+parsing and every aggregate. `engagement.launch` calls `start()` as the
+server starts, before anyone connects. The loads run in a daemon thread, and
+sessions that arrive meanwhile wait on the same load instead of starting
+their own (see `SharedDataset.get`). `app.py` calls `start()` too, which only
+starts the thread under a plain `streamlit run app.py`.
+
+`timeline` records, in seconds since this module was imported (the first
+line of the launcher, or of `app.py` without it):
+
+    imported     the launcher imported Streamlit and the engagement modules
+    data_ready   datasets and aggregates are loaded
+    first_render the first page script finished
+"""
+import threading
+import time
+
+# Aggregates the pages read; built by the warm-up so no session has to
+CUBE_GRAINS = ("day", "month")
+
+
+class StartupTimeline:
+    """First time each startup milestone was reached.
+
+    Attributes:
+        origin (float): `time.perf_counter()` value the offsets are relative to
+        marks (dict): Milestone name -> seconds since `origin`
+        error (Exception): Error raised by the warm-up, if any
+    """
+    def __init__(self):
+        self.origin = time.perf_counter()
+        self.marks = {}
+        self.error = None
+        self._lock = threading.Lock()
+
+    def mark(self, name: str):
+        """Record `name` now unless it was already reached. Returns its offset."""
+        with self._lock:
+            return self.marks.setdefault(name, time.perf_counter() - self.origin)
+
+    def as_dict(self):
+        with self._lock:
+            return dict(self.marks)
+
+
+timeline = StartupTimeline()
+
+_thread = None
+_thread_lock = threading.Lock()
+
+
+def warm():
+    """Load both datasets and build the shared aggregates."""
+    # Imported here so importing this module stays cheap and the timeline
+    # origin is the start of the process
+    from engagement import data, organic
+
+    try:
+        data.load_ama()
+        data.load_posts()
+        for grain in CUBE_GRAINS:
+            data.load_cube(grain)
+        data.load_post_scores()
+        organic.warm(organic.ACCOUNTS.values(), exclude_ads=True)
+    except Exception as e:
+        # The pages will retry the load and surface the error themselves
+        timeline.error = e
+    else:
+        timeline.mark("data_ready")
+
+
+def start():
+    """Start the warm-up thread once per process. Returns the thread."""
+    global _thread
+    with _thread_lock:
+        if _thread is None:
+            _thread = threading.Thread(target=warm, name="engagement-warmup", daemon=True)
+            _thread.start()
+        return _thread
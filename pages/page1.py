@@ -1,8 +1,10 @@
 import pandas as pd
-import plotly.express as px
 import streamlit as st
 import numpy as np
-import webbrowser
+
+from engagement import boxplot, render, search
+from engagement.data import ama, load_ama_index, load_ama_scores, load_ama_sketches, load_outliers, load_participants
+from engagement.figcache import cached_figure
 
 
 # Custom CSS for better styling
@@ -35,26 +37,19 @@ st.markdown("""
 
 
 # Data loading and preprocessing
-@st.cache_data
-def load_and_process_data():
-    df = pd.read_csv('nba-ama.csv')
+def process_data(df):
     df = df[df.name != 'Unknown']
-    df['date'] = pd.to_datetime(df['date'])
+    df['name'] = df['name'].cat.remove_unused_categories()
 
     df.title = df.title.str.wrap(30)
     df.title = df.title.apply(lambda x: x.replace('\n', '<br>'))
     
     return df
 
-def remove_outliers(df, column):
-    Q1 = df[column].quantile(0.05)
-    Q3 = df[column].quantile(0.95)
-    IQR = Q3 - Q1
-    df_filtered = df[
-        (df[column] >= Q1 - 1.5 * IQR) & 
-        (df[column] <= Q3 + 1.5 * IQR)
-    ]
-    return df_filtered
+def load_and_process_data():
+    # Built once per dataset version and shared by every session; st.cache_data
+    # would hand each rerun its own unpickled copy
+    return ama.derive('page1_frame', process_data)
 
 if 'scatter_link' not in st.session_state:
     st.session_state.scatter_link = None
@@ -63,6 +58,8 @@ if 'timeline_link' not in st.session_state:
 
 # Load data
 df = load_and_process_data()
+# Per-name counts, means, first/best thread and rows, built once per dataset version
+participants = load_participants()
 # df['num_comments'] = df['num_comments'].replace(0, 1)
 # df['score'] = df['score'].replace(0, 1)
 
@@ -71,7 +68,7 @@ st.title("🏀 Reddit r/NBA AMA Analysis")
 
 st.image('assets/rnba.PNG', width='stretch')
 
-include_outliers = True # st.sidebar.checkbox('Include Outliers', value=True, help="Include statistical outliers in the plots")
+include_outliers = st.sidebar.checkbox('Include Outliers', value=True, help="Include statistical outliers in the plots")
 
 # st.divider()
 # Key metrics
@@ -106,7 +103,12 @@ with st.container(key='intro'):
 with st.popover('Data', width='stretch'):
     st.markdown('''The category and name data were extracted from the AMA thread titles using a Large Language Model. 
                 The names were extracted perfectly and about 90% of the time categories are right every time.''')
-    st.write(df)
+    query = st.text_input('Search threads', placeholder='e.g. kevin garn', key='ama_search',
+                          help='Matches words in thread titles and bodies by prefix, best engaged first')
+    if query:
+        st.write(search.select(df, load_ama_index().search(query, within=df['id'])))
+    else:
+        st.write(df)
 metric_cols = st.columns(5)
 with metric_cols[0]:
     st.metric("Total Threads", len(df))
@@ -123,8 +125,8 @@ with metric_cols[4]:
 
 # Data filtering based on user selections
 if not include_outliers:
-    df = remove_outliers(df, 'num_comments')
-    df = remove_outliers(df, 'score')
+    # Rows within bounds in both columns, one AND of precomputed bitsets
+    df = load_outliers().select(df, ['num_comments', 'score'])
 
 # Scatter plot
 st.subheader("Engagement Analysis")
@@ -134,25 +136,6 @@ st.markdown("""
     This helps identify which AMAs generated the most community interaction.
     **Anthon Davis** and **Kevin Garnett** had the most engagement in their AMAs. An NBA team attendant aka ballboy had the third most engaging thread.
 """)
-c1,c2,c3, c4 = st.columns([3,2,1,3])
-
-with c1:
-    st.markdown('**Community Engagement: Comments vs Upvotes**')
-
-with c2:
-    log_scale_switch = st.toggle('Log Scale', value=True, help='Applying log trasnform to $x$ and $y$ values reduces gaps between numbers and helps visualize the wide range of engagement levels (comments and upvotes) across different AMAs, making it easier to identify trends and patterns')
-with c4:
-    link_container = st.empty()
-
-xmin, xmax = df['num_comments'].min(), df['num_comments'].max()
-ymax = df['score'].max()
-if log_scale_switch:
-    xmin = np.log1p(df['num_comments']).min()-0.1
-    xmax = np.log10(df['num_comments']+1).max()+0.2
-    ymax = np.log10(df['score']+1).max()+0.2
-
-
-
 def create_color_mapping(categories):
     """Create a color mapping dictionary with rgba values for given categories"""
     base_colors = [
@@ -183,89 +166,116 @@ name_options = ['None'] + sorted(df[df.category.isin(['Active Player','Retired p
 #     )
 
 # # Create a column for selected points
-# df['selected'] = df['name'] == selected_personality if selected_personality != 'None' else False
+# df['selected'] = participants.highlight(df, selected_personality)
 
 # st.write(df[df['selected']])
-scatter_fig = px.scatter(
-    df,
-    x='num_comments',
-    y='score',
-    color='category',
-    # opacity = 1 if selected_personality == 'None' else df['selected'].to_list(),
-    size='num_comments',
-    hover_data=['title', 'name', 'date','link'],
-    # title='Community Engagement: Comments vs Upvotes',
-    labels={
-        'num_comments': 'Number of Comments',
-        'score': 'Number of Upvotes',
-        'category': 'AMA Category',
-        'name': 'Participant Name',
-        'date': 'Date'
-    },
-    log_x=log_scale_switch,
-    log_y=log_scale_switch,
-    template='plotly_white',
-    hover_name='title',
-)
-
-
-scatter_fig.update_traces(
-    marker=dict(
-        sizemin=2,
-    ),
-    hovertemplate='<b>Title:</b> %{hovertext}<br>'+
-                   '<b>Participant:</b> %{customdata[1]}<br>'+
-                   '<b>Date:</b> %{customdata[2]}<br>'+
-                   '<b>Number of Comments:</b> %{x}<br>'+
-                   '<b>Number of Upvotes:</b> %{y}')
-
-# st.write(scatter_fig.data)
-scatter_fig.update_layout(
-    height=600,
-    dragmode='zoom',
-    showlegend=True,
-    xaxis=dict(autorange=False),
-    yaxis=dict(autorange=False, showgrid = False),
-    xaxis_range=(xmin, xmax*1.1),
-    yaxis_range=(0.1,ymax*1.1),
-    legend=dict(
-        yanchor="top",
-        y=0.60,
-        xanchor="left",
-        x=0.85,
-        bgcolor='rgba(0,0,0,0)',
-        itemclick="toggleothers",
-    ),
-    legend_title_text='AMA Category',
-    newshape_line_color='#d93900',
-    template={
-        "layout": {
-            "hovermode": "closest",
-            "hoverlabel": {"bgcolor": "white"},
-            "xaxis": {"showspikes": False},
-            "yaxis": {"showspikes": False},
-        }
-    }
-)
-
-# st.write(scatter_fig.data)
 config = {'modeBarButtonsToRemove': ['zoom', 'pan', 'zoomIn', 'zoomOut', 'autoScale','lasso2d','select2d'],
           'modeBarButtonsToAdd': ['drawopenpath']}
-st.plotly_chart(scatter_fig,on_select="rerun", key="scatter", config=config, width='stretch')
-st.session_state.scatter_link = None
-if 'scatter' in st.session_state and st.session_state.scatter is not None and st.session_state.scatter['selection']['points'] != []:
-    selected_points = st.session_state.scatter
-    link = selected_points['selection']['points'][0]['customdata'][3]
-    st.session_state.scatter_link = link
-    with link_container:
-        st.markdown(f'**Link**: {link}')
 
-    webbrowser.open(link)  
 
+@st.fragment
+def engagement_section(df):
+    """Comments vs upvotes scatter; selecting a point only reruns this section."""
+    c1,c2,c3, c4 = st.columns([3,2,1,3])
+
+    with c1:
+        st.markdown('**Community Engagement: Comments vs Upvotes**')
+
+    with c2:
+        log_scale_switch = st.toggle('Log Scale', value=True, help='Applying log trasnform to $x$ and $y$ values reduces gaps between numbers and helps visualize the wide range of engagement levels (comments and upvotes) across different AMAs, making it easier to identify trends and patterns')
+    with c4:
+        link_container = st.empty()
+
+    xmin, xmax = df['num_comments'].min(), df['num_comments'].max()
+    ymax = df['score'].max()
+    if log_scale_switch:
+        xmin = np.log1p(df['num_comments']).min()-0.1
+        xmax = np.log10(df['num_comments']+1).max()+0.2
+        ymax = np.log10(df['score']+1).max()+0.2
+
+    def build_scatter_fig():
+        scatter_fig = render.scatter(
+            df,
+            x='num_comments',
+            y='score',
+            color='category',
+            # opacity = 1 if selected_personality == 'None' else df['selected'].to_list(),
+            size='num_comments',
+            hover_data=['title', 'name', 'date','link'],
+            # title='Community Engagement: Comments vs Upvotes',
+            labels={
+                'num_comments': 'Number of Comments',
+                'score': 'Number of Upvotes',
+                'category': 'AMA Category',
+                'name': 'Participant Name',
+                'date': 'Date'
+            },
+            log_x=log_scale_switch,
+            log_y=log_scale_switch,
+            template='plotly_white',
+            hover_name='title',
+        )
+
+
+        scatter_fig.update_traces(
+            marker=dict(
+                sizemin=2,
+            ),
+            hovertemplate='<b>Title:</b> %{hovertext}<br>'+
+                           '<b>Participant:</b> %{customdata[1]}<br>'+
+                           '<b>Date:</b> %{customdata[2]}<br>'+
+                           '<b>Number of Comments:</b> %{x}<br>'+
+                           '<b>Number of Upvotes:</b> %{y}')
+
+        # st.write(scatter_fig.data)
+        scatter_fig.update_layout(
+            height=600,
+            dragmode='zoom',
+            showlegend=True,
+            xaxis=dict(autorange=False),
+            yaxis=dict(autorange=False, showgrid = False),
+            xaxis_range=(xmin, xmax*1.1),
+            yaxis_range=(0.1,ymax*1.1),
+            legend=dict(
+                yanchor="top",
+                y=0.60,
+                xanchor="left",
+                x=0.85,
+                bgcolor='rgba(0,0,0,0)',
+                itemclick="toggleothers",
+            ),
+            legend_title_text='AMA Category',
+            newshape_line_color='#d93900',
+            template={
+                "layout": {
+                    "hovermode": "closest",
+                    "hoverlabel": {"bgcolor": "white"},
+                    "xaxis": {"showspikes": False},
+                    "yaxis": {"showspikes": False},
+                }
+            }
+        )
+        return scatter_fig
+
+    scatter_fig = cached_figure('ama_scatter', ama.version, build_scatter_fig, log_scale=log_scale_switch, include_outliers=include_outliers)
+
+    st.plotly_chart(scatter_fig,on_select="rerun", key="scatter", config=config, width='stretch')
+    st.session_state.scatter_link = None
+    if 'scatter' in st.session_state and st.session_state.scatter is not None and st.session_state.scatter['selection']['points'] != []:
+        selected_points = st.session_state.scatter
+        link = selected_points['selection']['points'][0]['customdata'][3]
+        st.session_state.scatter_link = link
+        with link_container:
+            st.markdown(f'**Link**: {link}')
+
+        import webbrowser
+        webbrowser.open(link)
+
+        # selected_df = pd.DataFrame(selected_points)
+        # st.dataframe(selected_df)
 
-  
-    # selected_df = pd.DataFrame(selected_points)
-    # st.dataframe(selected_df)
+
+engagement_section(df)
 
 
 # Category analysis
@@ -277,71 +287,78 @@ st.markdown("""
     Unsurprisingly, in hindsight, active and retired players have the most upward outliers in terms of engagement.
     Interestingly, Author/Analysts have a higher average number of comments then the other categories indicating a lively discussion.
 """)
-cat_log = st.toggle('Log Scale', value=True, help='Applying log trasnform to $y$ values reduces gaps between numbers and helps visualize the wide range of engagement levels (comments and upvotes) across different AMAs, making it easier to identify trends and patterns')
-col1, col2 = st.columns(2)
-
-with col1:
-    comments_violin = px.box(
-        df.sort_values('num_comments', ascending=False),
-        # box = True,
-        x='category',
-        y='num_comments',
-        color='category',
-        title='Comment Distribution by Category',
-        hover_data=['title', 'name', 'date','link'],
-        log_y=cat_log,
-        labels={
-            'category': 'AMA Category',
-            'num_comments': 'Number of Comments'
-        },
-        points="all"
-    )
-    comments_violin.update_traces(
-        hovertemplate='<b>Title:</b> %{customdata[0]}<br>'+
-                    '<b>Participant:</b> %{customdata[1]}<br>'+
-                   '<b>Date:</b> %{customdata[2]}<br>'+
-                   '<b>Number of Comments:</b> %{x}<br>'+
-                   '<b>Number of Upvotes:</b> %{y}')
-    comments_violin.update_layout(
-        dragmode=False,
-        height=500,
-        xaxis_tickangle=-45,
-        xaxis=dict(showgrid=False),
-        yaxis=dict(showgrid=False),
-        showlegend=False
-    )
-    st.plotly_chart(comments_violin, config = config, width='stretch')
-
-with col2:
-    score_box = px.box(
-        df.sort_values('score', ascending=False),
-        x='category',
-        y='score',
-        title='Upvote Distribution by Category',
-        color='category',
-        hover_data=['title', 'name', 'date','link'],
-        log_y=cat_log,
-        labels={
-            'category': 'AMA Category',
-            'score': 'Number of Upvotes'
-        },
-        points="all"
-    )
-    score_box.update_traces(
-        hovertemplate='<b>Title:</b> %{customdata[0]}<br>'+
-                    '<b>Participant:</b> %{customdata[1]}<br>'+
-                   '<b>Date:</b> %{customdata[2]}<br>'+
-                   '<b>Number of Comments:</b> %{x}<br>'+
-                   '<b>Number of Upvotes:</b> %{y}')
-    score_box.update_layout(
-        dragmode=False,
-        height=500,
-        xaxis_tickangle=-45,
-        xaxis=dict(showgrid=False),
-        yaxis=dict(showgrid=False),
-        showlegend=False
-    )
-    st.plotly_chart(score_box, config = config, width='stretch')
+@st.fragment
+def category_section(df):
+    """Comments and upvotes box plots by category."""
+    cat_log = st.toggle('Log Scale', value=True, help='Applying log trasnform to $y$ values reduces gaps between numbers and helps visualize the wide range of engagement levels (comments and upvotes) across different AMAs, making it easier to identify trends and patterns')
+    col1, col2 = st.columns(2)
+
+    with col1:
+        def build_comments_violin():
+            comments_violin = boxplot.box(
+                df,
+                x='category',
+                y='num_comments',
+                title='Comment Distribution by Category',
+                hover_data=['title', 'name', 'date','link'],
+                log_y=cat_log,
+                sketches=load_ama_sketches(include_outliers),
+                hovertemplate='<b>Title:</b> %{customdata[0]}<br>'+
+                            '<b>Participant:</b> %{customdata[1]}<br>'+
+                           '<b>Date:</b> %{customdata[2]}<br>'+
+                           '<b>Number of Comments:</b> %{y}<extra></extra>',
+                labels={
+                    'category': 'AMA Category',
+                    'num_comments': 'Number of Comments'
+                },
+            )
+            comments_violin.update_layout(
+                dragmode=False,
+                height=500,
+                xaxis_tickangle=-45,
+                xaxis=dict(showgrid=False),
+                yaxis=dict(showgrid=False),
+                showlegend=False
+            )
+            return comments_violin
+
+        comments_violin = cached_figure('ama_comments_box', ama.version, build_comments_violin, log_y=cat_log, include_outliers=include_outliers)
+        st.plotly_chart(comments_violin, config = config, width='stretch')
+
+    with col2:
+        def build_score_box():
+            score_box = boxplot.box(
+                df,
+                x='category',
+                y='score',
+                title='Upvote Distribution by Category',
+                hover_data=['title', 'name', 'date','link'],
+                log_y=cat_log,
+                sketches=load_ama_sketches(include_outliers),
+                hovertemplate='<b>Title:</b> %{customdata[0]}<br>'+
+                            '<b>Participant:</b> %{customdata[1]}<br>'+
+                           '<b>Date:</b> %{customdata[2]}<br>'+
+                           '<b>Number of Upvotes:</b> %{y}<extra></extra>',
+                labels={
+                    'category': 'AMA Category',
+                    'score': 'Number of Upvotes'
+                },
+            )
+            score_box.update_layout(
+                dragmode=False,
+                height=500,
+                xaxis_tickangle=-45,
+                xaxis=dict(showgrid=False),
+                yaxis=dict(showgrid=False),
+                showlegend=False
+            )
+            return score_box
+
+        score_box = cached_figure('ama_score_box', ama.version, build_score_box, log_y=cat_log, include_outliers=include_outliers)
+        st.plotly_chart(score_box, config = config, width='stretch')
+
+category_section(df)
+
 
 # Timeline analysis
 st.subheader("Timeline Analysis")
@@ -369,73 +386,84 @@ with st.container(key='timeline'):
     """)
 
 
-time_log = st.toggle('Log Scale', value=True, help='Applying log trasnform to $y$ values reduces gaps between numbers and helps visualize the wide range of engagement levels (comments and upvotes) across different AMAs, making it easier to identify trends and patterns',key = 'time_log')
-c1,c2 = st.columns(2)
+@st.fragment
+def timeline_section(df):
+    """Upvotes over time; selecting a point only reruns this section."""
+    time_log = st.toggle('Log Scale', value=True, help='Applying log trasnform to $y$ values reduces gaps between numbers and helps visualize the wide range of engagement levels (comments and upvotes) across different AMAs, making it easier to identify trends and patterns',key = 'time_log')
+    c1,c2 = st.columns(2)
+
+    ymax = df['score'].max()
+    if time_log:
+        ymax = np.log10(df['score']+1).max()+0.2
+
+    with c1:
+        st.markdown('**AMA Performance Over Time**')
+    with c2:
+        link_timeline_container = st.empty()
+
+    def build_timeline_fig():
+        timeline_fig = render.scatter(
+            df,
+            x='date',
+            y='score',
+            color='category',
+            size='num_comments',
+            hover_data=['title', 'name','num_comments','link'],
+            # title='AMA Performance Over Time',
+            log_y=time_log,
+            labels={
+                'date': 'Date',
+                'score': 'Number of Upvotes',
+                'category': 'AMA Category',
+                'num_comments': 'Number of Comments',
+                'name': 'Participant Name'
+            }
+        )
+
+        timeline_fig.update_traces(
+            marker=dict(sizemin=3),
+            hovertemplate='<b>Title:</b> %{customdata[0]}<br>'+
+                           '<b>Participant:</b> %{customdata[1]}<br>'+
+                           '<b>Date:</b> %{x}<br>'+
+                           '<b>Number of Comments:</b> %{customdata[2]}<br>'+
+                           '<b>Number of Upvotes:</b> %{y}'
+        )
+
+        timeline_fig.update_layout(
+            dragmode='zoom',
+            height=600,
+            legend_title_text='AMA Category',
+            xaxis=dict(showgrid=False),
+            yaxis=dict(showgrid=False),
+            xaxis_range = (df.date.min()- pd.Timedelta(days=30), df.date.max()+ pd.Timedelta(days=30)),
+            yaxis_range=(0.1,ymax*1.1),
+            newshape_line_color='#1e41e8',
+            legend=dict(
+                yanchor="top",
+                y=1,
+                xanchor="left",
+                x=0.85,
+                bgcolor='rgba(0,0,0,0)',
+                itemclick="toggleothers",
+            ),
+        )
+        return timeline_fig
+
+    timeline_fig = cached_figure('ama_timeline', ama.version, build_timeline_fig, log_y=time_log, include_outliers=include_outliers)
+    st.plotly_chart(timeline_fig,on_select="rerun", key="timeline_chart", config=config, width='stretch')
+    st.session_state.timeline_link = None
+    if st.session_state.timeline_chart is not None and st.session_state.timeline_chart['selection']['points'] != []:
+        selected_points = st.session_state.timeline_chart
+        link = selected_points['selection']['points'][0]['customdata'][3]
+        st.session_state.timeline_link = link
+        import webbrowser
+        webbrowser.open(link) 
 
-ymax = df['score'].max()
-if time_log:
-    ymax = np.log10(df['score']+1).max()+0.2
+        with link_timeline_container:
+            st.markdown(f'**Link**: {link}')
 
-with c1:
-    st.markdown('**AMA Performance Over Time**')
-with c2:
-    link_timeline_container = st.empty()
-
-timeline_fig = px.scatter(
-    df,
-    x='date',
-    y='score',
-    color='category',
-    size='num_comments',
-    hover_data=['title', 'name','num_comments','link'],
-    # title='AMA Performance Over Time',
-    log_y=time_log,
-    labels={
-        'date': 'Date',
-        'score': 'Number of Upvotes',
-        'category': 'AMA Category',
-        'num_comments': 'Number of Comments',
-        'name': 'Participant Name'
-    }
-)
-
-timeline_fig.update_traces(
-    marker=dict(sizemin=3),
-    hovertemplate='<b>Title:</b> %{customdata[0]}<br>'+
-                   '<b>Participant:</b> %{customdata[1]}<br>'+
-                   '<b>Date:</b> %{x}<br>'+
-                   '<b>Number of Comments:</b> %{customdata[2]}<br>'+
-                   '<b>Number of Upvotes:</b> %{y}'
-)
-
-timeline_fig.update_layout(
-    dragmode='zoom',
-    height=600,
-    legend_title_text='AMA Category',
-    xaxis=dict(showgrid=False),
-    yaxis=dict(showgrid=False),
-    xaxis_range = (df.date.min()- pd.Timedelta(days=30), df.date.max()+ pd.Timedelta(days=30)),
-    yaxis_range=(0.1,ymax*1.1),
-    newshape_line_color='#1e41e8',
-    legend=dict(
-        yanchor="top",
-        y=1,
-        xanchor="left",
-        x=0.85,
-        bgcolor='rgba(0,0,0,0)',
-        itemclick="toggleothers",
-    ),
-)
-st.plotly_chart(timeline_fig,on_select="rerun", key="timeline_chart", config=config, width='stretch')
-st.session_state.timeline_link = None
-if st.session_state.timeline_chart is not None and st.session_state.timeline_chart['selection']['points'] != []:
-    selected_points = st.session_state.timeline_chart
-    link = selected_points['selection']['points'][0]['customdata'][3]
-    st.session_state.timeline_link = link
-    webbrowser.open(link) 
-
-    with link_timeline_container:
-        st.markdown(f'**Link**: {link}')
+
+timeline_section(df)
 
 
 # Top contributors analysis
@@ -445,47 +473,46 @@ st.markdown("""
     The chart focuses on participants who have conducted multiple AMAs and/or were menioned in the titles of AMA related threads, showing their popularity in the community. 
     The accompanying table provides detailed statistics about their average engagement metrics.
 """)
-top_contributors = df.groupby('name').agg({
-    'num_comments': ['count', 'mean'],
-    'score': 'mean'
-}).round(2)
-
-# Add link to AMA
-top_contributors['link'] = df.groupby('name')['title'].apply(lambda x: x.iloc[0])
-
-
+# Already sorted by thread count; the link is the participant's first thread
+top_contributors = participants.stats[['threads', 'comments_mean', 'score_mean', 'first_link']].round(2)
 top_contributors.columns = ['Number of AMAs', 'Average Comments', 'Average Upvotes', 'Link']
-top_contributors = top_contributors.sort_values('Number of AMAs', ascending=False)
 top_contributors_bar = top_contributors.head(10)
 
-fig_contributors = px.bar(
-    top_contributors_bar.reset_index(),
-    x='name',
-    y='Number of AMAs',
-    title='Top 10 AMA Contributors',
-    text='Number of AMAs',
+def build_fig_contributors():
+    import plotly.express as px
+
+    fig_contributors = px.bar(
+        top_contributors_bar.reset_index(),
+        x='name',
+        y='Number of AMAs',
+        title='Top 10 AMA Contributors',
+        text='Number of AMAs',
     
-    labels={
-        'name': 'Participant Name',
-        'Number of AMAs': 'Number of AMAs and Related Threads'
-    }
-)
-
-fig_contributors.update_traces(textposition='outside')
-
-fig_contributors.update_layout(
-    dragmode=False,
-    height=500,
-    xaxis_tickangle=-45,
-    yaxis_range = (0,top_contributors_bar['Number of AMAs'].max()*1.2),
-    xaxis_title='Participant Name',
-    yaxis_title='Number of AMAs Conducted',
-    xaxis=dict(showgrid=False),
-    yaxis=dict(showgrid=False),
-    font=dict(size=16),
-    barcornerradius=15
+        labels={
+            'name': 'Participant Name',
+            'Number of AMAs': 'Number of AMAs and Related Threads'
+        }
+    )
+
+    fig_contributors.update_traces(textposition='outside')
+
+    fig_contributors.update_layout(
+        dragmode=False,
+        height=500,
+        xaxis_tickangle=-45,
+        yaxis_range = (0,top_contributors_bar['Number of AMAs'].max()*1.2),
+        xaxis_title='Participant Name',
+        yaxis_title='Number of AMAs Conducted',
+        xaxis=dict(showgrid=False),
+        yaxis=dict(showgrid=False),
+        font=dict(size=16),
+        barcornerradius=15
     
-)
+    )
+    return fig_contributors
+
+# Counted over every thread (the participant index), so the outlier checkbox does not apply
+fig_contributors = cached_figure('ama_top_contributors', ama.version, build_fig_contributors)
 st.plotly_chart(fig_contributors, config = config, width='stretch')
 
 c1,c2 = st.columns(2)
@@ -507,6 +534,25 @@ with c1:
         .set_properties(subset=['Mentions in Titles'], **{'font-weight': 'bold'})
         .set_properties(subset=['Avg Comments', 'Avg Upvotes'], **{'font-style': 'italic'})
     ,hide_index=True)
+
+    # Drilldown straight from the participant index, no rescan of the frame
+    person = st.selectbox('Participant Threads', top_contributors.index, index=None,
+                          placeholder='Choose a participant', key='participant')
+    if person is not None:
+        profile = participants.profile(person)
+        st.markdown(f"First: [{profile.first_title}]({profile.first_link}) on {profile.first_date:%Y-%m-%d}  \n"
+                    f"Best: [{profile.best_title}]({profile.best_link}) with {profile.best_score} upvotes")
+        # Threads dropped by the outlier filter are not in df
+        rows = participants.rows(person)
+        rows = rows[np.isin(rows, df.index)]
+        threads = df.loc[rows, ['date', 'title', 'category', 'num_comments', 'score', 'link']]
+        # Percentile of comments and upvotes among the category's AMAs that year
+        threads['engagement'] = load_ama_scores()['engagement'].reindex(threads.index)
+        st.dataframe(threads,
+                     column_config={'link': st.column_config.LinkColumn('link', display_text='reddit link'),
+                                    'engagement': st.column_config.ProgressColumn('engagement', format='%.0f',
+                                                                                  min_value=0, max_value=100)},
+                     hide_index=True)
 with c2:
     # Category distribution
     st.subheader("Category Distribution")
@@ -514,23 +560,29 @@ with c2:
     #     This donut chart shows the relative proportion of different AMA categories in the dataset. 
     #     The visualization helps understand the diversity of AMAs and which categories are more frequently represented. 
     # """)
-    category_dist = px.pie(
-        df,
-        names='category',
-        # title='Distribution of AMA Categories',
-        labels={'category': 'AMA Category'},
-        hole=0.4
-    )
-    category_dist.update_layout(
-        height=500,
-        legend_title_text='AMA Category',
-        legend=dict(
-            yanchor="top",
-            y=0.99,
-            xanchor="left",
-            x=1,
-            bgcolor='rgba(0,0,0,0)'
-        ),
-        font = dict(size=16)
-    )
+    def build_category_dist():
+        import plotly.express as px
+
+        category_dist = px.pie(
+            df,
+            names='category',
+            # title='Distribution of AMA Categories',
+            labels={'category': 'AMA Category'},
+            hole=0.4
+        )
+        category_dist.update_layout(
+            height=500,
+            legend_title_text='AMA Category',
+            legend=dict(
+                yanchor="top",
+                y=0.99,
+                xanchor="left",
+                x=1,
+                bgcolor='rgba(0,0,0,0)'
+            ),
+            font = dict(size=16)
+        )
+        return category_dist
+
+    category_dist = cached_figure('ama_category_pie', ama.version, build_category_dist, include_outliers=include_outliers)
     st.plotly_chart(category_dist, width='stretch')
\ No newline at end of file
@@ -1,6 +1,9 @@
 import pandas as pd
 import streamlit as st
-import plotly.express as px
+
+from engagement import cube, organic, render, search
+from engagement.data import load_post_index, load_post_scores, load_post_text, load_velocity, posts
+from engagement.figcache import cached_figure
 
 
 
@@ -10,10 +13,9 @@ with st.sidebar:
     exclude_ads =  st.checkbox('Exclude ads', value = True, help = 'Exclude ads from the data.')
 
 def app_view(author):
-    # Read data from jsonl file
-    df = pd.read_json('https://storage.googleapis.com/social-data-public/sports_reddit_posts.jsonl', lines=True)
-    # Add author filter
-    authors = sorted(df['author'].unique())
+    # Posts of this account, filtered once per feed version and shared across sessions
+    view = organic.load_view(author, exclude_ads)
+    df = view['posts']
     selected_author = author # st.selectbox('Select Author', authors, index=authors.index('nba'))
 
     subreddit_mapping = {
@@ -22,27 +24,11 @@ def app_view(author):
         'nhl': 'hockey',
         'MLBOfficial': 'baseball'
     }
-    if exclude_ads:
-        df = df[#(df['subreddit'] == subreddit_mapping.get(selected_author, 'nba')) & 
-                ~df['subreddit'].str.contains('u_') &
-                (df['author'] == selected_author)]
-    else:
-        df = df[#(df['subreddit'] == subreddit_mapping.get(selected_author, 'nba')) & 
-                (df['author'] == selected_author)]
-
-
     # st.write(df.is_created_from_ads_ui.value_counts())
     # Data preprocessing
-    df['created_utc'] = pd.to_datetime(df['created_utc'], unit='s').dt.tz_localize('UTC').dt.tz_convert('US/Eastern')
-        # Convert string columns to date/datetime
-    df['created_datetime_est'] =  pd.to_datetime(df['created_utc'], unit='s').dt.tz_convert('US/Eastern')
-    df['created_date_est'] = df['created_datetime_est'].dt.date
-    
-
-    df['week'] = df['created_utc'].dt.isocalendar().week
-    df['week_date'] = df['created_utc'].dt.to_period('W-SUN').apply(lambda x: x.start_time.strftime('%Y-%m-%d'))
-    df['week_end_date'] = df['created_utc'].dt.to_period('W-SUN').apply(lambda x: x.end_time.strftime('%Y-%m-%d'))
-    df['year'] = df['created_utc'].dt.year
+    # Local time columns (created_est, created_date_est, week_start, year, ...) are
+    # derived once when the feed is loaded, see engagement.timebuckets
+    first_date, last_date = df['created_date_est'].min().date(), df['created_date_est'].max().date()
 
     # Page header with styling
     css_style = """
@@ -77,14 +63,14 @@ def app_view(author):
         
         # Initialize session state for date range if not already done
         if date_range_key not in st.session_state:
-            st.session_state[date_range_key] = (df['created_datetime_est'].dt.date.min(), df['created_datetime_est'].dt.date.max())
+            st.session_state[date_range_key] = (first_date, last_date)
 
         with c1:    
             date_range = st.date_input(
                 "Date Range",
                 value=st.session_state[date_range_key],
-                min_value=df['created_datetime_est'].dt.date.min(),
-                max_value=df['created_datetime_est'].dt.date.max(),
+                min_value=first_date,
+                max_value=last_date,
                 key=date_range_key
             )
 
@@ -92,13 +78,13 @@ def app_view(author):
             st.write('')
             st.write('')
             def reset_date_filter():
-                st.session_state[date_range_key] = (df['created_datetime_est'].dt.date.min(), df['created_datetime_est'].dt.date.max())
+                st.session_state[date_range_key] = (first_date, last_date)
             st.button('Reset',on_click = reset_date_filter, key=f"reset_{author}")
                 
         
 
     if date_range and len(date_range) == 2:
-        mask = (df['created_date_est'] > date_range[0]) & (df['created_date_est'] <= date_range[1])
+        mask = (df['created_date_est'] > pd.Timestamp(date_range[0])) & (df['created_date_est'] <= pd.Timestamp(date_range[1]))
         df = df.loc[mask]
 
     c1,c2 = st.columns([2,1])
@@ -114,24 +100,28 @@ def app_view(author):
         # Filter data by selected years
         df_filtered = df[df['year'].isin(selected_years)]
         
-        scatter_fig = px.scatter(
-            df_filtered,
-            x='created_utc',
-            y='score',
-            size='num_comments',
-            # hover_data=['title'],
-            # title='Post Activity by Date',
-            template='plotly_white'
-        )
-
-        scatter_fig.update_layout(
-            height=500,
-            xaxis_title="Date",
-            yaxis_title="Score",
-            showlegend=False,
-            xaxis=dict(showgrid=False),
-            yaxis=dict(showgrid=False),
-        )
+        def build_scatter_fig():
+            scatter_fig = render.scatter(
+                df_filtered,
+                x='created_est',
+                y='score',
+                size='num_comments',
+                # hover_data=['title'],
+                # title='Post Activity by Date',
+                template='plotly_white'
+            )
+
+            scatter_fig.update_layout(
+                height=500,
+                xaxis_title="Date",
+                yaxis_title="Score",
+                showlegend=False,
+                xaxis=dict(showgrid=False),
+                yaxis=dict(showgrid=False),
+            )
+            return scatter_fig
+
+        scatter_fig = cached_figure('organic_activity', posts.version, build_scatter_fig, author=author, exclude_ads=exclude_ads, date_range=date_range, years=selected_years)
 
         st.plotly_chart(scatter_fig, width='stretch')
     with c2: 
@@ -141,19 +131,30 @@ def app_view(author):
         with embed_container:
             # Display embeds for each URL in the dataframe
             c1,c2 = st.columns(2)
-            for i,r in df.sort_values('created_utc', ascending=False).head(50).iterrows():
-
+            recent = df.sort_values('created_utc', ascending=False).head(50)
+            # selftext lives in a side store and is only read for the posts shown
+            recent_selftext = load_post_text(recent['id'])
+            # Percentile of score and comments among the subreddit's posts that month
+            recent_engagement = load_post_scores()['engagement'].reindex(recent.index)
+            # Score/comment samples of the snapshot poller, if it has run
+            series = load_velocity()
+            recent_velocity = series.latest(recent['id']) if series is not None else None
+            for (i,r), selftext, engagement in zip(recent.iterrows(), recent_selftext, recent_engagement):
+                heat = ''
+                if recent_velocity is not None and pd.notna(recent_velocity.at[r.id, 'score_per_hour']):
+                    latest = recent_velocity.loc[r.id]
+                    heat = f' | Velocity: {latest.score_per_hour:+.0f} upvotes/h, {latest.comments_per_hour:+.0f} comments/h'
 
                 st.markdown(f'''
                             Title: <a href = {r.permalink} target="_blank">{r.title}</a>
 
-                            {'' if r.selftext == '' else r.selftext}
+                            {selftext}
 
-                            on {r.created_datetime_est.strftime('%Y-%m-%d at %H:%M:%S')}
+                            on {r.created_est.strftime('%Y-%m-%d at %H:%M:%S')}
         
                             by u/**{r.author}** in r/**{r.subreddit}**
 
-                            Score: {r.score} | Comments: {r.num_comments}
+                            Score: {r.score} | Comments: {r.num_comments} | Engagement: {engagement:.0f}/100{heat}
                             ''', unsafe_allow_html=True)
                     
                 st.divider()
@@ -162,14 +163,19 @@ def app_view(author):
 
     # Weekly engagement metrics table
     st.subheader("Weekly Engagement Metrics")
-    weekly_metrics = df.groupby(['week_date', 'week_end_date']).agg({
-        'num_comments': ['count', 'mean', 'sum'],
-        'score': ['mean', 'sum']
-    }).round(1)
+    # Read from the precomputed daily cube instead of grouping the raw posts
+    daily = view['daily']
+    if date_range and len(date_range) == 2:
+        daily = daily[(daily['period'] > pd.Timestamp(date_range[0])) & (daily['period'] <= pd.Timestamp(date_range[1]))]
 
-    weekly_metrics.columns = ['Post Count', 'Avg Comments', 'Total Comments',
+    weekly_metrics = cube.rollup(cube.coarsen(daily, 'week'), ['period'])
+    weekly_metrics['week_date'] = weekly_metrics['period'].dt.strftime('%Y-%m-%d')
+    weekly_metrics['week_end_date'] = (weekly_metrics['period'] + pd.Timedelta(days=6)).dt.strftime('%Y-%m-%d')
+    weekly_metrics = weekly_metrics[['week_date', 'week_end_date', 'posts', 'comments_mean', 'comments_sum',
+                                     'score_mean', 'score_sum']].round(1)
+
+    weekly_metrics.columns = ['week_date', 'week_end_date', 'Post Count', 'Avg Comments', 'Total Comments',
                             'Avg Score', 'Total Score']
-    weekly_metrics = weekly_metrics.reset_index()
 
     # Format week date
     # weekly_metrics['week_date'] = pd.to_datetime(weekly_metrics['week_date'])
@@ -177,7 +183,10 @@ def app_view(author):
 
     st.dataframe(weekly_metrics, width='stretch', hide_index=True)
     with st.expander('View All Posts'):
-        st.dataframe(df, 
+        query = st.text_input('Search posts', placeholder='e.g. lebron dunk', key=f"search_{author}",
+                              help='Matches words in titles and post text by prefix, best engaged first')
+        found = search.select(df, load_post_index().search(query, within=df['id'])) if query else df
+        st.dataframe(found, 
                      column_config={
                         "permalink": st.column_config.LinkColumn(
                             "permalink",
@@ -208,71 +217,76 @@ def app_view(author):
     col1, col2 = st.columns(2)
     with col1:
         # Create figure with secondary y-axis
-        comments_fig = px.line(filtered_metrics, 
-                            x='week_date',
-                            y='Avg Score',
-                            title='Average Engagement per Post by Week',
-                            template='plotly_white')
+        def build_comments_fig():
+            import plotly.express as px
+
+            comments_fig = px.line(filtered_metrics, 
+                                x='week_date',
+                                y='Avg Score',
+                                title='Average Engagement per Post by Week',
+                                template='plotly_white')
         
-        # Add second trace on secondary y-axis
-        comments_fig.add_scatter(x=filtered_metrics['week_date'],
-                            y=filtered_metrics['Avg Comments'],
-                            name='Avg Comments',
-                            yaxis='y2')
+            # Add second trace on secondary y-axis
+            comments_fig.add_scatter(x=filtered_metrics['week_date'],
+                                y=filtered_metrics['Avg Comments'],
+                                name='Avg Comments',
+                                yaxis='y2')
         
-        # Update layout for secondary axis
-        comments_fig.update_layout(
-            height=400,
-            yaxis2=dict(
-                title='Avg Comments',
-                overlaying='y',
-                side='right',
-                showgrid=False
-            ),
-            yaxis=dict(showgrid=False),
-            xaxis=dict(showgrid=False,title='Week'),
-            yaxis_title='Avg Score',
-            showlegend=True,
-            legend=dict(
-                orientation='h',
-                yanchor='bottom',
-                y=1.02,
-                xanchor='right',
-                x=1
+            # Update layout for secondary axis
+            comments_fig.update_layout(
+                height=400,
+                yaxis2=dict(
+                    title='Avg Comments',
+                    overlaying='y',
+                    side='right',
+                    showgrid=False
+                ),
+                yaxis=dict(showgrid=False),
+                xaxis=dict(showgrid=False,title='Week'),
+                yaxis_title='Avg Score',
+                showlegend=True,
+                legend=dict(
+                    orientation='h',
+                    yanchor='bottom',
+                    y=1.02,
+                    xanchor='right',
+                    x=1
+                )
             )
-        )
-        
+            return comments_fig
+
+        comments_fig = cached_figure('organic_engagement', posts.version, build_comments_fig, author=author, exclude_ads=exclude_ads, date_range=date_range, years=selected_years)
+
         st.plotly_chart(comments_fig, width='stretch')
 
     with col2:
-        volume_fig = px.line(filtered_metrics,
-                            x='week_date',
-                            y='Post Count',
-                            title='Post Volume by Week',
-                            template='plotly_white')
-        volume_fig.update_layout(
-            height=400,
-            yaxis=dict(showgrid=False),
-            xaxis=dict(showgrid=False,title='Week')
-        )
+        def build_volume_fig():
+            import plotly.express as px
+
+            volume_fig = px.line(filtered_metrics,
+                                x='week_date',
+                                y='Post Count',
+                                title='Post Volume by Week',
+                                template='plotly_white')
+            volume_fig.update_layout(
+                height=400,
+                yaxis=dict(showgrid=False),
+                xaxis=dict(showgrid=False,title='Week')
+            )
+            return volume_fig
+
+        volume_fig = cached_figure('organic_volume', posts.version, build_volume_fig, author=author, exclude_ads=exclude_ads, date_range=date_range, years=selected_years)
         st.plotly_chart(volume_fig, width='stretch')
 
     
 
 
-tab1, tab2, tab3, tab4 = st.tabs(['NBA', 'NFL', 'NHL', 'MLB'])
+accounts = organic.ACCOUNTS
 
+# Only the selected account is computed and drawn. The others are prepared in
+# the background so switching to them is quick.
+selected = st.segmented_control('Account', list(accounts), default='NBA', key='account',
+                                label_visibility='collapsed', width='stretch') or 'NBA'
+app_view(accounts[selected])
+organic.prefetch([author for label, author in accounts.items() if label != selected], exclude_ads)
 
-
-
-with tab1:
-    app_view('nba')
-    
-with tab2:
-    app_view('nfl')
-    
-with tab3:
-    app_view('nhl')
-    
-with tab4:
-    app_view('MLBOfficial')
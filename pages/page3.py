@@ -2,16 +2,19 @@ import pandas as pd
 import streamlit as st
 import plotly.express as px
 
+from engagement import cube, render, search
+from engagement.data import load_cube, load_post_index, load_posts
+
 
 st.title('Comparative Analysis')
 
-# Read data from jsonl file
-df = pd.read_json('https://storage.googleapis.com/social-data-public/sports_reddit_posts.jsonl', lines=True)
+# Shared posts feed, parsed once per process
+df = load_posts()
 
 
 # Data preprocessing
-df['created_utc'] = pd.to_datetime(df['created_utc'], unit='s').dt.tz_localize('UTC').dt.tz_convert('US/Eastern')
-df['month'] = df['created_utc'].dt.to_period('M')
+# Precomputed author x subreddit x month aggregates
+monthly = load_cube('month')
 
 # Page header with styling
 css_style = """
@@ -45,19 +48,23 @@ with metric_cols[2]:
     st.metric("Avg Score/Post", int(avg_engagement))
 with metric_cols[3]:
     st.markdown('Date Range')
-    st.markdown(f"{df['created_utc'].dt.date.min()} to {df['created_utc'].dt.date.max()}")
+    st.markdown(f"{df['created_date_est'].min().date()} to {df['created_date_est'].max().date()}")
 
 with st.popover('Data', width='stretch'):
-    st.write(df)
+    query = st.text_input('Search posts', placeholder='e.g. lebron dunk', key='posts_search',
+                          help='Matches words in titles and post text by prefix, best engaged first')
+    if query:
+        st.write(search.select(df, load_post_index().search(query, within=df['id'])))
+    else:
+        st.write(df)
 
 # Author Performance Analysis
 st.subheader("Top Authors by Subreddit")
 
 # Calculate author metrics by subreddit
-author_metrics = df.groupby(['subreddit', 'author']).agg({
-    'score': ['count', 'mean', 'sum'],
-    'num_comments': ['mean', 'sum']
-}).round(1)
+author_metrics = cube.rollup(monthly, ['subreddit', 'author'])
+author_metrics = author_metrics.set_index(['subreddit', 'author'])[
+    ['posts', 'score_mean', 'score_sum', 'comments_mean', 'comments_sum']].round(1)
 
 author_metrics.columns = ['Post Count', 'Avg Score', 'Total Score', 
                          'Avg Comments', 'Total Comments']
@@ -76,10 +83,11 @@ with c1:
 col1, col2 = st.columns(2)
 with col1:
     # Create stacked bar chart for posts by author and subreddit
-    author_subreddit_posts = df.groupby(['author', 'subreddit']).size().reset_index(name='post_count')
+    author_subreddit_posts = cube.rollup(monthly, ['author', 'subreddit'])[['author', 'subreddit', 'posts']]
+    author_subreddit_posts = author_subreddit_posts.rename(columns={'posts': 'post_count'})
     
     # Get top 10 subreddits by total post count
-    top_10_subreddits = df.groupby('subreddit').size().nlargest(10).index
+    top_10_subreddits = monthly.groupby('subreddit', observed=True)['posts'].sum().nlargest(10).index
     
     # Filter for only top 10 subreddits
     author_subreddit_posts = author_subreddit_posts[author_subreddit_posts['subreddit'].isin(top_10_subreddits)]
@@ -126,9 +134,8 @@ with col1:
     st.plotly_chart(bar_fig, width='stretch')
 
 with col2:
-    top_10_subreddits = df.groupby('subreddit').size().nlargest(10).index
     author_metrics = author_metrics[author_metrics['subreddit'].isin(['nfl','nba','hockey','baseball'])]
-    scatter_fig = px.scatter(
+    scatter_fig = render.scatter(
         author_metrics,
         x='Avg Score',
         y='Avg Comments', 
@@ -159,8 +166,8 @@ with col2:
 st.subheader("Posting Patterns Over Time")
 
 # Calculate monthly post counts by subreddit
-monthly_posts = df.groupby(['month', 'author']).size().reset_index(name='posts')
-monthly_posts['month'] = monthly_posts['month'].astype(str)
+monthly_posts = cube.rollup(monthly, ['period', 'author'])[['period', 'author', 'posts']]
+monthly_posts['month'] = monthly_posts['period'].dt.strftime('%Y-%m')
 
 # Create line chart
 line_fig = px.line(
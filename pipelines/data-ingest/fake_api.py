@@ -0,0 +1,232 @@
+"""In-process stand-in for the Reddit/Pushshift APIs used by GetRedditData.
+
+Serves deterministic synthetic submissions and comment trees, so the
+pipelines can be run and benchmarked offline:
+
+    from fake_api import fake_client_factory
+    GetRedditData("posts", subreddit="nba", limit=None, client_factory=fake_client_factory(count=100_000)).run()
+    GetRedditComments("comments", ["17z10tk"], client_factory=fake_client_factory(comments=5_000)).run()
+
+The same (subreddit, author, index) always produces the same submission, and
+the same thread id always produces the same comment tree.
+"""
+import threading
+import time
+import zlib
+
+
+class FakeResponse:
+    def __init__(self, status_code: int):
+        self.status_code = status_code
+
+
+class TooManyRequests(Exception):
+    """HTTP 429, shaped like requests/prawcore errors (has `.response.status_code`)."""
+    def __init__(self):
+        super().__init__("received 429 HTTP response")
+        self.response = FakeResponse(429)
+
+
+class FakeSubmission:
+    """Submission exposing the attributes GetRedditData reads through `vars()`."""
+    def __init__(self, subreddit: str, author: str, index: int, created_utc: int, drift: int = 0):
+        # Keyed on the creation time, so a post keeps its id as newer posts arrive
+        seed = zlib.crc32(f"{subreddit}|{author}|{created_utc}".encode())
+        self.id = f"{seed:x}{created_utc:x}"
+        self.title = f"Synthetic post {index} in r/{subreddit}"
+        self.selftext = "" if seed % 3 else "Lorem ipsum dolor sit amet. " * (seed % 20)
+        self.score = seed % 25_000 + drift
+        self.num_comments = seed % 3_000 + drift
+        self.author = author
+        self.created_utc = created_utc
+        self.url = f"https://www.reddit.com/r/{subreddit}/comments/{self.id}"
+        self.permalink = f"/r/{subreddit}/comments/{self.id}"
+        self.upvote_ratio = round(0.5 + (seed % 50) / 100, 2)
+        self.over_18 = seed % 97 == 0
+        self.edited = float(created_utc + 600) if seed % 11 == 0 else False
+        self.spoiler = seed % 89 == 0
+        self.stickied = seed % 53 == 0
+        self.subreddit = subreddit
+
+
+# Replies of a comment shown inline; the rest come from a MoreComments under it
+SHOWN_REPLIES = 2
+
+
+class FakeComment:
+    """Comment exposing the attributes GetRedditComments reads, with its replies.
+
+    Comments served in a flat MoreComments batch have no replies attached:
+    their replies are elsewhere in the batch, as with praw's morechildren.
+    """
+    def __init__(self, tree, index: int, flat: bool = False):
+        self.tree = tree
+        self.index = index
+        self.flat = flat
+        seed = zlib.crc32(f"{tree.thread_id}|{index}".encode())
+        self.id = tree.comment_id(index)
+        parent = tree.parents[index]
+        self.parent_id = f"t3_{tree.thread_id}" if parent < 0 else f"t1_{tree.comment_id(parent)}"
+        self.author = None if seed % 41 == 0 else f"user{seed % 5_000}"
+        self.score = seed % 500 - 20
+        self.created_utc = tree.created_utc + index * 15
+
+    @property
+    def replies(self):
+        if self.flat:
+            return []
+        children = self.tree.children[self.index]
+        replies = [FakeComment(self.tree, child) for child in children[:SHOWN_REPLIES]]
+        if len(children) > SHOWN_REPLIES:
+            replies.append(MoreComments(self.tree, 0, self.tree.subtrees(children[SHOWN_REPLIES:])))
+        return replies
+
+
+class MoreComments:
+    """Placeholder for more comments; named like praw.models.MoreComments.
+
+    At the top level it stands for the next page of top-level comments.
+    Below it, for the hidden replies of a comment: `comments()` returns them
+    and their own replies as one flat batch, parents first, with another
+    MoreComments at the end while some are left.
+    """
+    def __init__(self, tree, start: int, batch: list = None):
+        self.tree = tree
+        self.start = start
+        self.batch = batch
+
+    def comments(self):
+        self.tree.api.request()
+        if self.batch is None:
+            return self.tree.page(self.start)
+        end = self.start + self.tree.api.page_size
+        items = [FakeComment(self.tree, i, flat=True) for i in self.batch[self.start:end]]
+        return items + [MoreComments(self.tree, end, self.batch)] if end < len(self.batch) else items
+
+
+class FakeThread:
+    """Comment tree of one submission, served a page of top-level comments at a time.
+
+    Comment i replies to an earlier comment or, one time in four, to the thread.
+    """
+    def __init__(self, api, thread_id: str, count: int):
+        self.api = api
+        self.thread_id = thread_id
+        self.created_utc = api.newest_utc - zlib.crc32(thread_id.encode()) % 100_000_000
+        self.parents = [-1 if i == 0 or zlib.crc32(f"{thread_id}|{i}|parent".encode()) % 4 == 0
+                        else zlib.crc32(f"{thread_id}|{i}|parent".encode()) % i for i in range(count)]
+        self.children = [[] for _ in range(count)]
+        for i, parent in enumerate(self.parents):
+            if parent >= 0:
+                self.children[parent].append(i)
+        self.top = [i for i, parent in enumerate(self.parents) if parent < 0]
+
+    def comment_id(self, index: int):
+        return f"{zlib.crc32(f'{self.thread_id}|{index}'.encode()):x}{index:x}"
+
+    def subtrees(self, roots):
+        """Comments under and including `roots`, depth first."""
+        order, stack = [], list(reversed(roots))
+        while stack:
+            index = stack.pop()
+            order.append(index)
+            stack.extend(reversed(self.children[index]))
+        return order
+
+    def page(self, start: int):
+        """Top-level comments from `start`, one page, then a MoreComments for the rest."""
+        end = start + self.api.page_size
+        items = [FakeComment(self, i) for i in self.top[start:end]]
+        return items + [MoreComments(self, end)] if end < len(self.top) else items
+
+
+class FakeSubmissionComments:
+    """What praw.Reddit.submission(id) returns, as far as its comments go."""
+    def __init__(self, thread):
+        self.id = thread.thread_id
+        self.thread = thread
+
+    @property
+    def comments(self):
+        self.thread.api.request()
+        return self.thread.page(0)
+
+
+class FakeReddit:
+    """Stand-in for the praw.Reddit instance, serving comment trees.
+
+    Attributes:
+        api (FakePushshiftAPI): Shares its request counters, latency and 429s
+        comments (int): Comments in every thread
+    """
+    read_only = True
+
+    def __init__(self, api=None, comments: int = 1_000):
+        self.api = api or FakePushshiftAPI()
+        self.comments = comments
+
+    def submission(self, id: str):
+        return FakeSubmissionComments(FakeThread(self.api, id, self.comments))
+
+
+class FakePushshiftAPI:
+    """Fake PMAW client.
+
+    Attributes:
+        count (int): Submissions available per (subreddit, author) target
+        page_size (int): Submissions returned per simulated request
+        latency (float): Seconds slept before each page
+        throttle_rate (float): Fraction of searches rejected with HTTP 429
+        newest_utc (int): created_utc of the newest submission; older ones are
+            spaced `interval` seconds apart, newest first like Pushshift
+        drift (int): Added to every submission's score and comment count.
+            Raise it between fetches to simulate votes and comments coming in.
+    """
+    def __init__(self, count: int = 1_000, page_size: int = 100, latency: float = 0.0, throttle_rate: float = 0.0,
+                 newest_utc: int = 1_735_689_600, interval: int = 600, drift: int = 0):
+        self.count = count
+        self.page_size = page_size
+        self.latency = latency
+        self.throttle_rate = throttle_rate
+        self.newest_utc = newest_utc
+        self.interval = interval
+        self.drift = drift
+        self.requests = 0
+        self.rejected = 0
+        self.lock = threading.Lock()
+
+    def request(self):
+        """Count a simulated HTTP request, sleeping and rejecting as configured."""
+        with self.lock:
+            self.requests += 1
+            # Reject every 1/throttle_rate-th request, deterministically
+            rejected = self.throttle_rate and int(self.requests * self.throttle_rate) > int((self.requests - 1) * self.throttle_rate)
+            self.rejected += bool(rejected)
+        if self.latency:
+            time.sleep(self.latency)
+        if rejected:
+            raise TooManyRequests()
+
+    def search_submissions(self, limit: int = None, subreddit: str = None, author: str = None, since: int = None,
+                           sort: str = "desc", **kwargs):
+        self.request()
+        return self.pages(subreddit or "all", author or "[deleted]", limit, since, sort)
+
+    def pages(self, subreddit, author, limit, since, sort="desc"):
+        available = self.count
+        if since is not None:
+            available = min(available, max(0, (self.newest_utc - since) // self.interval + 1))
+        indexes = range(available) if sort == "desc" else range(available - 1, -1, -1)
+        limit = available if limit is None else min(limit, available)
+        for i, index in enumerate(indexes[:limit]):
+            if i and i % self.page_size == 0:
+                self.request()
+            yield FakeSubmission(subreddit, author, index, self.newest_utc - index * self.interval, self.drift)
+
+
+def fake_client_factory(comments: int = 1_000, **kwargs):
+    """Return a zero-argument factory for GetRedditData/GetRedditComments(client_factory=...)."""
+    def factory():
+        api = FakePushshiftAPI(**kwargs)
+        return FakeReddit(api, comments), api
+    return factory
@@ -1,10 +1,19 @@
 import configparser
+import json
+import os
 import pandas as pd
 import pathlib
 import praw
 from pmaw import PushshiftAPI
 import logging
-import numpy as np
+import queue
+import random
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+import pyarrow as pa
+import pyarrow.parquet as pq
 from tqdm import tqdm
 
 
@@ -40,6 +49,120 @@ POST_FIELDS = (
     "subreddit"
 )
 
+# Type of each POST_FIELDS column after transform_basic. Besides pandas dtypes:
+#   "str"             text
+#   "flag"            bool; the API sends False/True or their string forms
+#   "datetime"        epoch seconds -> datetime64
+#   "edit_datetime"   epoch seconds of the last edit, or False -> nullable datetime64
+POST_SCHEMA = {
+    "id": "str",
+    "title": "str",
+    "selftext": "str",
+    "score": "int32",
+    "num_comments": "int32",
+    "author": "category",
+    "created_utc": "datetime",
+    "url": "str",
+    "upvote_ratio": "float32",
+    "over_18": "flag",
+    "edited": "edit_datetime",
+    "spoiler": "flag",
+    "stickied": "flag",
+    "subreddit": "category",
+}
+
+FALSE_VALUES = [False, "False", "false", ""]
+
+
+def coerce_posts(df, schema: dict = POST_SCHEMA):
+    """Cast every schema column in one vectorized pass and return the new frame."""
+    columns = {}
+    for column, dtype in schema.items():
+        values = df[column]
+        if dtype == "str":
+            values = values.astype(str)
+        elif dtype == "flag":
+            values = values.notna() & ~values.isin(FALSE_VALUES)
+        elif dtype == "datetime":
+            values = pd.to_datetime(pd.to_numeric(values, errors="coerce"), unit="s")
+        elif dtype == "edit_datetime":
+            seconds = pd.to_numeric(values.mask(values.isin(FALSE_VALUES)), errors="coerce")
+            # True without a timestamp carries no edit time either
+            values = pd.to_datetime(seconds.where(seconds > 1), unit="s")
+        elif dtype.startswith("int"):
+            values = pd.to_numeric(values, errors="coerce").fillna(0).astype(dtype)
+        else:
+            values = values.astype(dtype)
+        columns[column] = values
+    return pd.DataFrame(columns, index=df.index)
+
+
+# Accounts tracked by the dashboards and the subreddits they post to.
+# (subreddit, username) pairs; None means "any".
+TARGETS = (
+    (None, "nba"),
+    (None, "nfl"),
+    (None, "nhl"),
+    (None, "MLBOfficial"),
+    ("nba", None),
+    ("nfl", None),
+    ("hockey", None),
+    ("baseball", None),
+)
+
+# Pushshift returns at most this many submissions per request
+PAGE_SIZE = 100
+
+
+def api_connect():
+    """Create an authenticated read-only PRAW instance and a PMAW client on top of it."""
+    try:
+        instance = praw.Reddit(
+            client_id=CLIENT_ID, client_secret=SECRET, user_agent=USER_AGENT
+        )
+        instance.read_only = True
+        api_praw = PushshiftAPI(praw=instance)
+        return instance, api_praw
+    except Exception as e:
+        print(f"Unable to connect to API. Error: {e}")
+        logging.error(f"Unable to connect to API. Error: {e}")
+        return False, False
+
+
+def is_rate_limited(error):
+    """True for HTTP 429 errors from requests/prawcore style exceptions."""
+    response = getattr(error, "response", None)
+    status = getattr(response, "status_code", getattr(response, "status", None))
+    return status == 429 or type(error).__name__ == "TooManyRequests"
+
+
+class TokenBucket:
+    """Thread-safe token bucket limiting request rate across all workers of a run.
+
+    Attributes:
+        rate (float): Tokens added per second
+        capacity (int): Maximum burst size
+    """
+    def __init__(self, rate: float, capacity: int = 1):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+
+    def acquire(self):
+        """Block until a token is available and take it."""
+        while True:
+            with self.lock:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                wait = (1 - self.tokens) / self.rate
+            time.sleep(wait)
+
 class GetRedditData:
     """A class to fetch, transform and save Reddit data using PRAW and PMAW APIs.
 
@@ -51,30 +174,57 @@ class GetRedditData:
         subreddit (str): Name of the subreddit to fetch data from
         time_filter (str): Time filter for posts (e.g. 'all', 'year', 'month')
         limit (int): Maximum number of posts to fetch. None means no limit.
+        incremental (bool): Only fetch posts newer than the last run's checkpoint and
+            append them to the existing output instead of overwriting it.
+        chunk_size (int): Number of posts transformed and written at a time. Peak memory
+            is bounded by this, not by `limit`.
+        session (tuple): (praw.Reddit, PushshiftAPI) pair to reuse instead of connecting
+        client_factory (callable): Returns a new (praw.Reddit, PushshiftAPI) pair. Defaults to
+            api_connect; fake_api.fake_client_factory serves synthetic data offline.
+        rate_limiter (TokenBucket): Limiter to take a token from before each API page
+        max_retries (int): Times to retry the target after a 429, with exponential backoff
 
     Inspired by https://github.com/modhpranav/reddit-data-pipeline/blob/main/airflow/utils/get_reddit_data.py
     """
-    def __init__(self, output_name: str, username: str = None, subreddit: str = None, time_filter: str = None, limit: int = 100):
+    def __init__(self, output_name: str, username: str = None, subreddit: str = None, time_filter: str = None, limit: int = 100,
+                 incremental: bool = False, chunk_size: int = 10_000, session: tuple = None,
+                 rate_limiter: TokenBucket = None, max_retries: int = 5, client_factory=None):
         self.output_name = output_name
         self.username = username
         self.subreddit = subreddit
         self.time_filter = time_filter
         self.limit = int(limit) if limit else None
-        self.reddit_instance, self.pmaw_instance = self.api_connect()
+        self.incremental = incremental
+        self.checkpoint_file = f"{output_name}.checkpoint.json"
+        self.chunk_size = int(chunk_size)
+        self.output_file = f"{output_name}.json"
+        self.rate_limiter = rate_limiter
+        self.max_retries = max_retries
+        self.client_factory = client_factory or api_connect
+        self.reddit_instance, self.pmaw_instance = session or self.api_connect()
     
     def api_connect(self):
-        try:
-            instance = praw.Reddit(
-                client_id=CLIENT_ID, client_secret=SECRET, user_agent=USER_AGENT
-            )
-            instance.read_only = True
-            api_praw = PushshiftAPI(praw=instance)
-            return instance, api_praw
-        except Exception as e:
-            print(f"Unable to connect to API. Error: {e}")
-            logging.error(f"Unable to connect to API. Error: {e}")
-            return False
+        return self.client_factory()
     
+    @property
+    def checkpoint_key(self):
+        """Checkpoint entries are kept per (subreddit, author) target."""
+        return f"{self.subreddit or ''}|{self.username or ''}"
+
+    def load_checkpoints(self):
+        """Read the high-water marks of all targets sharing this output."""
+        if not os.path.exists(self.checkpoint_file):
+            return {}
+        with open(self.checkpoint_file) as f:
+            return json.load(f)
+
+    def save_checkpoint(self, newest: dict):
+        """Record the newest created_utc and id written for this target."""
+        checkpoints = self.load_checkpoints()
+        checkpoints[self.checkpoint_key] = newest
+        with open(self.checkpoint_file, "w") as f:
+            json.dump(checkpoints, f, indent=2)
+
     def get_posts(self):
         """Create posts object for Reddit instance by subreddit and/or author
         
@@ -87,68 +237,120 @@ class GetRedditData:
         if not (self.subreddit or self.username):
             raise ValueError("At least one of subreddit or author must be provided")
             
-        search_params = {"limit": self.limit}
+        # mem_safe spills fetched pages to pmaw's disk cache instead of holding them all
+        search_params = {"limit": self.limit, "mem_safe": True}
         if self.subreddit:
             search_params["subreddit"] = self.subreddit
         if self.username:
             search_params["author"] = self.username
-            
-        self.posts = self.pmaw_instance.search_submissions(**search_params)
-        print(len(self.posts))
+
+        checkpoint = self.load_checkpoints().get(self.checkpoint_key) if self.incremental else None
+        if checkpoint:
+            # `since` is inclusive, so the newest post of the last run comes back and is dropped.
+            # Oldest first: when more than `limit` posts are new, this run takes the oldest of
+            # them and the checkpoint only advances past posts actually written.
+            search_params["since"] = checkpoint["created_utc"]
+            search_params["sort"] = "asc"
+
+        self.throttle()
+        self.posts = self.paced(self.pmaw_instance.search_submissions(**search_params))
+        if checkpoint:
+            self.posts = (post for post in self.posts if post.id != checkpoint["id"])
+
+    def throttle(self):
+        if self.rate_limiter:
+            self.rate_limiter.acquire()
+
+    def paced(self, posts):
+        """Take a rate-limiter token for every page of submissions consumed after the first"""
+        for i, post in enumerate(posts, 1):
+            yield post
+            if i % PAGE_SIZE == 0:
+                self.throttle()
 
     def extract_data(self):
-        """Extract Data to Pandas DataFrame object"""
-        list_of_items = []
+        """Yield a dict of POST_FIELDS for each fetched submission, one at a time"""
         for submission in tqdm(self.posts):
             to_dict = vars(submission)
-            sub_dict = {field: to_dict[field] for field in POST_FIELDS}
-            list_of_items.append(sub_dict)
-        self.extracted_data_df = pd.DataFrame(list_of_items)
-    
-    def transform_basic(self):
-        """Some basic transformation of data. To be refactored at a later point."""
-
-        # Convert epoch to UTC
-        df = self.extracted_data_df
-        print(df.head())
-        # print(df.head())
-        df["created_utc"] = pd.to_datetime(df["created_utc"], unit="s")
-        # Fields don't appear to return as booleans (e.g. False or Epoch time). Needs further investigation but forcing as False or True for now.
-        # TODO: Remove all but the edited line, as not necessary. For edited line, rather than force as boolean, keep date-time of last
-        # edit and set all else to None.
-        df["over_18"] = np.where(
-            (df["over_18"] == "False") | (df["over_18"] == False), False, True
-        ).astype(bool)
-        df["edited"] = np.where(
-            (df["edited"] == "False") | (df["edited"] == False), False, True
-        ).astype(bool)
-        df["spoiler"] = np.where(
-            (df["spoiler"] == "False") | (df["spoiler"] == False), False, True
-        ).astype(bool)
-        df["stickied"] = np.where(
-            (df["stickied"] == "False") | (df["stickied"] == False), False, True
-        ).astype(bool)
-        self.df = df
+            yield {field: to_dict[field] for field in POST_FIELDS}
+
+    def transform_basic(self, df):
+        """Coerce one chunk of data to POST_SCHEMA."""
+        return coerce_posts(df)
+
+    def iter_chunks(self):
+        """Yield transformed DataFrames of at most `chunk_size` posts"""
+        chunk = []
+        for item in self.extract_data():
+            chunk.append(item)
+            if len(chunk) == self.chunk_size:
+                yield self.transform_basic(pd.DataFrame(chunk))
+                chunk = []
+        if chunk:
+            yield self.transform_basic(pd.DataFrame(chunk))
+
+    def existing_ids(self):
+        """Ids already in the output, read one line at a time."""
+        if not os.path.exists(self.output_file):
+            return set()
+        with open(self.output_file) as f:
+            return {str(json.loads(line)["id"]) for line in f if line.strip()}
 
-    
     def load_to_csv(self):
-        """Save extracted data to CSV file in /tmp folder"""
-        extracted_data_df = self.df
-        extracted_data_df['id'] = extracted_data_df['id'].astype(str)
-        extracted_data_df['title'] = extracted_data_df['title'].astype(str)
-        extracted_data_df['author'] = extracted_data_df['author'].astype(str)
-        
-        extracted_data_df.to_json(f"{self.output_name}.json", index=False, lines = True, orient='records')
+        """Stream transformed chunks to the JSON lines output file.
+
+        A full run writes to a temporary file and swaps it in at the end. An incremental
+        run appends only posts whose id is not already in the output; it is the only mode
+        that keeps a set of ids in memory.
+
+        Returns:
+            int: Number of posts written
+        """
+        append = self.incremental and os.path.exists(self.output_file)
+        seen = self.existing_ids() if append else set()
+        target = self.output_file if append else f"{self.output_file}.tmp"
+        newest = None
+        written = 0
+        with open(target, "a" if append else "w") as f:
+            for chunk in self.iter_chunks():
+                if self.incremental:
+                    chunk = chunk[~chunk["id"].isin(seen)].drop_duplicates("id")
+                    if chunk.empty:
+                        continue
+                    seen.update(chunk["id"])
+                latest = chunk.loc[chunk["created_utc"].idxmax()]
+                if newest is None or latest["created_utc"] > newest["created_utc"]:
+                    newest = latest
+                f.write(chunk.to_json(orient="records", lines=True))
+                written += len(chunk)
+        if not append:
+            os.replace(target, self.output_file)
+
+        if self.incremental and newest is not None:
+            self.save_checkpoint({"created_utc": int(newest["created_utc"].timestamp()), "id": newest["id"]})
+        return written
+
+    def fetch_with_retry(self):
+        """Fetch and write the target, restarting it with backoff when rate limited"""
+        for attempt in range(self.max_retries + 1):
+            try:
+                self.get_posts()
+                return self.load_to_csv()
+            except Exception as e:
+                if not is_rate_limited(e) or attempt == self.max_retries:
+                    raise
+                delay = min(60, 2 ** attempt) * (1 + random.random())
+                logging.warning(f"Rate limited on {self.checkpoint_key}, retrying in {delay:.1f}s")
+                time.sleep(delay)
 
     def run(self):
         result = {"status": "Failed", "message": "Failed to extract data"}
         try:
             if self.reddit_instance:
-                self.get_posts()
-                self.extract_data()
-                self.transform_basic()
-                self.load_to_csv()
-                return {"status": "Success", "message": "Data extracted successfully"}
+                written = self.fetch_with_retry()
+                if self.incremental and not written:
+                    return {"status": "Success", "message": "No new posts"}
+                return {"status": "Success", "message": f"{written} posts extracted successfully"}
         except Exception as e:
             import traceback
             print(f"Error: {e}")
@@ -159,10 +361,311 @@ class GetRedditData:
         
         
 
-def main():
-    reddit_data = GetRedditData(output_name="reddit_data", subreddit="nba", time_filter="all", limit=100)
-    reddit_data.run()
-    print(reddit_data)
+def output_name_for(subreddit: str = None, username: str = None, prefix: str = "reddit_data"):
+    """Distinct output name per target, e.g. reddit_data_r_nba or reddit_data_u_nba"""
+    parts = [prefix] + ([f"r_{subreddit}"] if subreddit else []) + ([f"u_{username}"] if username else [])
+    return "_".join(parts)
+
+
+def run_targets(targets=TARGETS, max_workers: int = 4, requests_per_second: float = 1.0, session: tuple = None,
+                client_factory=None, **kwargs):
+    """Fetch several (subreddit, username) targets concurrently.
+
+    All workers share one authenticated API session (from `client_factory` unless
+    `session` is given) and one token bucket, so the combined request rate stays
+    within `requests_per_second` however many run. Each target writes its own
+    output file; extra keyword arguments are passed to GetRedditData.
+
+    Returns:
+        dict: (subreddit, username) -> run() result
+    """
+    session = session or (client_factory or api_connect)()
+    rate_limiter = TokenBucket(requests_per_second)
+
+    def run_target(target):
+        subreddit, username = target
+        reddit_data = GetRedditData(output_name=output_name_for(subreddit, username), subreddit=subreddit, username=username,
+                                    session=session, rate_limiter=rate_limiter, **kwargs)
+        return reddit_data.run()
+
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        return dict(zip(targets, pool.map(run_target, targets)))
+
+
+# Flattened comment tree records, one row per comment. parent_id is the id of the
+# parent comment, or the thread id for top-level comments (depth 0).
+COMMENT_SCHEMA = pa.schema([
+    ("thread_id", pa.string()),
+    ("comment_id", pa.string()),
+    ("parent_id", pa.string()),
+    ("depth", pa.int16()),
+    ("author", pa.string()),
+    ("score", pa.int32()),
+    ("created_utc", pa.timestamp("s")),
+])
+
+AMA_SOURCE = script_path.parent.parent / "nba-ama.csv"
+
+
+def thread_ids(source=AMA_SOURCE):
+    """Thread ids of the AMA table (csv or parquet), in file order without duplicates."""
+    source = str(source)
+    ids = pd.read_parquet(source, columns=["id"]) if source.endswith(".parquet") else pd.read_csv(source, usecols=["id"])
+    return list(dict.fromkeys(ids["id"].astype(str)))
+
+
+def is_more_comments(item):
+    """True for praw's MoreComments placeholders (and the fake API's)."""
+    return type(item).__name__ == "MoreComments"
+
+
+class GetRedditComments:
+    """Fetch the full comment trees of many threads into one Parquet file.
+
+    Threads are fetched by a pool of workers sharing one session and one token
+    bucket. Each worker walks its thread's tree, expanding MoreComments pages
+    one request at a time, and hands off flattened records in chunks of
+    `chunk_size`. A single writer appends every chunk as a Parquet row group.
+    At most `max_workers * 2` chunks wait in between, so peak memory is
+    bounded by the chunk size, not by the number of threads or comments.
+
+    Attributes:
+        output_name (str): Name of the output file (without extension)
+        thread_ids (list): Submission ids whose comments to fetch
+        chunk_size (int): Comments per chunk handed to the writer
+        max_workers (int): Threads fetched concurrently
+        session (tuple): (praw.Reddit, PushshiftAPI) pair to reuse instead of connecting
+        client_factory (callable): Returns a new (praw.Reddit, PushshiftAPI) pair. Defaults to
+            api_connect; fake_api.fake_client_factory serves synthetic trees offline.
+        rate_limiter (TokenBucket): Limiter to take a token from before each API request
+        max_retries (int): Times to retry a request after a 429, with exponential backoff
+    """
+    def __init__(self, output_name: str, thread_ids, chunk_size: int = 10_000, max_workers: int = 4,
+                 session: tuple = None, client_factory=None, rate_limiter: TokenBucket = None, max_retries: int = 5):
+        self.output_name = output_name
+        self.output_file = f"{output_name}.parquet"
+        self.thread_ids = list(thread_ids)
+        self.chunk_size = int(chunk_size)
+        self.max_workers = max_workers
+        self.rate_limiter = rate_limiter
+        self.max_retries = max_retries
+        self.client_factory = client_factory or api_connect
+        self.reddit_instance, self.pmaw_instance = session or self.client_factory()
+
+    def throttle(self):
+        if self.rate_limiter:
+            self.rate_limiter.acquire()
+
+    def request(self, fetch):
+        """Call `fetch` (one API request), retrying it with backoff when rate limited"""
+        for attempt in range(self.max_retries + 1):
+            self.throttle()
+            try:
+                return fetch()
+            except Exception as e:
+                if not is_rate_limited(e) or attempt == self.max_retries:
+                    raise
+                delay = min(60, 2 ** attempt) * (1 + random.random())
+                logging.warning(f"Rate limited fetching comments, retrying in {delay:.1f}s")
+                time.sleep(delay)
+
+    def walk(self, thread_id: str):
+        """Yield one record per comment of the thread, depth first, expanding MoreComments as met.
+
+        A comment's depth is one below its parent's. MoreComments below the
+        top level return flat batches that mix replies of several depths, so
+        the position in the traversal only stands in for a parent not seen.
+        """
+        submission = self.reddit_instance.submission(id=thread_id)
+        depths = {thread_id: -1}
+        stack = [(item, 0) for item in reversed(self.request(lambda: list(submission.comments)))]
+        while stack:
+            item, depth = stack.pop()
+            if is_more_comments(item):
+                stack.extend((more, depth) for more in reversed(self.request(item.comments)))
+                continue
+            if item.id in depths:
+                continue
+            parent = item.parent_id.split("_", 1)[-1]
+            depth = depths[parent] + 1 if parent in depths else depth
+            depths[item.id] = depth
+            yield (
+                thread_id,
+                item.id,
+                parent,
+                depth,
+                str(item.author) if item.author else "[deleted]",
+                item.score,
+                int(item.created_utc),
+            )
+            stack.extend((reply, depth + 1) for reply in reversed(list(item.replies)))
+
+    def chunk(self, records):
+        """Arrow table of a list of record tuples."""
+        return pa.Table.from_arrays([pa.array(column, type=field.type) for column, field in
+                                     zip(zip(*records), COMMENT_SCHEMA)], schema=COMMENT_SCHEMA)
+
+    def fetch_thread(self, thread_id: str, chunks: queue.Queue):
+        """Walk one thread, putting its records on `chunks` `chunk_size` at a time"""
+        records, count = [], 0
+        for record in self.walk(thread_id):
+            records.append(record)
+            if len(records) == self.chunk_size:
+                chunks.put(self.chunk(records))
+                count += len(records)
+                records = []
+        if records:
+            chunks.put(self.chunk(records))
+            count += len(records)
+        return count
+
+    def load_to_parquet(self):
+        """Fetch every thread and stream the records to the Parquet output file.
+
+        The file is written to a temporary path and swapped in at the end.
+
+        Returns:
+            int: Number of comments written
+        """
+        chunks = queue.Queue(maxsize=self.max_workers * 2)
+        done = object()
+        target = f"{self.output_file}.tmp"
+
+        def fetch_all():
+            try:
+                with ThreadPoolExecutor(max_workers=self.max_workers) as pool:
+                    return list(pool.map(lambda thread_id: self.fetch_thread(thread_id, chunks), self.thread_ids))
+            finally:
+                chunks.put(done)
+
+        written = 0
+        with ThreadPoolExecutor(max_workers=1) as fetcher:
+            fetched = fetcher.submit(fetch_all)
+            table = None
+            try:
+                with pq.ParquetWriter(target, COMMENT_SCHEMA) as writer, tqdm(unit="comment") as progress:
+                    while (table := chunks.get()) is not done:
+                        writer.write_table(table)
+                        written += table.num_rows
+                        progress.update(table.num_rows)
+            finally:
+                # Unblock the workers if writing failed part way
+                while table is not done:
+                    table = chunks.get()
+            fetched.result()
+        os.replace(target, self.output_file)
+        return written
+
+    def run(self):
+        result = {"status": "Failed", "message": "Failed to extract comments"}
+        try:
+            if self.reddit_instance:
+                written = self.load_to_parquet()
+                return {"status": "Success", "message": f"{written} comments from {len(self.thread_ids)} threads extracted successfully"}
+        except Exception as e:
+            import traceback
+            print(f"Error: {e}")
+            print(traceback.format_exc())
+            logging.error(f"Error: {e}")
+            logging.error(traceback.format_exc())
+        return result
+
+
+def run_comments(source=AMA_SOURCE, output_name: str = "nba_ama_comments", requests_per_second: float = 1.0, **kwargs):
+    """Fetch the comment trees of every AMA thread in `source` into `output_name`.parquet."""
+    return GetRedditComments(output_name, thread_ids(source), rate_limiter=TokenBucket(requests_per_second), **kwargs).run()
+
+
+# Snapshot log of the dashboards, read back with np.memmap by engagement.velocity.
+# ENGAGEMENT_SNAPSHOTS_PATH moves it for the poller and the dashboards alike.
+SNAPSHOTS = os.environ.get("ENGAGEMENT_SNAPSHOTS_PATH", script_path.parent.parent / "data" / "post_snapshots.bin")
+
+
+class SnapshotPoller:
+    """Re-sample the score and comment count of recent posts on a schedule.
+
+    Every poll fetches the `limit` newest posts of each target through
+    GetRedditData and appends one (post, time, score, comments) sample per
+    post to a fixed-width binary log (see engagement.velocity). Successive
+    samples of a post give its engagement velocity.
+
+    Attributes:
+        log: Writer of the snapshot log, an engagement.velocity.SnapshotLog;
+            anything with its `append(ids, time, scores, comments)` will do
+        targets (tuple): (subreddit, username) pairs to sample
+        limit (int): Newest posts sampled per target
+        interval (float): Seconds between the starts of two polls
+        session (tuple): (praw.Reddit, PushshiftAPI) pair shared by every poll
+        rate_limiter (TokenBucket): Limiter shared by every poll
+    """
+    def __init__(self, log, targets=TARGETS, limit: int = 100, interval: float = 600,
+                 session: tuple = None, client_factory=None, requests_per_second: float = 1.0):
+        self.log = log
+        self.targets = targets
+        self.limit = limit
+        self.interval = interval
+        self.session = session or (client_factory or api_connect)()
+        self.rate_limiter = TokenBucket(requests_per_second)
+
+    def sample(self, subreddit: str = None, username: str = None):
+        """Current (id, score, num_comments) of the target's newest posts."""
+        reddit_data = GetRedditData(output_name=output_name_for(subreddit, username), subreddit=subreddit,
+                                    username=username, limit=self.limit, session=self.session,
+                                    rate_limiter=self.rate_limiter)
+        reddit_data.get_posts()
+        return [(post["id"], post["score"], post["num_comments"]) for post in reddit_data.extract_data()]
+
+    def poll(self, now: int = None):
+        """Sample every target once and append the samples to the log, timed `now` (epoch seconds, default the current time).
+
+        A target that is rate limited is skipped until the next poll.
+
+        Returns:
+            int: Number of samples written
+        """
+        samples = []
+        for subreddit, username in self.targets:
+            try:
+                samples.extend(self.sample(subreddit, username))
+            except Exception as e:
+                if not is_rate_limited(e):
+                    raise
+                logging.warning(f"Rate limited sampling {subreddit or ''}|{username or ''}, skipped this poll")
+        if not samples:
+            return 0
+        ids, scores, comments = zip(*samples)
+        return self.log.append(ids, int(time.time()) if now is None else now, scores, comments)
+
+    def run(self, polls: int = None):
+        """Poll every `interval` seconds, `polls` times or until interrupted."""
+        done = 0
+        while polls is None or done < polls:
+            started = time.monotonic()
+            written = self.poll()
+            logging.info(f"Appended {written} snapshots to {self.log.path}")
+            done += 1
+            if polls is None or done < polls:
+                time.sleep(max(0.0, self.interval - (time.monotonic() - started)))
+
+
+def main(argv=None):
+    """Fetch the posts of every target, or sample them every 10 minutes with `snapshots`.
+
+        python utils.py
+        python utils.py snapshots [polls]
+    """
+    argv = sys.argv[1:] if argv is None else argv
+    if argv[:1] == ["snapshots"]:
+        # The log format lives with its reader in the dashboard package
+        if str(script_path.parent.parent) not in sys.path:
+            sys.path.insert(0, str(script_path.parent.parent))
+        from engagement.velocity import SnapshotLog
+
+        SnapshotPoller(SnapshotLog(SNAPSHOTS)).run(int(argv[1]) if len(argv) > 1 else None)
+        return
+    results = run_targets(TARGETS, time_filter="all", limit=100)
+    for target, result in results.items():
+        print(target, result)
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
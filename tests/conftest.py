@@ -0,0 +1,55 @@
+"""Point the dashboard at a small synthetic posts feed and temporary stores.
+
+The environment is set before `engagement.data` is first imported, so no
+test reaches the network or writes next to the real datasets.
+"""
+import json
+import os
+import pathlib
+import shutil
+import sys
+import tempfile
+
+ROOT = pathlib.Path(__file__).resolve().parent.parent
+INGEST = ROOT / "pipelines" / "data-ingest"
+sys.path[:0] = [str(ROOT), str(INGEST)]
+
+ACCOUNTS = ["nba", "nfl", "nhl", "MLBOfficial", "fan"]
+SUBREDDITS = ["nba", "nfl", "hockey", "baseball"]
+
+
+def write_feed(path, rows: int = 400):
+    """Posts feed in the JSON lines layout of the production feed."""
+    with open(path, "w") as f:
+        for i in range(rows):
+            f.write(json.dumps({
+                "id": f"t{i:05x}",
+                "title": f"Synthetic post {i} about the {SUBREDDITS[i % 4]} game",
+                "selftext": "" if i % 3 else f"Body of post {i}",
+                "author": ACCOUNTS[i % 5],
+                "subreddit": SUBREDDITS[i % 4],
+                "created_utc": 1_700_000_000 + i * 3_600,
+                "score": (i * 37) % 5_000,
+                "num_comments": (i * 11) % 700,
+                "upvote_ratio": 0.5 + (i % 50) / 100,
+                "permalink": f"/r/{SUBREDDITS[i % 4]}/comments/t{i:05x}",
+                "url": f"https://www.reddit.com/r/{SUBREDDITS[i % 4]}/comments/t{i:05x}",
+                "over_18": False,
+                "stickied": i % 53 == 0,
+                "is_created_from_ads_ui": i % 10 == 0,
+            }) + "\n")
+
+
+_tmp = pathlib.Path(tempfile.mkdtemp(prefix="engagement-tests-"))
+write_feed(_tmp / "posts.jsonl")
+os.environ.update({
+    "ENGAGEMENT_POSTS_URL": str(_tmp / "posts.jsonl"),
+    "ENGAGEMENT_POSTS_PATH": str(_tmp / "posts.parquet"),
+    "ENGAGEMENT_SHARED_DIR": str(_tmp / "shared"),
+    "ENGAGEMENT_SNAPSHOTS_PATH": str(_tmp / "post_snapshots.bin"),
+    "ENGAGEMENT_POSTS_TTL": "0",
+})
+
+
+def pytest_sessionfinish(session, exitstatus):
+    shutil.rmtree(_tmp, ignore_errors=True)
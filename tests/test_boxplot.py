@@ -0,0 +1,67 @@
+import numpy as np
+import pandas as pd
+
+from engagement import boxplot
+
+QUANTILES = np.linspace(0.01, 0.99, 99)
+# Rank error allowed for the default k, as a fraction of the values
+EPSILON = 0.02
+
+
+def rank_error(sketch, values):
+    values = np.sort(values)
+    exact = np.searchsorted(values, np.quantile(values, QUANTILES))
+    estimate = np.searchsorted(values, sketch.quantile(QUANTILES))
+    return np.abs(estimate - exact).max() / len(values)
+
+
+def test_sketch_rank_error_is_bounded():
+    values = np.random.default_rng(1).lognormal(7, 1.5, 500_000)
+    assert rank_error(boxplot.QuantileSketch().update(values), values) <= EPSILON
+
+    # Uneven batches and merged sketches stay within the same bound
+    batches = np.split(values, [1, 300, 70_000, 70_257, 400_000])
+    streamed, merged = boxplot.QuantileSketch(), boxplot.QuantileSketch()
+    for batch in batches:
+        streamed.update(batch)
+        merged.merge(boxplot.QuantileSketch().update(batch))
+    for sketch in (streamed, merged):
+        assert sketch.count == len(values)
+        assert rank_error(sketch, values) <= EPSILON
+        assert sum(map(len, sketch.levels)) <= sketch.k * len(sketch.levels)
+
+
+def test_category_sketches_follow_appended_rows():
+    rng = np.random.default_rng(2)
+    df = pd.DataFrame({
+        "category": pd.Categorical(rng.choice(["Player", "Coach"], 120_000)),
+        "score": rng.lognormal(7, 1.5, 120_000),
+    })
+    sketches = boxplot.CategorySketches.build(df.iloc[:100_000], "category", ["score"])
+    sketches.add(df.iloc[100_000:])
+    for category in ["Player", "Coach"]:
+        values = df.loc[df["category"] == category, "score"].to_numpy()
+        assert sketches.get("score", category).count == len(values)
+        assert rank_error(sketches.get("score", category), values) <= EPSILON
+
+    # Large categories are drawn from the kept sketches
+    stats = boxplot.category_stats(df, "category", "score", exact_rows=1_000, sketches=sketches)
+    for category, box in stats.items():
+        assert box["median"] == sketches.get("score", category).quantile(0.5)
+
+
+def test_outlier_hover_matches_their_data():
+    rng = np.random.default_rng(3)
+    df = pd.DataFrame({
+        "category": pd.Categorical(["Player"] * 5_000 + ["Coach"] * 50),
+        "score": rng.lognormal(7, 1.5, 5_050),
+        "title": [f"AMA {i}" for i in range(5_050)],
+    })
+    fig = boxplot.box(df, "category", "score", hover_data=["title"], exact_rows=1_000,
+                      labels={"score": "Upvotes"}, hovertemplate="%{customdata[0]}: %{y}<extra></extra>")
+    outliers = {trace.name: trace for trace in fig.data if trace.type == "scatter"}
+    # Exact categories carry their rows; sketched ones only values
+    assert outliers["Coach"].customdata is not None
+    assert outliers["Coach"].hovertemplate == "%{customdata[0]}: %{y}<extra></extra>"
+    assert outliers["Player"].customdata is None and len(outliers["Player"].y) > 0
+    assert outliers["Player"].hovertemplate == "<b>Upvotes:</b> %{y}<extra></extra>"
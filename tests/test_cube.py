@@ -0,0 +1,25 @@
+import pandas as pd
+
+from engagement import cube, data
+
+
+def ordered(table):
+    return table.sort_index() if isinstance(table.index, pd.MultiIndex) else table.sort_values(cube.KEYS, ignore_index=True)
+
+
+def test_added_posts_match_a_rebuild():
+    df = data.load_posts()
+    for grain in cube.PERIOD_COLUMNS:
+        accumulators = cube.Accumulators.build(df.iloc[:250], grain)
+        accumulators.add(df.iloc[250:320]).add(df.iloc[:0]).add(df.iloc[320:])
+        pd.testing.assert_frame_equal(ordered(accumulators.cube), ordered(cube.build(df, grain)), check_dtype=False)
+
+
+def test_merged_halves_match_the_whole():
+    df = data.load_posts()
+    half = df.sample(frac=0.5, random_state=0)
+    a, b = cube.accumulate(half, "month"), cube.accumulate(df.drop(half.index), "month")
+    common = a.index.intersection(b.index)
+    assert len(common)
+    merged = cube.merge(a.loc[common], b.loc[common])
+    pd.testing.assert_frame_equal(ordered(merged), ordered(cube.accumulate(df, "month").loc[common]), check_dtype=False)
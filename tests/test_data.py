@@ -0,0 +1,41 @@
+import subprocess
+import sys
+
+import pandas as pd
+
+from conftest import ROOT
+from engagement import cube, data
+
+
+def test_importing_data_leaves_pandas_options_alone():
+    probe = "import pandas as pd, engagement.data; print(pd.get_option('mode.copy_on_write'))"
+    out = subprocess.run([sys.executable, "-c", probe], cwd=ROOT, capture_output=True, text=True, check=True)
+    assert out.stdout.split()[-1] == "False"
+
+
+def test_appended_rows_match_a_rebuild_and_survive_reloads():
+    df = data.load_posts()
+    feed = {"rows": df.iloc[:300]}
+    dataset = data.SharedDataset(lambda: feed["rows"], key="id")
+
+    def day_cube():
+        table = dataset.derive("cube_day", lambda frame: cube.Accumulators.build(frame, "day"),
+                               update=lambda accumulators, rows: accumulators.add(rows)).cube
+        return table.sort_values(cube.KEYS, ignore_index=True)
+
+    rebuilt = cube.build(df, "day").sort_values(cube.KEYS, ignore_index=True)
+
+    day_cube()
+    dataset.append(df.iloc[300:].reset_index(drop=True))
+    pd.testing.assert_frame_equal(dataset.get(), df)
+    pd.testing.assert_frame_equal(day_cube(), rebuilt, check_dtype=False)
+
+    # A reload before the feed has the rows keeps them
+    dataset.invalidate()
+    pd.testing.assert_frame_equal(dataset.get(), df)
+    pd.testing.assert_frame_equal(day_cube(), rebuilt, check_dtype=False)
+
+    # Once it has them, they come from the feed alone
+    feed["rows"] = df
+    dataset.invalidate()
+    assert dataset.get()["id"].is_unique and len(dataset.get()) == len(df)
@@ -0,0 +1,129 @@
+import pathlib
+import subprocess
+import sys
+
+import pandas as pd
+import pyarrow.parquet as pq
+
+import fake_api
+import utils
+from engagement import velocity
+from fake_api import FakePushshiftAPI, FakeReddit, fake_client_factory
+
+NEWEST = 1_735_689_600
+INTERVAL = 600
+# Growth of the ingest's peak RSS allowed between N and 10N posts
+RSS_BOUND_MB = 16
+
+PROBE = """
+import os, resource, sys
+sys.path.insert(0, {ingest!r})
+import utils
+from fake_api import FakePushshiftAPI, FakeReddit, fake_client_factory
+
+os.chdir({tmp!r})
+reddit_data = utils.GetRedditData("posts", subreddit="nba", limit={count},
+                                  client_factory=fake_client_factory(count={count}))
+before = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+assert reddit_data.run()["status"] == "Success"
+print((resource.getrusage(resource.RUSAGE_SELF).ru_maxrss - before) / 1024)
+"""
+
+
+def fetch(newest_utc: int, limit: int):
+    reddit_data = utils.GetRedditData("posts", subreddit="nba", limit=limit, incremental=True,
+                                      client_factory=fake_client_factory(count=1_000, newest_utc=newest_utc))
+    return reddit_data.run()
+
+
+def test_incremental_backlog_larger_than_limit(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    assert fetch(NEWEST, limit=10)["status"] == "Success"
+    # 50 posts arrive while the fetcher is down; each run may take 10 of them
+    newest = NEWEST + 50 * INTERVAL
+    for _ in range(6):
+        assert fetch(newest, limit=10)["status"] == "Success"
+
+    written = pd.read_json(tmp_path / "posts.json", lines=True, convert_dates=False)
+    created = set(written["created_utc"] // 1_000)
+    assert {NEWEST + i * INTERVAL for i in range(1, 51)} <= created
+    assert written["id"].is_unique
+    assert fetch(newest, limit=10)["message"] == "No new posts"
+
+
+def ingest_targets(path, monkeypatch, max_workers: int):
+    """Posts of every target, fetched by `max_workers` workers sharing one throttled session."""
+    path.mkdir()
+    monkeypatch.chdir(path)
+    session = (FakeReddit(), FakePushshiftAPI(count=300, page_size=50, throttle_rate=0.05))
+    results = utils.run_targets(utils.TARGETS, max_workers=max_workers, requests_per_second=1_000,
+                                session=session, limit=300, max_retries=8)
+    assert all(result["status"] == "Success" for result in results.values()), results
+    assert session[1].rejected > 0
+    return {target: pd.read_json(path / f"{utils.output_name_for(*target)}.json", lines=True)
+            for target in utils.TARGETS}
+
+
+def test_concurrent_targets_match_sequential(tmp_path, monkeypatch):
+    # No backoff sleeps after a 429; the retries still happen
+    monkeypatch.setattr(utils.time, "sleep", lambda seconds: None)
+    sequential = ingest_targets(tmp_path / "sequential", monkeypatch, max_workers=1)
+    concurrent = ingest_targets(tmp_path / "concurrent", monkeypatch, max_workers=len(utils.TARGETS))
+    for target in utils.TARGETS:
+        assert len(sequential[target]) == 300 and sequential[target]["id"].is_unique
+        pd.testing.assert_frame_equal(concurrent[target], sequential[target])
+
+
+def peak_rss_growth(count: int, tmp_path):
+    """MB the peak RSS of a fresh interpreter grows by while ingesting `count` posts."""
+    out = subprocess.run([sys.executable, "-c", PROBE.format(ingest=str(pathlib.Path(utils.__file__).parent), tmp=str(tmp_path), count=count)],
+                         capture_output=True, text=True, check=True).stdout
+    return float(out.split()[-1])
+
+
+def test_ingest_memory_is_flat(tmp_path):
+    small, large = peak_rss_growth(10_000, tmp_path), peak_rss_growth(100_000, tmp_path)
+    assert large - small <= RSS_BOUND_MB, (small, large)
+
+
+def test_comment_depths_follow_parents(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    ids = ["t00001", "t00002"]
+    factory = fake_client_factory(comments=2_000, page_size=20)
+    comments = utils.GetRedditComments("comments", ids, max_workers=2, client_factory=factory)
+    assert comments.run()["status"] == "Success"
+
+    written = pq.read_table("comments.parquet").to_pandas()
+    for thread_id in ids:
+        tree = fake_api.FakeThread(fake_api.FakePushshiftAPI(), thread_id, 2_000)
+        depths = []
+        for parent in tree.parents:
+            depths.append(0 if parent < 0 else depths[parent] + 1)
+        expected = pd.DataFrame({
+            "comment_id": [tree.comment_id(i) for i in range(2_000)],
+            "parent_id": [thread_id if p < 0 else tree.comment_id(p) for p in tree.parents],
+            "depth": depths,
+        }).set_index("comment_id")
+        thread = written[written["thread_id"] == thread_id].set_index("comment_id")
+        assert thread.index.is_unique and len(thread) == 2_000
+        # Replies served in flat MoreComments batches sit more than one level down
+        assert expected["depth"].max() > 2
+        pd.testing.assert_frame_equal(thread.loc[expected.index, ["parent_id", "depth"]], expected,
+                                      check_dtype=False)
+
+
+def test_snapshot_polls_give_velocity(tmp_path):
+    api = FakePushshiftAPI(count=50)
+    log = velocity.SnapshotLog(tmp_path / "snapshots.bin")
+    poller = utils.SnapshotPoller(log, targets=utils.TARGETS[:2], limit=20, session=(FakeReddit(api), api),
+                                  requests_per_second=1_000)
+    assert poller.poll(now=NEWEST) == 40
+    # Half an hour later every post has 120 more upvotes and comments
+    api.drift = 120
+    assert poller.poll(now=NEWEST + 1_800) == 40
+
+    ids = list(log.positions)
+    latest = velocity.VelocitySeries.load(tmp_path / "snapshots.bin").latest(ids + ["unsampled"])
+    assert len(ids) == 40
+    assert (latest.loc[ids] == 240.0).all().all()
+    assert latest.loc["unsampled"].isna().all()
@@ -0,0 +1,95 @@
+import json
+import os
+import subprocess
+import sys
+
+import numpy as np
+import pytest
+
+from conftest import ROOT, write_feed
+from engagement import data, mapped, storage
+
+
+def test_memory_report_on_mapped_frames():
+    report = data.memory_report()
+    assert set(report["dataset"]) == {"ama", "posts"}
+    assert (report["bytes"] > 0).all()
+
+
+def test_mapped_frames_match_their_source():
+    df = data.read_posts()
+    source, _ = storage.read_posts(data.POSTS_URL)
+    for column in ["score", "num_comments", "created_utc", "author"]:
+        assert df[column].equals(source[column])
+    assert not df["score"].to_numpy().flags.writeable
+
+
+def test_second_attach_reuses_the_mapping():
+    data.read_ama()
+    path = storage.SHARED_DIR / "nba-ama"
+    first, _ = mapped.attach(path)
+    second, _ = mapped.attach(path)
+    for column in ["score", "date"]:
+        a, b = first[column].array, second[column].array
+        a, b = getattr(a, "_ndarray", np.asarray(a)), getattr(b, "_ndarray", np.asarray(b))
+        assert np.shares_memory(a, b) and not a.flags.writeable
+
+
+READER = """
+import json, sys
+sys.path.insert(0, {root!r})
+from engagement import data, storage
+built = not (storage.SHARED_DIR / "posts.bin").exists()
+held = [data.load_posts()]
+# Touch the numeric columns, as the pages' aggregations do
+total = sum(float(held[0][column].sum()) for column in ["score", "num_comments", "upvote_ratio"])
+
+def usage():
+    # The smaps entry of the posts copy, and the whole process
+    entries, current = {{}}, None
+    for line in open("/proc/self/smaps"):
+        fields = line.split()
+        if not fields[0].endswith(":"):
+            current = fields[-1]
+        elif current.endswith("posts.bin") and fields[-1] == "kB":
+            entries[fields[0][:-1]] = entries.get(fields[0][:-1], 0) + int(fields[1])
+    status = dict(line.split(":", 1) for line in open("/proc/self/status"))
+    return entries, int(status["VmRSS"].split()[0])
+
+_, before = usage()
+for _ in range(20):
+    held.append(data.load_posts())
+entries, after = usage()
+print(json.dumps({{"built": built, "sessions_kb": after - before, **entries}}), flush=True)
+sys.stdin.read()
+"""
+
+
+@pytest.mark.skipif(not os.path.exists("/proc/self/smaps"), reason="needs /proc/self/smaps")
+def test_readers_share_a_downloaded_feed(tmp_path):
+    write_feed(tmp_path / "posts.jsonl", rows=60_000)
+    env = dict(os.environ, ENGAGEMENT_POSTS_URL=(tmp_path / "posts.jsonl").as_uri(),
+               ENGAGEMENT_POSTS_PATH=str(tmp_path / "posts.parquet"),
+               ENGAGEMENT_SHARED_DIR=str(tmp_path / "shared"), ENGAGEMENT_POSTS_TTL="3600")
+
+    def reader():
+        return subprocess.Popen([sys.executable, "-c", READER.format(root=str(ROOT))], env=env,
+                                stdin=subprocess.PIPE, stdout=subprocess.PIPE, text=True)
+
+    # The first reader downloads the feed and writes the copy; the others map it
+    first = reader()
+    usage = [json.loads(first.stdout.readline())]
+    others = [reader() for _ in range(2)]
+    usage += [json.loads(proc.stdout.readline()) for proc in others]
+    # Measured again with all three attached
+    for proc in [first, *others]:
+        proc.communicate("")
+    assert [u["built"] for u in usage] == [True, False, False]
+
+    for u in usage:
+        assert u["Rss"] > 512
+        # No page of the copy is copied into a reader, and later sessions add nothing
+        assert u["Anonymous"] == 0
+        assert u["sessions_kb"] < 1_024
+    # The last reader's share of the copy is split across the three
+    assert usage[-1]["Pss"] < 0.5 * usage[-1]["Rss"]
@@ -0,0 +1,24 @@
+import numpy as np
+from streamlit.testing.v1 import AppTest
+
+from conftest import ROOT
+from engagement.data import load_ama, load_outliers, load_participants
+
+
+def outlier_participant():
+    """A participant with at least one thread dropped by the outlier filter."""
+    df = load_ama()
+    kept = load_outliers().select(df[df["name"] != "Unknown"], ["num_comments", "score"]).index
+    participants = load_participants()
+    return next(name for name in participants.stats.index if not np.isin(participants.rows(name), kept).all())
+
+
+def test_participant_drilldown_with_outliers_excluded():
+    person = outlier_participant()
+    at = AppTest.from_file(str(ROOT / "pages" / "page1.py"), default_timeout=120).run()
+    at.sidebar.checkbox[0].uncheck().run()
+    at.selectbox(key="participant").set_value(person).run()
+    assert not at.exception
+    shown = at.dataframe[-1].value
+    assert 0 < len(shown) < len(load_participants().rows(person))
+    assert shown["engagement"].between(0, 100).all()
@@ -0,0 +1,24 @@
+import numpy as np
+import pandas as pd
+
+from engagement import scoring
+
+
+def posts(rows: int, seed: int):
+    rng = np.random.default_rng(seed)
+    return pd.DataFrame({
+        "subreddit": rng.choice(["nba", "nfl", "hockey"], rows),
+        "month": rng.choice(["2024-01", "2024-02"], rows),
+        "score": rng.lognormal(4, 2, rows).astype(int),
+        "num_comments": rng.lognormal(3, 1.5, rows).astype(int),
+    })
+
+
+def test_appended_batches_match_a_rebuild():
+    df = posts(5_000, seed=0)
+    # The last batch brings a group the first ones have not seen
+    df = pd.concat([df, posts(300, seed=1).assign(subreddit="baseball")], ignore_index=True)
+    scores = scoring.EngagementScores(df.iloc[:3_000], ["subreddit", "month"])
+    for batch in (df.iloc[3_000:3_001], df.iloc[3_001:3_001], df.iloc[3_001:5_000], df.iloc[5_000:]):
+        scores.append(batch)
+    pd.testing.assert_frame_equal(scores.frame, scoring.score(df, ["subreddit", "month"]))
@@ -0,0 +1,40 @@
+import pandas as pd
+
+from engagement import search
+
+
+def posts():
+    return pd.DataFrame({
+        "id": ["a", "b", "c"],
+        "title": ["Lakers win", "Celtics trade", "Game thread"],
+        "score": [30, 20, 10],
+        "num_comments": [3, 2, 1],
+    })
+
+
+def test_saved_index_follows_the_text(tmp_path):
+    df, path = posts(), tmp_path / "posts.search.npz"
+    first = search.load_or_build(df, [df["title"], ["", "old body", ""]], path)
+    assert list(first.search("old")) == ["b"]
+    assert list(search.load_or_build(df, [df["title"], ["", "old body", ""]], path).search("old")) == ["b"]
+
+    # Same ids, titles and ranks, new body text
+    second = search.load_or_build(df, [df["title"], ["", "new body", ""]], path)
+    assert list(second.search("old")) == [] and list(second.search("new")) == ["b"]
+
+
+def test_text_key_stands_for_the_text(tmp_path):
+    df, path = posts(), tmp_path / "posts.search.npz"
+    calls = []
+
+    def texts(body):
+        def read():
+            calls.append(body)
+            return [df["title"], ["", body, ""]]
+        return read
+
+    search.load_or_build(df, texts("old body"), path, key=[df["title"], ["text.parquet", 1, 1]])
+    reused = search.load_or_build(df, texts("unread"), path, key=[df["title"], ["text.parquet", 1, 1]])
+    assert calls == ["old body"] and list(reused.search("old")) == ["b"]
+    rebuilt = search.load_or_build(df, texts("new body"), path, key=[df["title"], ["text.parquet", 2, 2]])
+    assert calls == ["old body", "new body"] and list(rebuilt.search("new")) == ["b"]
@@ -0,0 +1,62 @@
+import logging
+
+import pandas as pd
+import pyarrow.parquet as pq
+
+from engagement import storage
+
+
+def write_csv(path, score: int):
+    pd.DataFrame({
+        "id": ["a1", "b2"],
+        "date": ["2020-01-01", "2021-06-01"],
+        "title": ["AMA one", "AMA two"],
+        "name": ["Player One", "Coach Two"],
+        "category": ["Player", "Coach"],
+        "body": ["first body", "second body"],
+        "score": [score, 20],
+        "num_comments": [5, 6],
+        "link": ["https://reddit.com/a1", "https://reddit.com/b2"],
+    }).to_csv(path, index=False)
+
+
+def test_stale_copy_falls_back_to_the_source(tmp_path, caplog):
+    csv, parquet = tmp_path / "ama.csv", tmp_path / "ama.parquet"
+    write_csv(csv, score=10)
+    storage.convert(csv, parquet, storage.AMA_SCHEMA, storage.AMA_TEXT)
+    df, text = storage.read_ama(parquet, csv)
+    assert text == storage.text_path(parquet) and df["score"].tolist() == [10, 20]
+
+    write_csv(csv, score=99)
+    with caplog.at_level(logging.WARNING, logger="engagement.storage"):
+        df, text = storage.read_ama(parquet, csv)
+    assert df["score"].tolist() == [99, 20]
+    assert isinstance(text, pd.DataFrame) and text["body"].tolist() == ["first body", "second body"]
+    assert "stale" in caplog.text
+
+
+def test_committed_ama_copy_matches_the_csv():
+    assert storage.is_current(storage.AMA_PARQUET, storage.AMA_CSV)
+
+
+def test_text_store_reads_only_the_row_groups_asked_for(tmp_path, monkeypatch):
+    rows = 10 * storage.TEXT_ROW_GROUP
+    text = pd.DataFrame({"id": [f"p{i:06x}" for i in range(rows)], "selftext": [f"text {i}" for i in range(rows)]})
+    # Written shuffled; the side file is sorted by id
+    storage.write_text(text.sample(frac=1, random_state=0), tmp_path / "posts.text.parquet")
+    read = []
+    original = pq.ParquetFile.read_row_groups
+    monkeypatch.setattr(pq.ParquetFile, "read_row_groups",
+                        lambda self, groups, **kwargs: read.append(list(groups)) or original(self, groups, **kwargs))
+
+    store = storage.TextStore(tmp_path / "posts.text.parquet")
+    ids = ["p000005", "missing", "p000007", "p000005"]
+    assert store.get(ids, "selftext").tolist() == ["text 5", "", "text 7", "text 5"]
+    assert read == [[0]]
+    assert store.get(["p000005"], "title").tolist() == [""]
+
+    store.append(pd.DataFrame({"id": ["p000005", "new"], "selftext": ["replaced", "appended"]}))
+    assert store.get(["new", "p000005"], "selftext").tolist() == ["appended", "text 5"]
+    # A reloaded feed without the appended posts still finds their text
+    store.reset(tmp_path / "posts.text.parquet")
+    assert store.get(["new", "p000005"], "selftext").tolist() == ["appended", "text 5"]
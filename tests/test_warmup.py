@@ -0,0 +1,50 @@
+from streamlit.testing.v1 import AppTest
+from streamlit.web import bootstrap
+
+from engagement import data, launch, organic, warmup
+
+
+def test_warmup_fills_the_shared_datasets(monkeypatch):
+    monkeypatch.setattr(warmup, "timeline", warmup.StartupTimeline())
+    monkeypatch.setattr(warmup, "_thread", None)
+    data.ama.invalidate()
+    data.posts.invalidate()
+
+    thread = warmup.start()
+    assert warmup.start() is thread
+    thread.join(timeout=60)
+    assert warmup.timeline.error is None
+    assert "data_ready" in warmup.timeline.as_dict()
+
+    assert data.ama._frame is not None and data.posts._frame is not None
+    expected = {f"cube_{grain}" for grain in warmup.CUBE_GRAINS} | {"scores"}
+    expected |= {f"organic_{author}_True" for author in organic.ACCOUNTS.values()}
+    assert expected <= set(data.posts._derived)
+    # Sessions arriving after the warm-up get the loaded frames as they are
+    versions = data.ama.version, data.posts.version
+    data.load_ama(), data.load_posts(), data.load_cube("day")
+    assert (data.ama.version, data.posts.version) == versions
+
+
+def test_launcher_warms_up_before_the_first_visitor(monkeypatch):
+    monkeypatch.setattr(warmup, "timeline", warmup.StartupTimeline())
+    monkeypatch.setattr(warmup, "_thread", None)
+    data.ama.invalidate()
+    data.posts.invalidate()
+    visits = []
+
+    def serve(main_script_path, is_hello, args, flag_options):
+        # The server is up: the warm-up is already running before anyone connects
+        visits.append(warmup._thread)
+        at = AppTest.from_file(main_script_path, default_timeout=120).run()
+        assert not at.exception
+
+    monkeypatch.setattr(bootstrap, "run", serve)
+    launch.main(["--server.headless=true"])
+    assert visits and visits[0] is not None
+    warmup.start().join(timeout=60)
+
+    marks = warmup.timeline.as_dict()
+    assert {"imported", "data_ready", "first_render"} <= set(marks)
+    assert 0 < marks["imported"] < marks["first_render"]
+    assert marks["imported"] < marks["data_ready"]